@@ -17,5 +17,6 @@ from .js import Edge
 from .firefox import Firefox
 
 from .mock import Mock
+from .replay import Replay
 
 from .emulicious_debugger import EmuliciousDebugger
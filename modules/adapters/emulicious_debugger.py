@@ -26,11 +26,11 @@ class EmuliciousDebugger(dap.AdapterConfiguration):
 		check_port_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 		check_port_socket.settimeout(0.1)
 		if check_port_socket.connect_ex((configuration.get("host") or "localhost", configuration.get("port"))) != 0:
-			return self.startEmulicious(log, configuration)
+			return await self.startEmulicious(log, configuration)
 		check_port_socket.close()
 		return dap.SocketTransport(log, configuration.get("host") or "localhost", configuration.get("port"))
 
-	def startEmulicious(self, log: core.Logger, configuration: dap.ConfigurationExpanded):
+	async def startEmulicious(self, log: core.Logger, configuration: dap.ConfigurationExpanded):
 		if configuration.get("request") == 'attach':
 			raise Exception("Failed to attach to Emulicious Debugger.\n" +
 							"Please make sure that Emulicious is running and Remote Debugging is enabled in Emulicious's Tools menu.")
@@ -93,17 +93,13 @@ class EmuliciousDebugger(dap.AdapterConfiguration):
 									"emuliciousPath: " + emuliciousPath + "\n\n" +
 									"Please check your configuration.")
 
-			maxAttempts = 25
-			for _ in range(maxAttempts):
-				check_port_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-				check_port_socket.settimeout(0.1)
-				if check_port_socket.connect_ex((configuration.get("host") or "localhost", configuration.get("port"))) == 0:
-					check_port_socket.close()
-					return dap.SocketTransport(log, configuration.get("host") or "localhost", configuration.get("port"))
-		raise Exception("Failed to connect to Emulicious after " + maxAttempts + " attempts.\n" +
-						"You can try if specifying the host to connect to, in your launch configuration.\n" +
-						"If neither of the above helps, please contact the author about this error.\n" +
-						"Until this is fixed, you can just start Emulicious yourself and enable Remote Debugging from Emulicious's Tools menu before trying to launch a program.")
+		try:
+			return await dap.SocketTransport.connect_with_retry(log, configuration.get("host") or "localhost", configuration.get("port"), timeout=10)
+		except core.Error:
+			raise Exception("Failed to connect to Emulicious.\n" +
+							"You can try if specifying the host to connect to, in your launch configuration.\n" +
+							"If neither of the above helps, please contact the author about this error.\n" +
+							"Until this is fixed, you can just start Emulicious yourself and enable Remote Debugging from Emulicious's Tools menu before trying to launch a program.")
 
 	@property
 	def configuration_snippets(self):
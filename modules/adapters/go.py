@@ -26,12 +26,24 @@ class Go(dap.AdapterConfiguration):
 		description='Sets a specific path for dlv if not set go will use whatever is in your path'
 	)
 
+	go_dlv_unix_socket = Setting[bool] (
+		key='go_dlv_unix_socket',
+		default=False,
+		description='Connect to dlv with a unix domain socket instead of tcp, requires a version of dlv that supports `dlv dap --listen unix:path`'
+	)
+
 	async def start(self, log: core.Logger, configuration: dap.ConfigurationExpanded):
-		port = util.get_open_port()
 		dlv = self.go_dlv or shutil.which('dlv')
 		if not dlv:
 			raise core.Error('`dlv` not found see https://github.com/go-delve/delve for setting up delve')
 
+		if self.go_dlv_unix_socket and (path := util.get_unix_socket_path('dlv')):
+			command = [
+				dlv, 'dap', '--listen', f'unix:{path}'
+			]
+			return await dap.SocketTransport.connect_with_process(log, command, None, process_is_program_output=True, path=path)
+
+		port = util.get_open_port()
 		command = [
 			dlv, 'dap', '--listen', f'localhost:{port}'
 		]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from ..typecheck import *
+
+from .. import dap
+from .. import core
+
+class Replay(dap.AdapterConfiguration):
+	'''
+		Plays back a session recorded by adding "record_protocol": "path/to/recording" to any configuration
+
+		{
+			"name": "Replay",
+			"type": "replay",
+			"request": "launch",
+			"recording": "path/to/recording",
+			"speed": "recorded" // or "fast", "lockstep"
+		}
+	'''
+
+	type = 'replay'
+	docs = None
+	development = True
+
+	async def start(self, log: core.Logger, configuration: dap.ConfigurationExpanded):
+		recording = configuration.get('recording')
+		if not recording:
+			raise core.Error('The field `recording` is not set. Please check your launch configuration.')
+
+		return dap.ReplayTransport(log, recording, configuration.get('speed', 'recorded'))
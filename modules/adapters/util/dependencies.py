@@ -4,8 +4,10 @@ from ...settings import Settings
 from ...import core
 from ...import dap
 
+import os
 import socket
 import shutil
+import tempfile
 import sublime
 
 def version_tuple(v):
@@ -34,6 +36,13 @@ def get_open_port() -> int:
 		port = sock.getsockname()[1]
 		return port
 
+# returns a path for an adapter to listen on with a unix domain socket or None if they are not supported on this platform
+def get_unix_socket_path(name: str) -> str|None:
+	if not hasattr(socket, 'AF_UNIX') or os.name == 'nt':
+		return None
+
+	return os.path.join(tempfile.mkdtemp(prefix='sublime_debugger_'), f'{name}.sock')
+
 def require_package(package: str):
 	pc_settings = sublime.load_settings('Package Control.sublime-settings')
 	installed_packages = pc_settings.get('installed_packages', [])
@@ -8,7 +8,7 @@ from .. import core
 from .breakpoint import Breakpoint
 from .data_breakpoints import DataBreakpoints, DataBreakpoint
 from .function_breakpoints import FunctionBreakpoints, FunctionBreakpoint
-from .source_breakpoints import SourceBreakpoints, SourceBreakpoint
+from .source_breakpoints import SourceBreakpoints, SourceBreakpoint, SourceBreakpointsPayload
 from .exception_filters import ExceptionBreakpointsFilters, ExceptionBreakpointsFilter
 
 class IBreakpoint (Protocol):
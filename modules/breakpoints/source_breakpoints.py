@@ -7,7 +7,9 @@ from ..import dap
 
 import sublime
 import os
+import bisect
 
+from ..dap.transport import EncodedArguments
 from .breakpoint import Breakpoint
 
 # note: Breakpoint lines are 1 based (sublime lines are 0 based)
@@ -19,14 +21,16 @@ class SourceBreakpoint(Breakpoint):
 
 		SourceBreakpoint.next_id += 1
 		self.id = SourceBreakpoint.next_id
-		self.region_name = 'bp{}'.format(self.id)
-		self.views: list[SourceBreakpointView] = []
 
 		self.dap = dap.SourceBreakpoint(line, column, None, None, None)
 		self._file = file
 		self.enabled = enabled
 		self.breakpoints = breakpoints
 
+		# where this breakpoint is in the SourceBreakpoints index or None if it is not in the index
+		self.key: tuple[int, int]|None = None
+		self.location: tuple[str, int, int|None]|None = None
+
 	@property
 	def tag(self):
 		if self.column:
@@ -91,77 +95,204 @@ class SourceBreakpoint(Breakpoint):
 	def scope(self):
 		return 'text'
 
-	def update_views(self):
-		for view in self.views:
-			view.render()
+	def __lt__(self, other: SourceBreakpoint):
+		return (self.file, self.line, self.column or 0) < (other.file, other.line, other.column or 0)
 
-	def add_to_view(self, view: sublime.View):
-		for old_view in self.views:
-			if old_view.view.id() == view.id():
-				old_view.render()
-				return
+class SourceBreakpointsPayload:
+	'''
+		The setBreakpoints arguments for the breakpoints in a file
 
-		def show_edit_menu():
-			self.breakpoints.edit(self).run()
+		Computed once when the file changes and shared by every session and child session the file is sent to, the arguments are only encoded once a session sends them.
+	'''
 
-		self.views.append(SourceBreakpointView(self, view, show_edit_menu))
+	def __init__(self, file: str, breakpoints: list[SourceBreakpoint]):
+		self.file = file
+		self.breakpoints = breakpoints
+		self.enabled = [breakpoint for breakpoint in breakpoints if breakpoint.enabled]
+		self.arguments = EncodedArguments({
+			'source': { 'path': file },
+			'breakpoints': [breakpoint.dap for breakpoint in self.enabled],
+			'lines': [breakpoint.dap.line for breakpoint in self.enabled], # for backwards compat
+		})
+
+	# the same arguments for the same breakpoints do not need to be sent to a session again
+	@property
+	def key(self) -> tuple[str, tuple[int, ...]]:
+		return (self.arguments.encoded, tuple(breakpoint.id for breakpoint in self.enabled))
+
+# sublime merges empty regions at the same position so breakpoints on the same line share a single region
+def drawn_lines(drawn: list[tuple[SourceBreakpoint, int]]) -> list[int]:
+	return sorted({ line for _, line in drawn })
+
+# the row each drawn line is on now when some of the regions were merged by edits to the view, for instance deleting the lines between two breakpoints
+# regions stay in order so the drawn lines that merged are next to each other
+# edits move whole blocks of lines by the same amount so lines are matched to regions with the fewest changes in how far a line moved from one line to the next
+def merged_lines(lines: list[int], rows: list[int]) -> list[int]:
+	merged = len(lines) - len(rows)
+
+	# cost[s] is (changes, distance) for matching the lines so far when `s` of them were merged into the region before them, line i is matched to region i - s
+	cost: list[tuple[int, int]|None] = [(0, 0)] + [None] * merged
+	previous: list[list[int]] = []
+
+	for i in range(1, len(lines)):
+		next_cost: list[tuple[int, int]|None] = [None] * (merged + 1)
+		next_previous = [0] * (merged + 1)
+
+		for s in range(max(i - len(rows) + 1, 0), min(i, merged) + 1):
+			moved = rows[i - s] - lines[i]
+
+			# the previous line was either matched to the region before this one or to the same region
+			for p in (s, s - 1):
+				if p < 0 or not (c := cost[p]):
+					continue
+
+				distance = abs(moved - (rows[i - 1 - p] - lines[i - 1]))
+				c = (c[0] + (distance != 0), c[1] + distance)
+				if not next_cost[s] or c < next_cost[s]: #type: ignore
+					next_cost[s] = c
+					next_previous[s] = p
+
+		cost = next_cost
+		previous.append(next_previous)
+
+	s = merged
+	matched = [0] * len(lines)
+	for i in range(len(lines) - 1, -1, -1):
+		matched[i] = rows[i - s]
+		if i:
+			s = previous[i - 1][s]
+
+	return matched
+
+class SourceBreakpointsView:
+	'''
+		Draws the breakpoints of a file into a view
+
+		Breakpoints with the same icon share a single set of regions so drawing a file with hundreds of breakpoints is a handful of add_regions calls.
+		Only the icons whose breakpoints changed since the last render are redrawn.
+	'''
+
+	def __init__(self, breakpoints: SourceBreakpoints, view: sublime.View):
+		self.breakpoints = breakpoints
+		self.view = view
 
-	def clear_views(self):
-		for view in self.views:
-			view.dispose()
-		self.views = []
+		# region key -> breakpoints and the line each was drawn at
+		self.rendered: dict[str, list[tuple[SourceBreakpoint, int]]] = {}
 
-	def __lt__(self, other: SourceBreakpoint):
-		return (self.file, self.line, self.column or 0) < (other.file, other.line, other.column or 0)
+		# breakpoint id -> (phantom, position, image) for column breakpoints
+		self.column_phantoms: dict[int, tuple[ui.RawPhantom, int, str]] = {}
 
-class SourceBreakpointView:
-	def __init__(self, breakpoint: SourceBreakpoint, view: sublime.View, on_click_inline: Callable[[], None]):
-		self.breakpoint = breakpoint
-		self.view = view
-		self.column_phantom: ui.RawPhantom|None = None
-		self.on_click_inline = on_click_inline
-		self.render()
-
-	def render(self):
-		self.dispose()
-
-		image = self.breakpoint.image
-		line = self.breakpoint.line
-		column = self.breakpoint.column
-
-		line_start_point = self.view.text_point(line - 1, 0)
-		self.view.add_regions(self.breakpoint.region_name, [sublime.Region(line_start_point)], scope=self.breakpoint.scope(), icon=image.file, flags=sublime.HIDDEN)
-
-		if column and self.breakpoint.dap.column:
-			html: str = f'''
-				<body id="debugger">
-					<style>
-						img {{
-							width: 1.25rem;
-							height: 1.25rem;
-						}}
-					</style>
-					<a href="">
-						<img src="{self.breakpoint.image.data()}" />
-					</a>
-					
-				</body>
-			'''
-			column_point = self.view.text_point(line - 1, column - 1)
-			self.column_phantom = ui.RawPhantom(self.view, sublime.Region(column_point), html, on_navigate=lambda _: self.on_click_inline())
+	def render(self, breakpoints: list[SourceBreakpoint]):
+		kinds: dict[str, list[tuple[SourceBreakpoint, int]]] = {}
+		icons: dict[str, str] = {}
+
+		for breakpoint in breakpoints:
+			image = breakpoint.image
+			key = f'debugger.breakpoints.{image.file}'
+			kinds.setdefault(key, []).append((breakpoint, breakpoint.line))
+			icons[key] = image.file
+
+		for key in self.rendered.keys() - kinds.keys():
+			self.view.erase_regions(key)
+
+		for key, drawn in kinds.items():
+			if self.rendered.get(key) == drawn:
+				continue
+
+			regions = [sublime.Region(self.view.text_point(line - 1, 0)) for line in drawn_lines(drawn)]
+			self.view.add_regions(key, regions, scope='text', icon=icons[key], flags=sublime.HIDDEN)
+
+		self.rendered = kinds
+		self.render_column_phantoms(breakpoints)
+
+	def render_column_phantoms(self, breakpoints: list[SourceBreakpoint]):
+		column_phantoms: dict[int, tuple[ui.RawPhantom, int, str]] = {}
+
+		for breakpoint in breakpoints:
+			column = breakpoint.column
+			if not column or not breakpoint.dap.column:
+				continue
+
+			image = breakpoint.image.data()
+			position = self.view.text_point(breakpoint.line - 1, column - 1)
+
+			existing = self.column_phantoms.pop(breakpoint.id, None)
+			if existing and existing[1] == position and existing[2] == image:
+				column_phantoms[breakpoint.id] = existing
+				continue
+
+			if existing:
+				existing[0].dispose()
+
+			column_phantoms[breakpoint.id] = (self.column_phantom(breakpoint, position, image), position, image)
+
+		for phantom, _, _ in self.column_phantoms.values():
+			phantom.dispose()
+
+		self.column_phantoms = column_phantoms
+
+	def column_phantom(self, breakpoint: SourceBreakpoint, position: int, image: str):
+		html: str = f'''
+			<body id="debugger">
+				<style>
+					img {{
+						width: 1.25rem;
+						height: 1.25rem;
+					}}
+				</style>
+				<a href="">
+					<img src="{image}" />
+				</a>
+				
+			</body>
+		'''
+		return ui.RawPhantom(self.view, sublime.Region(position), html, on_navigate=lambda _: self.breakpoints.edit(breakpoint).run())
+
+	# the line each breakpoint is on in the view which may have changed since it was drawn if the view was edited
+	def lines(self) -> Iterator[tuple[SourceBreakpoint, int]]:
+		for key, drawn in self.rendered.items():
+			regions = self.view.get_regions(key)
+			lines = drawn_lines(drawn)
+
+			# the regions were removed or there are regions that were not drawn so there is no way to tell where the lines went
+			if not regions or len(regions) > len(lines):
+				continue
+
+			# regions stay in the same order as the lines they were drawn at
+			rows = [self.view.rowcol(region.a)[0] + 1 for region in regions]
+			if len(regions) < len(lines):
+				rows = merged_lines(lines, rows)
 
+			moved = dict(zip(lines, rows))
+			for breakpoint, line in drawn:
+				yield breakpoint, moved[line]
 
 	def dispose(self):
-		self.view.erase_regions(self.breakpoint.region_name)
-		if self.column_phantom:
-			self.column_phantom.dispose()
-			self.column_phantom = None
+		for key in self.rendered:
+			self.view.erase_regions(key)
+		for phantom, _, _ in self.column_phantoms.values():
+			phantom.dispose()
+
+		self.rendered = {}
+		self.column_phantoms = {}
 
 class SourceBreakpoints:
 	def __init__(self):
-		self.breakpoints: list[SourceBreakpoint] = []
+		# breakpoints for each file sorted by line and column along with the (line, column) of each one so they can be searched with bisect
+		self.files: dict[str, list[SourceBreakpoint]] = {}
+		self.keys: dict[str, list[tuple[int, int]]] = {}
+
+		# breakpoints by the location they were added at which may differ from where they ended up after being verified
+		self.locations: dict[tuple[str, int, int|None], SourceBreakpoint] = {}
+
 		self.on_updated: core.Event[SourceBreakpoint] = core.Event()
-		self.on_send: core.Event[SourceBreakpoint] = core.Event()
+		# sent once per changed file with the breakpoints in that file
+		self.on_send: core.Event[SourceBreakpointsPayload] = core.Event()
+		# same as on_send but also for files where breakpoints only moved because the view was edited which are not sent to the debug adapters, see `sync`
+		self.on_changed: core.Event[str, list[SourceBreakpoint]] = core.Event()
+
+		# the payload for each file since it last changed, see `payload`
+		self.payloads: dict[str, SourceBreakpointsPayload] = {}
 
 		self.disposeables = [
 			core.on_view_load.add(self.on_view_load),
@@ -172,19 +303,85 @@ class SourceBreakpoints:
 		self.sync_dirty_scheduled = False
 		self.dirty_views: dict[int, sublime.View] = {}
 
-	def __iter__(self):
-		return iter(self.breakpoints)
+		# files with changes that have not been sent yet, see `send_dirty`
+		self.send_dirty_scheduled = False
+		self.dirty_files: set[str] = set()
+		self.moved_files: set[str] = set()
+
+		# views breakpoints are drawn into by view id and the files that need to be redrawn, see `render_dirty`
+		self.views: dict[int, SourceBreakpointsView] = {}
+		self.render_dirty_scheduled = False
+		self.render_dirty_files: set[str] = set()
+
+	def __iter__(self) -> Iterator[SourceBreakpoint]:
+		for file in sorted(self.files):
+			yield from self.files[file]
+
+	def index(self, breakpoint: SourceBreakpoint):
+		file = breakpoint.file
+		key = (breakpoint.line, breakpoint.column or 0)
+
+		keys = self.keys.setdefault(file, [])
+		index = bisect.bisect_right(keys, key)
+		keys.insert(index, key)
+		self.files.setdefault(file, []).insert(index, breakpoint)
+
+		breakpoint.key = key
+		breakpoint.location = (file, breakpoint.dap.line, breakpoint.dap.column)
+		self.locations.setdefault(breakpoint.location, breakpoint)
+		self.payloads.pop(file, None)
+
+	def unindex(self, breakpoint: SourceBreakpoint):
+		assert breakpoint.key and breakpoint.location
+		file = breakpoint.file
+		keys = self.keys[file]
+		breakpoints = self.files[file]
+
+		# there can be multiple breakpoints with the same key
+		index = bisect.bisect_left(keys, breakpoint.key)
+		while breakpoints[index] is not breakpoint:
+			index += 1
+
+		del keys[index]
+		del breakpoints[index]
+		if not breakpoints:
+			del self.keys[file]
+			del self.files[file]
+
+		if self.locations.get(breakpoint.location) is breakpoint:
+			del self.locations[breakpoint.location]
+
+		self.payloads.pop(file, None)
+
+		breakpoint.key = None
+		breakpoint.location = None
+
+	# moves the breakpoint within the index if its line or column changed
+	def reindex(self, breakpoint: SourceBreakpoint):
+		if not breakpoint.key:
+			return
+
+		key = (breakpoint.line, breakpoint.column or 0)
+		location = (breakpoint.file, breakpoint.dap.line, breakpoint.dap.column)
+		if key != breakpoint.key or location != breakpoint.location:
+			self.unindex(breakpoint)
+			self.index(breakpoint)
 
 	def into_json(self) -> list[Any]:
-		return list(map(lambda b: b.into_json(), self.breakpoints))
+		return list(map(lambda b: b.into_json(), self))
 
 	def load_json(self, json: list[Any]):
-		self.breakpoints = list(map(lambda j: SourceBreakpoint.from_json(self, j), json))
-		self.breakpoints.sort()
+		self.files = {}
+		self.keys = {}
+		self.locations = {}
+		self.payloads = {}
+		for j in json:
+			self.index(SourceBreakpoint.from_json(self, j))
+
 		self.add_breakpoints_to_current_view()
 
 	def clear_breakpoint_result(self, session: dap.Session):
-		for breakpoint in self.breakpoints:
+		for breakpoint in list(self):
 			if breakpoint.clear_breakpoint_result(session):
 				self.updated(breakpoint, send=False)
 
@@ -193,16 +390,52 @@ class SourceBreakpoints:
 		self.updated(breakpoint, send=False)
 
 	def updated(self, breakpoint: SourceBreakpoint, send: bool=True):
-		breakpoint.update_views()
+		self.reindex(breakpoint)
+		self.render_dirty_files.add(breakpoint.file)
+		if not self.render_dirty_scheduled:
+			self.render_dirty_scheduled = True
+			core.call_soon(self.render_dirty)
+
 		self.on_updated(breakpoint)
 		if send:
-			self.on_send(breakpoint)
+			self.payloads.pop(breakpoint.file, None)
+			self.dirty_files.add(breakpoint.file)
+			self.schedule_send_dirty()
+
+	def schedule_send_dirty(self):
+		if not self.send_dirty_scheduled:
+			self.send_dirty_scheduled = True
+			core.call_soon(self.send_dirty)
+
+	# changes made in the same tick are sent together as a single list of breakpoints for each file that changed
+	def send_dirty(self):
+		self.send_dirty_scheduled = False
+		dirty_files = self.dirty_files
+		moved_files = self.moved_files
+		self.dirty_files = set()
+		self.moved_files = set()
+
+		for file in dirty_files:
+			self.on_send(self.payload(file))
+
+		for file in dirty_files | moved_files:
+			self.on_changed(file, self.breakpoints_for_file(file))
+
+	def payload(self, file: str) -> SourceBreakpointsPayload:
+		if payload := self.payloads.get(file):
+			return payload
+
+		payload = SourceBreakpointsPayload(file, self.breakpoints_for_file(file))
+		if payload.breakpoints:
+			self.payloads[file] = payload
+		return payload
 
 	def dispose(self):
 		for d in self.disposeables:
 			d.dispose()
-		for bp in self.breakpoints:
-			bp.clear_views()
+		for view in self.views.values():
+			view.dispose()
+		self.views = {}
 
 	def edit(self, breakpoint: SourceBreakpoint):
 		def set_log(value: str):
@@ -282,14 +515,13 @@ class SourceBreakpoints:
 
 		ui.InputList(items).run()
 
-	# todo: fix... this is going to trigger a ton of breakpoint requests if the debugger is active
+	# each file that had breakpoints is sent once, see `send_dirty`
 	def remove_all(self):
-		while self.breakpoints:
-			self.remove(self.breakpoints[0])
+		for breakpoint in list(self):
+			self.remove(breakpoint)
 
 	def remove(self, breakpoint: SourceBreakpoint):
-		breakpoint.clear_views()
-		self.breakpoints.remove(breakpoint)
+		self.unindex(breakpoint)
 		self.updated(breakpoint)
 
 	def toggle_enabled(self, breakpoint: SourceBreakpoint):
@@ -304,39 +536,44 @@ class SourceBreakpoints:
 			self.add_breakpoint(file, line, column)
 
 	def breakpoints_for_file(self, file: str) -> list[SourceBreakpoint]:
-		r = list(filter(lambda b: b.file == file, self.breakpoints))
-		return r
-
-	def breakpoints_per_file(self) -> dict[str, list[SourceBreakpoint]]:
-		bps: dict[str, list[SourceBreakpoint]] = {}
-		for breakpoint in self.breakpoints:
-			if breakpoint.file in bps:
-				bps[breakpoint.file].append(breakpoint)
-			else:
-				bps[breakpoint.file] = [breakpoint]
-		return bps
+		return list(self.files.get(file, []))
+
+	# a copy of the index so changes to the breakpoints do not change what the caller is iterating over
+	def breakpoints_per_file(self) -> dict[str, tuple[SourceBreakpoint, ...]]:
+		return { file: tuple(breakpoints) for file, breakpoints in self.files.items() }
 
 	def get_breakpoint(self, file: str, line: int, column: int|None = None):
-		for b in self.breakpoints:
-			if b.file == file and b.line == line and b.column == column:
-				return b
+		keys = self.keys.get(file)
+		if not keys:
+			return None
+
+		key = (line, column or 0)
+		breakpoints = self.files[file]
+		index = bisect.bisect_left(keys, key)
+		while index < len(keys) and keys[index] == key:
+			if breakpoints[index].column == column:
+				return breakpoints[index]
+			index += 1
 		return None
 
 	def get_breakpoints_on_line(self, file: str, line: int) -> list[SourceBreakpoint]:
-		r = list(filter(lambda b: b.file == file and b.line == line, self.breakpoints))
-		return r
+		keys = self.keys.get(file)
+		if not keys:
+			return []
+
+		start = bisect.bisect_left(keys, (line,))
+		end = bisect.bisect_left(keys, (line + 1,), start)
+		return self.files[file][start:end]
 
 	def add_breakpoint(self, file: str, line: int, column: int|None = None):
 		# ensure we don't add a breakpoint that is at the same location
 		# note: compare to the uderlying dap module since breakpoint.line/column reflect the actual location of the breakpoint
 		# after it has been verified
-		for breakpoint in self.breakpoints:
-			if breakpoint.file == file and breakpoint.dap.line == line and breakpoint.dap.column == column:
-				return
+		if (file, line, column) in self.locations:
+			return
 
 		breakpoint = SourceBreakpoint(self, file, line, column, True)
-		self.breakpoints.append(breakpoint)
-		self.breakpoints.sort()
+		self.index(breakpoint)
 		self.updated(breakpoint)
 		self.add_breakpoints_to_current_view()
 		return breakpoint
@@ -364,37 +601,53 @@ class SourceBreakpoints:
 
 	def sync_dirty(self):
 		self.sync_dirty_scheduled = False
-		for view in self.dirty_views.values():
+		dirty_views = self.dirty_views
+		self.dirty_views = {}
+
+		for view in dirty_views.values():
 			self.sync(view)
 
 	# changes the data model to match up with the view regions
-	# adds any breakpoints found in the data model that are not found on the view
 	def sync(self, view: sublime.View):
 		file = view.file_name()
-		if not file:
+		breakpoints_view = self.views.get(view.id())
+		if not file or not breakpoints_view:
 			return
 
-		dirty = False
-		for b in self.breakpoints:
-			if b.file != file:
-				continue
-			identifier = b.region_name
-			regions = view.get_regions(identifier)
-			if len(regions) == 0:
-				b.add_to_view(view)
-				dirty = True
-			else:
-				dirty = True
-				line = view.rowcol(regions[0].a)[0] + 1
-				if line != b.line:
-					dirty = True
-					b.dap.line = line
-					self.updated(b, send=False)
+		for breakpoint, line in list(breakpoints_view.lines()):
+			if line != breakpoint.line:
+				breakpoint.dap.line = line
+				self.updated(breakpoint, send=False)
+
+				# the new lines are not sent to the debug adapters but they still need to be saved
+				self.moved_files.add(file)
+				self.schedule_send_dirty()
 
 	# moves the view regions to match up with the data model
 	def sync_from_breakpoints(self, view: sublime.View):
 		file = view.file_name()
-		for breakpoint in self.breakpoints:
-			if breakpoint.file != file:
+		if not file:
+			return
+
+		breakpoints_view = self.views.get(view.id())
+		if not breakpoints_view:
+			breakpoints_view = SourceBreakpointsView(self, view)
+			self.views[view.id()] = breakpoints_view
+
+		breakpoints_view.render(self.files.get(file, []))
+
+	# changes made in the same tick are drawn together
+	def render_dirty(self):
+		self.render_dirty_scheduled = False
+		files = self.render_dirty_files
+		self.render_dirty_files = set()
+
+		for id, breakpoints_view in list(self.views.items()):
+			view = breakpoints_view.view
+			if not view.is_valid():
+				del self.views[id]
 				continue
-			breakpoint.add_to_view(view)
+
+			file = view.file_name()
+			if file in files:
+				breakpoints_view.render(self.files.get(file, []))
@@ -135,6 +135,10 @@ class Commands:
 		action=lambda debugger: debugger.console.protocol.open(),
 		flags=Command.menu_widget|Command.menu_commands|Command.menu_main,
 	)
+	show_protocol_statistics = CommandDebugger (
+		name='Show Protocol Statistics',
+		action_with_arguments=lambda debugger, args: debugger.show_protocol_statistics(args.get('file')),
+	)
 	add_watch_expression = CommandDebugger (
 		name='Add Watch Expression',
 		action=lambda debugger: debugger.add_watch_expression(),
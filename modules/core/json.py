@@ -25,4 +25,7 @@ class JSONEncoder(json.JSONEncoder):
 	def default(self, o: Any):
 		if dataclasses.is_dataclass(o):
 			return dataclasses.asdict(o)
+		# the slotted types from dap/decoder.py
+		if into_json := getattr(o, 'into_json', None):
+			return into_json()
 		return super().default(o)
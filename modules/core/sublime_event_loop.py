@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import threading
 import sublime
 
 class Handle:
@@ -17,6 +18,11 @@ class Handle:
 		self.args = None
 
 class SublimeEventLoop (asyncio.AbstractEventLoop):
+	def __init__(self):
+		self._ready: list[Handle] = []
+		self._ready_lock = threading.Lock()
+		self._ready_scheduled = False
+
 	def run_forever(self):
 		raise NotImplementedError
 
@@ -42,11 +48,32 @@ class SublimeEventLoop (asyncio.AbstractEventLoop):
 	def _timer_handle_cancelled(self, handle):
 		raise NotImplementedError
 
+	# callbacks are queued and run in batches so that a burst of callbacks only costs a single set_timeout
+	# anything queued while a batch is running is run in the next batch which keeps the same ordering as calling set_timeout for each callback
 	def call_soon(self, callback, *args, context=None):
 		handle = Handle(callback, args)
-		sublime.set_timeout(handle, 0)
+		with self._ready_lock:
+			self._ready.append(handle)
+			if self._ready_scheduled:
+				return handle
+			self._ready_scheduled = True
+
+		sublime.set_timeout(self._run_ready, 0)
 		return handle
 
+	def _run_ready(self):
+		with self._ready_lock:
+			ready = self._ready
+			self._ready = []
+			self._ready_scheduled = False
+
+		for handle in ready:
+			try:
+				handle()
+			except Exception:
+				from .log import exception
+				exception()
+
 	def call_later(self, delay, callback, *args, context=None):
 		handle = Handle(callback, args)
 		sublime.set_timeout(handle, delay * 1000)
@@ -55,4 +55,6 @@ from .transports import (
 	Process,
 	StdioTransport,
 	SocketTransport,
+	RecordingTransport,
+	ReplayTransport,
 )
\ No newline at end of file
@@ -0,0 +1,180 @@
+'''
+	Decodes messages from the debug adapter
+
+	Most messages are small and are decoded into DottedDict like everything else but the types that can show up thousands of times in a single message (stack frames, variables etc) are decoded into compact objects with __slots__.
+	Messages with those types are parsed into plain dicts without an object_hook so the c parser does all the work and only then are the items converted.
+	The slotted types are generated from the dataclasses in dap.py so they have the same fields and any field that is missing in the json is None.
+	Nested values that are not one of these types (presentation hints, checksums etc) and fields that are not in dap.py (vendor extensions etc) are left as the plain json, the extra fields are kept in the instance __dict__ which is only created for objects that have them.
+'''
+from __future__ import annotations
+from ..typecheck import *
+
+from ..core.json import DottedDict
+from .import dap
+
+import dataclasses
+import json
+import re
+
+
+class Decoded:
+	'''
+		Base class for the slotted types generated from the dataclasses in dap.py
+		Supports the same attribute and dict style access as DottedDict
+	'''
+	__slots__ = ()
+
+	def get(self, key: str, default: Any = None) -> Any:
+		value = getattr(self, key, None)
+		return default if value is None else value
+
+	def __getitem__(self, key: str) -> Any:
+		return getattr(self, key, None)
+
+	def __eq__(self, other: Any) -> bool:
+		if type(self) is not type(other):
+			return False
+		return all(getattr(self, name) == getattr(other, name) for name in self._fields) and self.__dict__ == other.__dict__ #type: ignore
+
+	__hash__ = None #type: ignore
+
+	def __repr__(self) -> str:
+		return repr(self.into_json())
+
+	def into_json(self) -> dict[str, Any]:
+		json: dict[str, Any] = dict(self.__dict__) #type: ignore
+		for name in self._fields: #type: ignore
+			value = getattr(self, name)
+			if value is None:
+				continue
+			if isinstance(value, Decoded):
+				value = value.into_json()
+			elif isinstance(value, list) and value and isinstance(value[0], Decoded):
+				value = [v.into_json() for v in value]
+			json[name] = value
+		return json
+
+
+hot_types = ('Source', 'StackFrame', 'Scope', 'Variable', 'Thread', 'Module', 'OutputEvent')
+
+decoders: dict[str, Callable[[dict[str, Any]], Any]] = {}
+
+def decoder(cls: type) -> Callable[[dict[str, Any]], Any]:
+	name = cls.__name__
+	if existing := decoders.get(name):
+		return existing
+
+	fields = [field for field in dataclasses.fields(cls)]
+	names = tuple(field.name for field in fields)
+	slotted = type(name, (Decoded,), { '__slots__': names + ('__dict__',), '_fields': names, '__module__': __name__ })
+
+	# builds a function that assigns each field directly instead of looping over the fields for every object
+	namespace: dict[str, Any] = { 'new': object.__new__, 'cls': slotted, 'decoders': decoders, 'names': frozenset(names) }
+	lines = ['def decode(json):', '	get = json.get', '	self = new(cls)']
+
+	for field in fields:
+		type_name = str(field.type)
+		if match := re.search(r'List\[(\w+)\]', type_name):
+			nested = match.group(1)
+			if nested in hot_types:
+				lines.append(f'	value = get({field.name!r})')
+				lines.append(f'	self.{field.name} = [decoders[{nested!r}](v) if type(v) is dict else v for v in value] if type(value) is list else value')
+				continue
+
+		elif match := re.search(r'\b(\w+)\]*$', type_name):
+			nested = match.group(1)
+			if nested in hot_types:
+				lines.append(f'	value = get({field.name!r})')
+				lines.append(f'	self.{field.name} = decoders[{nested!r}](value) if type(value) is dict else value')
+				continue
+
+		lines.append(f'	self.{field.name} = get({field.name!r})')
+
+	lines.append('	if not json.keys() <= names:')
+	lines.append('		self.__dict__.update((key, value) for key, value in json.items() if key not in names)')
+	lines.append('	return self')
+	exec('\n'.join(lines), namespace)
+
+	decode = namespace['decode']
+	decode.cls = slotted
+	decoders[name] = decode
+	return decode
+
+
+for cls in (dap.Source, dap.StackFrame, dap.Scope, dap.Variable, dap.Thread, dap.Module, dap.OutputEvent):
+	decoder(cls)
+
+
+# response command -> (body key, type of each item in the list)
+responses: dict[str, tuple[str, str]] = {
+	'stackTrace': ('stackFrames', 'StackFrame'),
+	'scopes': ('scopes', 'Scope'),
+	'variables': ('variables', 'Variable'),
+	'threads': ('threads', 'Thread'),
+	'modules': ('modules', 'Module'),
+	'loadedSources': ('sources', 'Source'),
+}
+
+# event -> (body key, type) or (None, type) if the body itself is the type
+events: dict[str, tuple[str|None, str]] = {
+	'output': (None, 'OutputEvent'),
+	'module': ('module', 'Module'),
+	'loadedSource': ('source', 'Source'),
+}
+
+hot_names = frozenset(responses) | frozenset(events)
+
+# finds the command or event of a message without parsing it
+# this is only a hint since a "command" or "event" key in the body could come before the one for the message
+message_name = re.compile(r'"(?:command|event)"\s*:\s*"(\w+)"')
+
+def decode_message(contents: str) -> Any:
+	match = message_name.search(contents)
+	if not match or match.group(1) not in hot_names:
+		return json.loads(contents, object_hook=DottedDict)
+
+	# hot messages are parsed into plain dicts by the c parser and only the items are converted into slotted objects
+	return decode_hot_message(json.loads(contents))
+
+def decode_hot_message(message: dict[str, Any]) -> Any:
+	body = message.get('body')
+	kind = None
+
+	message_type = message.get('type')
+	if message_type == 'response' and message.get('success'):
+		kind = responses.get(message.get('command'))
+	elif message_type == 'event':
+		kind = events.get(message.get('event'))
+
+	if not kind or type(body) is not dict:
+		return dotted(message)
+
+	key, name = kind
+	decode = decoders[name]
+
+	message['body'] = None
+	message = dotted(message)
+
+	if key is None:
+		message['body'] = decode(body)
+		return message
+
+	items = body.pop(key, None)
+	body = dotted(body)
+
+	if type(items) is list:
+		body[key] = [decode(item) if type(item) is dict else dotted(item) for item in items]
+	elif type(items) is dict:
+		body[key] = decode(items)
+	else:
+		body[key] = items
+
+	message['body'] = body
+	return message
+
+def dotted(value: Any) -> Any:
+	if type(value) is dict:
+		return DottedDict({ key: dotted(v) for key, v in value.items() })
+	if type(value) is list:
+		return [dotted(v) for v in value]
+	return value
@@ -3,17 +3,21 @@ from __future__ import annotations
 from ..typecheck import *
 
 from enum import IntEnum
+import time
+from collections import deque
 
 from ..import core
 from .import dap
 
 from ..watch import Watch
+from ..settings import Settings
 from .debugger import Debugger
 from .error import Error
 
 from ..breakpoints import (
 	Breakpoints,
 	SourceBreakpoint,
+	SourceBreakpointsPayload,
 	Breakpoint,
 )
 
@@ -28,6 +32,7 @@ from .configuration import (
 )
 
 from .transport import TransportProtocol, TransportProtocolListener
+from .transports import RecordingTransport
 
 class SessionListener (Protocol):
 	async def on_session_task_request(self, session: Session, task: TaskExpanded): ...
@@ -61,6 +66,9 @@ class Session(TransportProtocolListener):
 	stopped_reason_terminated_event=4
 	stopped_reason_manual=5
 
+	# the maximum number of files setBreakpoints is requested for at the same time when the session starts
+	concurrent_breakpoint_files = 8
+
 	def __init__(self, 
 		adapter_configuration: AdapterConfiguration, 
 		configuration: ConfigurationExpanded, 
@@ -92,15 +100,19 @@ class Session(TransportProtocolListener):
 
 		self.breakpoints = breakpoints
 		self.breakpoints_for_id: dict[int, Breakpoint] = {}
+
+		# the key of the last setBreakpoints payload sent for each file, see `set_breakpoints_for_file`
+		self.sent_source_breakpoints: dict[str, tuple[str, tuple[int, ...]]] = {}
 		self.breakpoints.data.on_send.add(self.on_send_data_breakpoints)
 		self.breakpoints.function.on_send.add(self.on_send_function_breakpoints)
 		self.breakpoints.filters.on_send.add(self.on_send_filters)
-		self.breakpoints.source.on_send.add(self.on_send_source_breakpoint)
+		self.breakpoints.source.on_send.add(self.on_send_source_breakpoints)
 
 		self.watch = watch
 		self.watch.on_added.add(lambda expr: self.watch.evaluate_expression(self, expr))
 
 		self._transport: Optional[TransportProtocol] = None
+		self.adapter_start_time: float|None = None
 
 		self.launching_async: Optional[core.Future] = None
 		self.capabilities = dap.Capabilities()
@@ -109,6 +121,27 @@ class Session(TransportProtocolListener):
 		self.stepping = False
 		self.stepping_stopped = False
 
+		# advanced every time the program stops or continues, see `advance_generation`
+		self.generation = 0
+
+		# variables requests keyed by (variablesReference, start, count, filter) so everything showing the same variables shares one request
+		# variablesReferences are only valid until the program continues so this is cleared along with the generation
+		self.variables_cache: dict[tuple[int, int|None, int|None, str|None], core.Future[list[dap.Variable]]] = {}
+		self.variables_cache_hits = 0
+		self.variables_cache_misses = 0
+
+		# time of the last stopped event and how long it took until the panels were updated for it
+		self.stopped_time: float|None = None
+		self.stop_to_paint_time: float|None = None
+
+		# fast stepping, see `step`
+		self.step_thread: Thread|None = None
+		self.step_in_flight = False
+		self.queued_steps: list[str] = []
+		self.hidden_stop: dap.StoppedEvent|None = None
+		self.deferred_stop: Any|None = None
+		self.step_times: deque[float] = deque(maxlen=64)
+
 		self._state = Session.State.STARTING
 		self._status = 'Starting'
 
@@ -117,6 +150,8 @@ class Session(TransportProtocolListener):
 		self.complete: core.Future[None] = core.Future()
 
 		self.threads_for_id: dict[int, Thread] = {}
+		self.refreshing_threads: core.Future[None]|None = None
+		self.refresh_threads_queued = False
 		self.all_threads_stopped = False
 		self.selected_explicitly = False
 		self.selected_thread = None
@@ -182,11 +217,19 @@ class Session(TransportProtocolListener):
 			return
 
 		self._change_status('Starting')
+		started = time.perf_counter()
 		try:
 			transport = await self.adapter_configuration.start(log=self.log, configuration=self.configuration)
 		except Exception as e:
 			raise core.Error(f'Unable to start adapter: {e}')
 
+		self.adapter_start_time = time.perf_counter() - started
+		self.log.log('transport', f'⟸ process/connected :: {self.adapter_configuration.type} in {self.adapter_start_time * 1000:.1f}ms')
+
+		# records the session so it can be played back later with the replay adapter
+		if record_protocol := self.configuration.get('record_protocol'):
+			transport = RecordingTransport(transport, record_protocol)
+
 		self._transport = TransportProtocol(
 			transport,
 			self,
@@ -201,9 +244,10 @@ class Session(TransportProtocolListener):
 			'linesStartAt1': True,
 			'columnsStartAt1': True,
 			'supportsVariableType': True,
-			'supportsVariablePaging': False,
+			'supportsVariablePaging': True,
 			'supportsRunInTerminalRequest': True,
 			'supportsMemoryReferences': True,
+			'supportsInvalidatedEvent': True,
 			'locale': 'en-us'
 		})
 		self.capabilities = capabilities
@@ -236,15 +280,35 @@ class Session(TransportProtocolListener):
 		self._change_status('Running')
 		self.state = Session.State.RUNNING
 
-	async def request(self, command: str, arguments: Any) -> Any:
+	async def request(self, command: str, arguments: Any, generation: int|None = None) -> Any:
 		if not self._transport:
 			raise core.Error(f'Debug Session {self.status}')
 
-		return await self._transport.send_request_asyc(command, arguments)
+		return await self._transport.send_request_asyc(command, arguments, generation)
+
+	# Anything requested for a previous stop (stack traces, scopes, variables, watch expressions) is no longer useful once the program stops again or continues.
+	# Those requests are cancelled so the adapter can stop working on them and anyone awaiting them gets a CancelledError instead of updating the ui with stale information.
+	def advance_generation(self):
+		self.generation += 1
+		self.variables_cache.clear()
+		if self._transport:
+			self._transport.cancel_stale_requests(self.generation, bool(self.capabilities.supportsCancelRequest))
 
 	async def wait(self) -> None:
 		await self.complete
 
+	def protocol_statistics(self) -> dict[str, Any]:
+		return {
+			'session': self.name,
+			'type': self.adapter_configuration.type,
+			'adapter_start_ms': self.adapter_start_time * 1000 if self.adapter_start_time is not None else None,
+			'variables_cache_hits': self.variables_cache_hits,
+			'variables_cache_misses': self.variables_cache_misses,
+			'stop_to_paint_ms': self.stop_to_paint_time * 1000 if self.stop_to_paint_time is not None else None,
+			'steps_per_second': self.steps_per_second(),
+			'transport': self._transport.statistics_json() if self._transport else None,
+		}
+
 	async def run_pre_debug_task(self) -> bool:
 		pre_debug_command = self.configuration.pre_debug_task
 		if pre_debug_command:
@@ -295,8 +359,17 @@ class Session(TransportProtocolListener):
 		requests.append(self.set_exception_breakpoint_filters())
 		requests.append(self.set_function_breakpoints())
 
-		for file, filebreaks in self.breakpoints.source.breakpoints_per_file().items():
-			requests.append(self.set_breakpoints_for_file(file, filebreaks))
+		# projects with breakpoints in lots of files would otherwise send every setBreakpoints request at once
+		source = self.breakpoints.source
+		files = list(source.breakpoints_per_file())
+		files.reverse()
+
+		async def set_breakpoints_for_files():
+			while files:
+				await self.set_breakpoints_for_file(source.payload(files.pop()))
+
+		for _ in range(min(Session.concurrent_breakpoint_files, len(files))):
+			requests.append(set_breakpoints_for_files())
 
 		if self.capabilities.supportsDataBreakpoints:
 			requests.append(self.set_data_breakpoints())
@@ -361,16 +434,18 @@ class Session(TransportProtocolListener):
 			if result.id is not None:
 				self.breakpoints_for_id[result.id] = b
 
-	async def set_breakpoints_for_file(self, file: str, breakpoints: list[SourceBreakpoint]) -> None:
+	async def set_breakpoints_for_file(self, payload: SourceBreakpointsPayload) -> None:
 		if not self._transport:
 			return
 
-		enabled_breakpoints: list[SourceBreakpoint] = []
-		dap_breakpoints: list[dap.SourceBreakpoint] = []
-		
-		lines: list[int] = []
+		# nothing changed in this file since it was last sent to this session
+		file = payload.file
+		if self.sent_source_breakpoints.get(file) == payload.key:
+			return
 
-		for breakpoint in breakpoints:
+		self.sent_source_breakpoints[file] = payload.key
+
+		for breakpoint in payload.breakpoints:
 			if breakpoint.dap.hitCondition and not self.capabilities.supportsHitConditionalBreakpoints:
 				self.log.error('This debugger does not support hit condition breakpoints')
 
@@ -380,17 +455,10 @@ class Session(TransportProtocolListener):
 			if breakpoint.dap.condition and not self.capabilities.supportsConditionalBreakpoints:
 				self.log.error('This debugger does not support conditional breakpoints')
 
-			if breakpoint.enabled:
-				enabled_breakpoints.append(breakpoint)
-				dap_breakpoints.append(breakpoint.dap)
-				lines.append(breakpoint.dap.line)
+		enabled_breakpoints = payload.enabled
 
 		try:
-			response = await self.request('setBreakpoints', {
-				'source': { 'path': file },
-				'breakpoints': dap_breakpoints,
-				'lines': lines, # for backwards compat
-			})
+			response = await self.request('setBreakpoints', payload.arguments)
 			results: list[dap.Breakpoint] = response['breakpoints']
 
 			if len(results) != len(enabled_breakpoints):
@@ -402,6 +470,10 @@ class Session(TransportProtocolListener):
 					self.breakpoints_for_id[result.id] = b
 
 		except Error as e:
+			# send the file again next time even if it has not changed
+			if self.sent_source_breakpoints.get(file) == payload.key:
+				del self.sent_source_breakpoints[file]
+
 			for b in enabled_breakpoints:
 				self.breakpoints.source.set_breakpoint_result(b, self, dap.Breakpoint(verified=False, message=str(e)))
 
@@ -414,9 +486,8 @@ class Session(TransportProtocolListener):
 	def on_send_filters(self, any: Any):
 		core.run(self.set_exception_breakpoint_filters())
 
-	def on_send_source_breakpoint(self, breakpoint: SourceBreakpoint) -> None:
-		file = breakpoint.file
-		core.run(self.set_breakpoints_for_file(file, self.breakpoints.source.breakpoints_for_file(file)))
+	def on_send_source_breakpoints(self, payload: SourceBreakpointsPayload) -> None:
+		core.run(self.set_breakpoints_for_file(payload))
 
 	async def stop(self):
 		# this seems to be what the spec says to do in the overview
@@ -487,6 +558,7 @@ class Session(TransportProtocolListener):
 			self.complete.set_result(None)
 
 	def dispose(self) -> None:
+		self.cancel_deferred_stop()
 		self.stop_debug_adapter_session()
 		for disposeable in self.disposeables:
 			disposeable.dispose()
@@ -519,25 +591,101 @@ class Session(TransportProtocolListener):
 		})
 
 	async def step_over(self):
-		self.on_continued_event(dap.ContinuedEvent(self.command_thread.id, False), stepping=True)
-
-		await self.request('next', {
-			'threadId': self.command_thread.id
-		})
+		await self.step('next')
 
 	async def step_in(self):
-		self.on_continued_event(dap.ContinuedEvent(self.command_thread.id, False), stepping=True)
-
-		await self.request('stepIn', {
-			'threadId': self.command_thread.id
-		})
+		await self.step('stepIn')
 
 	async def step_out(self):
-		self.on_continued_event(dap.ContinuedEvent(self.command_thread.id, False), stepping=True)
+		await self.step('stepOut')
+
+	# Fast stepping
+	# While a step is in flight the next step commands are queued and sent as soon as the thread stops instead of being sent to a running thread.
+	# Stops caused by a step only update the stepped thread. The panels, source navigation and selected line are updated for the latest stop once there has been no step for `fast_step_idle_time_ms`
+	async def step(self, command: str):
+		if self.step_in_flight and Settings.fast_step_idle_time_ms:
+			# holding down a step key should not keep the program stepping long after it is released
+			if len(self.queued_steps) < 2:
+				self.queued_steps.append(command)
+			return
 
-		await self.request('stepOut', {
-			'threadId': self.command_thread.id
-		})
+		# hidden_stop is only set while the stop of the previous step has not been shown
+		hidden = self.hidden_stop
+		thread = self.step_thread or self.command_thread
+
+		self.cancel_deferred_stop()
+		self.hidden_stop = None
+		self.step_thread = thread
+		self.step_in_flight = True
+		self.step_times.append(time.perf_counter())
+
+		# the previous stop was never shown so there is nothing in the ui to update
+		if hidden:
+			self.advance_generation()
+			self.stepping = True
+			self.stepping_stopped = False
+			thread.set_continued(None)
+		else:
+			self.on_continued_event(dap.ContinuedEvent(thread.id, False), stepping=True)
+
+		try:
+			await self.request(command, {
+				'threadId': thread.id
+			})
+		except core.Error:
+			self.step_thread = None
+			self.step_in_flight = False
+			self.queued_steps.clear()
+
+			# the thread never moved so show where it is still stopped
+			if hidden:
+				self.stepping_stopped = True
+				self.show_stop(hidden)
+			raise
+
+	# returns True if showing this stop has been deferred
+	def on_step_stopped(self, stopped: dap.StoppedEvent) -> bool:
+		thread = self.step_thread
+		in_flight = self.step_in_flight
+		self.step_in_flight = False
+
+		# anything other than the stepped thread finishing its step (a breakpoint, an exception etc) ends fast stepping and is shown right away
+		is_step = thread and in_flight and stopped.reason == 'step' and stopped.threadId in (None, thread.id)
+		if not thread or not is_step or not Settings.fast_step_idle_time_ms:
+			self.step_thread = None
+			self.queued_steps.clear()
+			return False
+
+		if stopped.allThreadsStopped:
+			self.all_threads_stopped = True
+		thread.set_stopped(stopped)
+		self.hidden_stop = stopped
+
+		if self.queued_steps:
+			core.run(self.step(self.queued_steps.pop(0)))
+		else:
+			self.deferred_stop = core.call_later(Settings.fast_step_idle_time_ms / 1000, self.show_deferred_stop)
+		return True
+
+	def show_deferred_stop(self):
+		stopped = self.hidden_stop
+		self.deferred_stop = None
+		self.hidden_stop = None
+		self.step_thread = None
+		if stopped:
+			self.show_stop(stopped)
+
+	def cancel_deferred_stop(self):
+		if self.deferred_stop:
+			self.deferred_stop.cancel()
+			self.deferred_stop = None
+
+	def steps_per_second(self) -> float|None:
+		if len(self.step_times) < 2:
+			return None
+
+		elapsed = self.step_times[-1] - self.step_times[0]
+		return (len(self.step_times) - 1) / elapsed if elapsed else None
 
 	async def exception_info(self, thread_id: int) -> dap.ExceptionInfoResponseBody:
 		return await self.request('exceptionInfo', {
@@ -553,16 +701,17 @@ class Session(TransportProtocolListener):
 		event = dap.OutputEvent(result.result + '\n', 'console', variablesReference=result.variablesReference)
 		self.listener.on_session_output_event(self, event)
 
-	async def evaluate_expression(self, expression: str, context: str|None) -> dap.EvaluateResponse:
-		frameId: int|None = None
-		if self.selected_frame:
+	# expressions are evaluated in the selected frame unless `frame_id` is given
+	async def evaluate_expression(self, expression: str, context: str|None, generation: int|None = None, frame_id: int|None = None) -> dap.EvaluateResponse:
+		frameId = frame_id
+		if frameId is None and self.selected_frame:
 			frameId = self.selected_frame.id
 
 		response = await self.request('evaluate', {
 			'expression': expression,
 			'context': context,
 			'frameId': frameId,
-		})
+		}, generation)
 
 		# the spec doesn't say this is optional? But it seems that some implementations throw errors instead of marking things as not verified?
 		if response['result'] is None:
@@ -578,11 +727,18 @@ class Session(TransportProtocolListener):
 		})
 		return v
 
-	async def stack_trace(self, thread_id: int) -> list[dap.StackFrame]:
-		body = await self.request('stackTrace', {
+	# requests `levels` frames starting at `start_frame` or all the frames if `levels` is 0
+	# returns the frames and totalFrames if the adapter provided it
+	async def stack_trace(self, thread_id: int, start_frame: int = 0, levels: int = 0) -> tuple[list[dap.StackFrame], int|None]:
+		arguments: dict[str, Any] = {
 			'threadId': thread_id,
-		})
-		return body['stackFrames']
+		}
+		if levels:
+			arguments['startFrame'] = start_frame
+			arguments['levels'] = levels
+
+		body = await self.request('stackTrace', arguments, self.generation)
+		return body['stackFrames'], body.get('totalFrames')
 
 	async def completions(self, text: str, column: int) -> list[dap.CompletionItem]:
 		frameId = None
@@ -611,9 +767,12 @@ class Session(TransportProtocolListener):
 		})
 		return response
 
-	def load_frame(self, frame: Optional[dap.StackFrame]):
+	def load_frame(self, frame: Optional[dap.StackFrame], scopes: list[Variable]|None = None):
 		self.listener.on_session_selected_frame(self, frame)
-		if frame:
+		if frame and scopes is not None:
+			self.variables = scopes
+			self.listener.on_session_updated_variables(self)
+		elif frame:
 			core.run(self.refresh_scopes(frame))
 			core.run(self.watch.evaluate(self, frame))
 		else:
@@ -621,12 +780,16 @@ class Session(TransportProtocolListener):
 			self.listener.on_session_updated_variables(self)
 
 	async def refresh_scopes(self, frame: dap.StackFrame):
+		self.variables = await self.fetch_scopes(frame)
+		self.listener.on_session_updated_variables(self)
+		self.painted()
+
+	async def fetch_scopes(self, frame: dap.StackFrame) -> list[Variable]:
 		body = await self.request('scopes', {
 			'frameId': frame.id
-		})
+		}, self.generation)
 		scopes: list[dap.Scope] = body['scopes']
-		self.variables = [Variable.from_scope(self, scope) for scope in scopes]
-		self.listener.on_session_updated_variables(self)
+		return [Variable.from_scope(self, scope) for scope in scopes]
 
 	async def get_source(self, source: dap.Source) -> tuple[str, str|None]:
 		body = await self.request('source', {
@@ -638,21 +801,42 @@ class Session(TransportProtocolListener):
 		})
 		return body['content'], body.get('mimeType')
 
-	async def get_variables(self, variablesReference: int, without_names: bool = False) -> list[Variable]:
-		response = await self.request('variables', {
-			'variablesReference': variablesReference
-		})
+	async def get_variables(self, variablesReference: int, without_names: bool = False, generation: int|None = None, filter: str|None = None, start: int|None = None, count: int|None = None) -> list[Variable]:
+		key = (variablesReference, start, count, filter)
+		fetched = self.variables_cache.get(key)
+
+		# if the request was cancelled or failed fetch it again
+		if fetched and not fetched.cancelled() and not (fetched.done() and fetched.exception()):
+			self.variables_cache_hits += 1
+		else:
+			self.variables_cache_misses += 1
+			fetched = core.run(self.fetch_variables(variablesReference, generation, filter, start, count))
+			self.variables_cache[key] = fetched
 
-		variables: list[dap.Variable] = response['variables']
+		variables = [Variable.from_variable(self, variablesReference, v, generation) for v in await fetched]
 
 		# vscode seems to remove the names from variables in output events
+		# the cached dap variables are shared so only the wrappers are changed
 		if without_names:
 			for v in variables:
 				v.name = ''
-				v.value = v.value.split('\n')[0]
+				v.value = (v.value or '').split('\n')[0]
+
+		return variables
 
- 
-		return [Variable.from_variable(self, variablesReference, v) for v in variables]
+	async def fetch_variables(self, variablesReference: int, generation: int|None, filter: str|None, start: int|None, count: int|None) -> list[dap.Variable]:
+		args: dict[str, Any] = {
+			'variablesReference': variablesReference
+		}
+		if filter:
+			args['filter'] = filter
+		if start is not None:
+			args['start'] = start
+		if count is not None:
+			args['count'] = count
+
+		response = await self.request('variables', args, generation)
+		return response['variables']
 
 	def on_breakpoint_event(self, event: dap.BreakpointEvent):
 		assert event.breakpoint.id
@@ -679,6 +863,25 @@ class Session(TransportProtocolListener):
 		self.process = event
 		self.listener.on_session_state_changed(self, self.state)
 
+	def on_invalidated_event(self, event: dap.InvalidatedEvent):
+		self.variables_cache.clear()
+
+		# missing or unknown areas should be treated as 'all'
+		areas = set(event.areas or []) & { 'all', 'threads', 'stacks', 'variables' } or { 'all' }
+		everything = 'all' in areas
+
+		if everything or 'threads' in areas:
+			self.refresh_threads()
+
+		if everything or 'stacks' in areas:
+			for thread in self.threads:
+				if thread.stopped and (event.threadId is None or event.threadId == thread.id):
+					thread.set_stopped(thread.stopped_event)
+			self.listener.on_session_updated_threads(self)
+
+		if everything or 'stacks' in areas or 'variables' in areas:
+			self.load_frame(self.selected_frame)
+
 	def on_loaded_source_event(self, event: dap.LoadedSourceEvent):
 		id = f'{event.source.name}~{event.source.path}~{event.source.sourceReference}'
 		if event.reason == 'new':
@@ -772,14 +975,36 @@ class Session(TransportProtocolListener):
 	# after a successfull launch/attach, stopped event, thread event we request all threads
 	# see https://microsoft.github.io/debug-adapter-protocol/overview
 	# updates all the threads from the dap model
-	# @NOTE threads_for_id will retain all threads for the entire session even if they are removed
-	@core.schedule
-	async def refresh_threads(self):
+	# Programs that start lots of threads send a thread event for each one so there is at most one threads request in flight
+	# and anything that asks for a refresh while it is in flight queues a single trailing request
+	def refresh_threads(self) -> core.Future[None]:
+		if self.refreshing_threads:
+			self.refresh_threads_queued = True
+			return self.refreshing_threads
+
+		self.refreshing_threads = core.run(self._refresh_threads())
+		return self.refreshing_threads
+
+	async def _refresh_threads(self):
+		try:
+			while True:
+				self.refresh_threads_queued = False
+				self.update_threads(await self.fetch_threads())
+				if not self.refresh_threads_queued:
+					break
+		finally:
+			self.refreshing_threads = None
+			self.refresh_threads_queued = False
+
+	async def fetch_threads(self) -> list[dap.Thread]:
 		# the Java debugger requires an empty object instead of `None`
 		# See https://github.com/daveleroy/sublime_debugger/pull/106#issuecomment-793802989
 		response = await self.request('threads', {})
 		# See https://github.com/daveleroy/sublime_debugger/pull/106#issuecomment-795949070
-		threads: list[dap.Thread] = response.get('threads', [])
+		return response.get('threads', [])
+
+	def update_threads(self, threads: list[dap.Thread]):
+		previous = self.threads_for_id
 
 		self.threads.clear()
 		for thread in threads:
@@ -787,14 +1012,53 @@ class Session(TransportProtocolListener):
 			t.name = thread.name
 			self.threads.append(t)
 
+		# forget threads that have exited but keep the selected thread and any stopped threads since they may have stopped after this response was sent
+		threads_for_id = { thread.id: thread for thread in self.threads }
+		for thread in previous.values():
+			if thread.id not in threads_for_id and (thread.stopped or thread is self.selected_thread):
+				threads_for_id[thread.id] = thread
+				self.threads.append(thread)
+		self.threads_for_id = threads_for_id
+
 		self.listener.on_session_updated_threads(self)
 
+	# started and exited threads are applied right away and the names are filled in by the next threads request
 	def on_threads_event(self, event: dap.ThreadEvent) -> None:
+		if event.reason == 'started':
+			if event.threadId not in self.threads_for_id:
+				self.threads.append(self.get_thread(event.threadId))
+
+		elif event.reason == 'exited':
+			if thread := self.threads_for_id.pop(event.threadId, None):
+				if thread in self.threads:
+					self.threads.remove(thread)
+				if thread is self.selected_thread:
+					self.select(None, None, explicitly=False)
+					self._refresh_state()
+
+		self.listener.on_session_updated_threads(self)
 		self.refresh_threads()
 
 	def on_stopped_event(self, stopped: dap.StoppedEvent):
+		if not self.keeps_selection(stopped):
+			self.advance_generation()
+
 		self.stepping_stopped = True
+		self.stopped_time = time.perf_counter()
+
+		if self.on_step_stopped(stopped):
+			return
+
+		self.show_stop(stopped)
 
+	# another thread stopping while the explicitly selected thread stays stopped does not change the selected thread or frame so anything requested for them is still valid
+	def keeps_selection(self, stopped: dap.StoppedEvent) -> bool:
+		thread = self.selected_thread
+		if not thread or not thread.stopped or not self.selected_explicitly or stopped.allThreadsStopped:
+			return False
+		return stopped.threadId is not None and stopped.threadId != thread.id
+
+	def show_stop(self, stopped: dap.StoppedEvent):
 		if stopped.allThreadsStopped or False:
 			self.all_threads_stopped = True
 
@@ -815,7 +1079,13 @@ class Session(TransportProtocolListener):
 			# @NOTE this thread might be new and not in self.threads so we must update its state explicitly
 			thread.set_stopped(stopped)
 
-			if not self.selected_explicitly:
+			if not self.selected_explicitly and Settings.prefetch_on_stop:
+				# the state is shown for this thread right away but the panels keep showing the previous frame until everything for this one has loaded
+				self.selected_thread = thread
+				self.selected_frame = None
+				self.prefetch_stop(thread)
+
+			elif not self.selected_explicitly:
 				self.select(thread, None, explicitly=False)
 				self.expand_thread(thread)
 
@@ -827,19 +1097,93 @@ class Session(TransportProtocolListener):
 	async def expand_thread(self, thread: Thread):
 		children = await thread.children()
 		if children and not self.selected_frame and not self.selected_explicitly and self.selected_thread is thread:
-			def first_non_subtle_frame(frames: list[dap.StackFrame]):
-				for frame in frames:
-					if frame.presentationHint != 'subtle':
-						return frame
-				return frames[0]
-
 			frame = first_non_subtle_frame(children)
 			self.select(thread, frame, explicitly=False)
 
 			self.listener.on_session_updated_threads(self)
 			self._refresh_state()
 
+	# Instead of waiting for each round trip before starting the next (stack trace, scopes, variables) this requests everything the panels show for the selected frame as soon as it can be requested
+	# The frame, variables and watch expressions are then updated once everything has arrived, the threads and the state are updated right away by show_stop
+	@core.schedule
+	async def prefetch_stop(self, thread: Thread):
+		generation = self.generation
+
+		try:
+			frames = await thread.children()
+			frame = first_non_subtle_frame(frames) if frames else None
+
+			scopes: list[Variable]|None = None
+			evaluated: Callable[[], None]|None = None
+
+			if frame:
+				fetching_scopes = core.run(self.fetch_scopes(frame))
+				evaluating = core.run(self.watch.evaluations(self, frame))
+
+				scopes = await fetching_scopes
+
+				# the variables panel expands the first scope
+				if scopes:
+					try:
+						await scopes[0].children()
+					except core.Error:
+						...
+
+				evaluated = await evaluating
+
+		# the program continued or stopped again and the requests for this stop were cancelled
+		except core.CancelledError:
+			return
+
+		except core.Error as e:
+			if self.generation != generation:
+				return
+
+			# fallback to fetching things one at a time
+			core.exception(e)
+			self.select(thread, None, explicitly=False)
+			self.expand_thread(thread)
+			return
+
+		# the program continued or stopped again while this was loading
+		if self.generation != generation:
+			return
+
+		if not self.selected_explicitly:
+			self.select(thread, frame, explicitly=False, scopes=scopes)
+			self.listener.on_session_updated_threads(self)
+
+		if evaluated:
+			evaluated()
+
+		self._refresh_state()
+		self.painted()
+
+	# reports how long it took from the stopped event until the panels were updated with everything for that stop
+	def painted(self):
+		if self.stopped_time is None:
+			return
+
+		self.stop_to_paint_time = time.perf_counter() - self.stopped_time
+		self.stopped_time = None
+		self.log.log('transport', f'⟸ stopped/painted :: {self.stop_to_paint_time * 1000:.1f}ms')
+
 	def on_continued_event(self, continued: dap.ContinuedEvent, stepping = False):
+		# @NOTE this thread might be new and not in self.threads so we must update its state explicitly
+		thread = self.get_thread(continued.threadId)
+
+		# in flight requests and cached variables are for the selected thread, other threads that are still stopped keep using them
+		if continued.allThreadsContinued or thread is self.selected_thread:
+			self.advance_generation()
+
+		# some adapters also send a continued event for the step itself
+		is_step = self.step_in_flight and self.step_thread and self.step_thread.id == continued.threadId
+		if not stepping and not is_step:
+			self.cancel_deferred_stop()
+			self.hidden_stop = None
+			self.step_thread = None
+			self.step_in_flight = False
+			self.queued_steps.clear()
 
 		# if we hit a stopped event while stepping then the next continue event that is not a stepping event sets stepping to false
 		if stepping:
@@ -850,11 +1194,9 @@ class Session(TransportProtocolListener):
 
 		if continued.allThreadsContinued:
 			self.all_threads_stopped = False
-			for thread in self.threads:
-				thread.set_continued(None)
+			for other in self.threads:
+				other.set_continued(None)
 
-		# @NOTE this thread might be new and not in self.threads so we must update its state explicitly
-		thread = self.get_thread(continued.threadId)
 		thread.set_continued(continued)
 
 		if continued.allThreadsContinued or thread is self.selected_thread:
@@ -863,14 +1205,14 @@ class Session(TransportProtocolListener):
 		self.listener.on_session_updated_threads(self)
 		self._refresh_state()
 
-	def select(self, thread: Optional[Thread], frame: Optional[dap.StackFrame], explicitly: bool):
+	def select(self, thread: Optional[Thread], frame: Optional[dap.StackFrame], explicitly: bool, scopes: list[Variable]|None = None):
 		if frame and not thread:
 			raise core.Error('Expected thread')
 
 		self.selected_explicitly = explicitly
 		self.selected_thread = thread
 		self.selected_frame = frame
-		self.load_frame(frame)
+		self.load_frame(frame, scopes)
 
 	def on_event(self, event: str, body: Any):
 		if event == 'initialized':
@@ -893,10 +1235,19 @@ class Session(TransportProtocolListener):
 			self.on_loaded_source_event(body)
 		elif event == 'process':
 			self.on_process_event(body)
+		elif event == 'invalidated':
+			self.on_invalidated_event(body)
 		else:
 			core.run(self.adapter_configuration.on_custom_event(self, event, body))
 
 
+def first_non_subtle_frame(frames: list[dap.StackFrame]):
+	for frame in frames:
+		if frame.presentationHint != 'subtle':
+			return frame
+	return frames[0]
+
+
 class Thread:
 	def __init__(self, session: Session, id: int, name: str, stopped: bool):
 		self.session = session
@@ -906,6 +1257,13 @@ class Thread:
 		self.stopped_reason = ''
 		self.stopped_event: dap.StoppedEvent|None = None
 		self._children: Optional[core.Future[list[dap.StackFrame]]] = None
+		self._more_children: Optional[core.Future[list[dap.StackFrame]]] = None
+
+		# frames loaded so far, if the adapter supports delayed stack trace loading they are loaded a page at a time
+		self.frames: list[dap.StackFrame] = []
+		self.frames_complete = True
+
+	frames_per_page = 20
 
 	def has_children(self) -> bool:
 		return self.stopped
@@ -914,13 +1272,58 @@ class Thread:
 		if not self.stopped:
 			raise core.Error('Cannot get children of thread that is not stopped')
 
-		if self._children:
+		# if the request was cancelled because the session moved on to another stop fetch it again
+		if self._children and not self._children.cancelled():
 			return self._children
-		self._children = core.run(self.session.stack_trace(self.id))
+		self._children = core.run(self.fetch_frames())
 		return self._children
 
+	def has_more_children(self) -> bool:
+		return self.stopped and not self.frames_complete
+
+	# loads the next page of frames and returns all the frames loaded so far
+	def load_more_children(self) -> Awaitable[list[dap.StackFrame]]:
+		if self._more_children and not self._more_children.done():
+			return self._more_children
+		self._more_children = core.run(self.fetch_more_frames())
+		return self._more_children
+
+	async def fetch_frames(self) -> list[dap.StackFrame]:
+		levels = Thread.frames_per_page if self.session.capabilities.supportsDelayedStackTraceLoading else 0
+
+		frames, total = await self.session.stack_trace(self.id, 0, levels)
+		self.frames = frames
+		self.frames_complete = self.is_complete(levels, len(frames), total)
+		return self.frames
+
+	async def fetch_more_frames(self) -> list[dap.StackFrame]:
+		children = self.children()
+		await children
+		if self.frames_complete:
+			return self.frames
+
+		frames, total = await self.session.stack_trace(self.id, len(self.frames), Thread.frames_per_page)
+
+		# the thread continued or stopped again while this page was loading
+		if self._children is not children:
+			raise core.CancelledError
+
+		self.frames = self.frames + frames
+		self.frames_complete = self.is_complete(Thread.frames_per_page, len(frames), total)
+		return self.frames
+
+	# called after the page is added to self.frames
+	# adapters may not know the total number of frames so keep going until a page comes back short
+	def is_complete(self, levels: int, count: int, total: int|None) -> bool:
+		if not levels or count < levels:
+			return True
+		return total is not None and len(self.frames) >= total
+
 	def set_stopped(self, event: dap.StoppedEvent|None):
 		self._children = None # children are no longer valid
+		self._more_children = None
+		self.frames = []
+		self.frames_complete = True
 
 		self.stopped = True
 
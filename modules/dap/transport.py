@@ -14,8 +14,13 @@ from ..typecheck import *
 
 from ..import core
 from .error import Error
+from .decoder import decode_message
 
+import json
+import reprlib
 import threading
+import time
+from collections import deque
 
 
 class Transport(Protocol):
@@ -23,8 +28,20 @@ class Transport(Protocol):
 		...
 	def readline(self) -> bytes:
 		...
+	# returns as soon as any data is available, at most n bytes. raises EOFError when the transport is closed
 	def read(self, n: int) -> bytes:
 		...
+	# reads directly into the buffer returning the number of bytes read. raises EOFError when the transport is closed
+	def readinto(self, buffer: memoryview) -> int:
+		data = self.read(len(buffer))
+		buffer[:len(data)] = data
+		return len(data)
+	# writes several buffers at once, transports that can should write them with a single call
+	def writelines(self, data: list[bytes]):
+		self.write(b''.join(data))
+	# transports served by the shared reactor start calling `on_data` from the reactor thread and return True, an empty chunk means the transport was closed
+	def read_with_reactor(self, on_data: Callable[[bytes], None]) -> bool:
+		return False
 	def dispose(self):
 		...
 
@@ -36,12 +53,328 @@ class TransportProtocolListener (Protocol):
 
 	def on_transport_closed(self): ...
 
+class TransportStream:
+	'''
+		Splits the bytes read from a transport into messages
+
+		Data is read in large chunks into a single reusable buffer and the headers are parsed in place.
+		The body of each message is decoded directly out of the buffer so a message is only copied once when it is decoded.
+	'''
+
+	header_end = b'\r\n\r\n'
+	header_content_length = b'content-length'
+
+	# the buffer is reallocated at `chunk_size` once it is this many times larger and the data left in it fits in `chunk_size`
+	shrink_after = 4
+
+	def __init__(self, transport: Transport, chunk_size: int = 2**16) -> None:
+		self.transport = transport
+		self.chunk_size = chunk_size
+		self.buffer = bytearray(chunk_size)
+		self.start = 0
+		self.end = 0
+		self.largest_message = 0
+		self.message_size = 0
+		self.required = 0
+
+	def read_message(self) -> Any:
+		while True:
+			for message in self.messages():
+				return message
+
+			self.fill(self.required)
+
+	# splits the data pushed by a reactor into messages
+	def feed(self, data: bytes) -> Iterator[Any]:
+		self.reserve(len(data))
+		self.buffer[self.end:self.end + len(data)] = data
+		self.end += len(data)
+		return self.messages()
+
+	# yields each complete message in the buffer, once the buffer runs out `required` is the number of bytes needed to finish the current message
+	def messages(self) -> Iterator[Any]:
+		while True:
+			start = self.start
+			header_end = self.buffer.find(TransportStream.header_end, start, self.end)
+			if header_end == -1:
+				self.required = self.end - start + 1
+				return
+
+			size = self.content_length(start, header_end)
+			if size is None:
+				core.error('Expecting Content-Length: header but did not...')
+				self.start = header_end + 4
+				continue
+
+			body_start = header_end + 4
+			body_end = body_start + size
+			if body_end > self.end:
+				self.required = body_end - start
+				return
+
+			self.start = body_end
+			self.message_size = size
+			self.largest_message = max(self.largest_message, size)
+
+			with memoryview(self.buffer) as view:
+				with view[body_start:body_end] as body:
+					message = decode_message(str(body, 'utf-8'))
+
+			yield message
+
+	# Content-Length: 119\r\n
+	# Content-Type: application/vscode-jsonrpc; charset=utf-8\r\n
+	# \r\n
+	def content_length(self, start: int, end: int) -> int|None:
+		for header in self.buffer[start:end].split(b'\r\n'):
+			name, _, value = header.partition(b':')
+			if name.strip().lower() == TransportStream.header_content_length:
+				return int(value)
+		return None
+
+	# makes sure there is room for `free` more bytes past the end of the buffer
+	def reserve(self, free: int) -> None:
+		buffer = self.buffer
+
+		if self.start == self.end:
+			self.start = self.end = 0
+
+		# a large message grew the buffer, go back to a buffer of the normal size once what is left fits in one
+		size = self.end - self.start
+		if len(buffer) > self.chunk_size * TransportStream.shrink_after and size + free <= self.chunk_size:
+			self.buffer = bytearray(self.chunk_size)
+			self.buffer[0:size] = buffer[self.start:self.end]
+			self.start = 0
+			self.end = size
+			return
+
+		if self.end + free <= len(buffer):
+			return
+
+		# move the partial message to the start of the buffer
+		buffer[0:size] = buffer[self.start:self.end]
+		self.start = 0
+		self.end = size
+
+		if size + free > len(buffer):
+			buffer.extend(bytes(max(size + free, len(buffer) * 2) - len(buffer)))
+
+	# reads more data from the transport making sure there is room for at least `required` bytes of the current message
+	def fill(self, required: int) -> None:
+		self.reserve(max(required - (self.end - self.start), 1))
+
+		with memoryview(self.buffer) as view:
+			with view[self.end:] as free:
+				read = self.transport.readinto(free)
+
+		if not read:
+			raise EOFError
+
+		self.end += read
+
+
+class TransportInbox:
+	'''
+		Delivers messages from the reader thread to the main thread in batches
+
+		The reader thread appends to the inbox and only schedules a pump if one is not already scheduled.
+		Each pump drains everything that arrived before it ran in the order it was received so a burst of messages costs a single main thread wakeup.
+		Closing the inbox queues `on_closed` behind the messages so it is always called after every message that arrived before it.
+	'''
+
+	closed = object()
+
+	def __init__(self, callback: Callable[..., None], on_closed: Callable[..., None]) -> None:
+		self.callback = callback
+		self.on_closed = on_closed
+		self.lock = threading.Lock()
+		self.messages: list[tuple[Any, ...]] = []
+		self.pump_scheduled = False
+
+		self.batches = 0
+		self.batch_size_total = 0
+		self.batch_size_largest = 0
+		self.drain_time_total = 0.0
+		self.drain_time_largest = 0.0
+
+	# called from the reader thread
+	def append(self, *message: Any) -> None:
+		with self.lock:
+			self.messages.append(message)
+			if self.pump_scheduled:
+				return
+			self.pump_scheduled = True
+
+		core.call_soon_threadsafe(self.pump)
+
+	# called from the reader thread once it stops reading
+	def close(self, *args: Any) -> None:
+		self.append(TransportInbox.closed, *args)
+
+	def pump(self) -> None:
+		with self.lock:
+			messages = self.messages
+			self.messages = []
+
+		start = time.perf_counter()
+		try:
+			for message in messages:
+				if message[0] is TransportInbox.closed:
+					self.on_closed(*message[1:])
+				else:
+					self.callback(*message)
+
+		finally:
+			elapsed = time.perf_counter() - start
+
+			self.batches += 1
+			self.batch_size_total += len(messages)
+			self.batch_size_largest = max(self.batch_size_largest, len(messages))
+			self.drain_time_total += elapsed
+			self.drain_time_largest = max(self.drain_time_largest, elapsed)
+
+			# anything that arrived while draining is handled on the next tick so a flood of messages cannot starve the main thread
+			with self.lock:
+				if self.messages:
+					core.call_soon_threadsafe(self.pump)
+				else:
+					self.pump_scheduled = False
+
+	def metrics(self) -> dict[str, Any]:
+		return {
+			'batches': self.batches,
+			'batch_size_average': self.batch_size_total / self.batches if self.batches else 0,
+			'batch_size_largest': self.batch_size_largest,
+			'drain_time_average_ms': self.drain_time_total / self.batches * 1000 if self.batches else 0,
+			'drain_time_largest_ms': self.drain_time_largest * 1000,
+		}
+
+
+class TransportStatistics:
+	'''
+		Tracks how long each request takes from when it is sent until its response is handled
+
+		The most recent samples for each command are kept so the percentiles reflect recent behavior of the adapter
+	'''
+
+	samples_per_command = 1000
+	slow_request_threshold = 1.0
+
+	def __init__(self) -> None:
+		self.samples: dict[str, deque[float]] = {}
+		self.count: dict[str, int] = {}
+		self.slow_requests: deque[tuple[str, int, float]] = deque(maxlen=50)
+		self.cancelled = 0
+		self.flushes = 0
+		self.flushed_messages = 0
+		self.in_flight = 0
+		self.in_flight_largest = 0
+		self.sent_largest = 0
+
+	def sent(self, size: int, in_flight: int) -> None:
+		self.sent_largest = max(self.sent_largest, size)
+		self.in_flight = in_flight
+		self.in_flight_largest = max(self.in_flight_largest, in_flight)
+
+	def flushed(self, messages: int) -> None:
+		self.flushes += 1
+		self.flushed_messages += messages
+
+	# returns True if the request was slow
+	def completed(self, command: str, seq: int, elapsed: float, in_flight: int) -> bool:
+		self.in_flight = in_flight
+
+		samples = self.samples.get(command)
+		if samples is None:
+			samples = deque(maxlen=TransportStatistics.samples_per_command)
+			self.samples[command] = samples
+
+		samples.append(elapsed)
+		self.count[command] = self.count.get(command, 0) + 1
+
+		if elapsed > TransportStatistics.slow_request_threshold:
+			self.slow_requests.append((command, seq, elapsed))
+			return True
+
+		return False
+
+	@staticmethod
+	def percentiles(samples: Iterable[float]) -> dict[str, float]:
+		ordered = sorted(samples)
+		if not ordered:
+			return {}
+
+		def percentile(p: float):
+			return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+		return {
+			'p50_ms': percentile(0.50),
+			'p95_ms': percentile(0.95),
+			'p99_ms': percentile(0.99),
+			'max_ms': round(ordered[-1] * 1000, 3),
+		}
+
+	def into_json(self) -> dict[str, Any]:
+		commands: dict[str, Any] = {}
+		for command, samples in sorted(self.samples.items()):
+			commands[command] = {
+				'count': self.count[command],
+				**TransportStatistics.percentiles(samples),
+			}
+
+		return {
+			'in_flight': self.in_flight,
+			'in_flight_largest': self.in_flight_largest,
+			'sent_largest_bytes': self.sent_largest,
+			'sent_writes': self.flushes,
+			'sent_messages_per_write': self.flushed_messages / self.flushes if self.flushes else 0,
+			'cancelled': self.cancelled,
+			'all': TransportStatistics.percentiles(sample for samples in self.samples.values() for sample in samples),
+			'commands': commands,
+			'slow_requests': [
+				{ 'command': command, 'seq': seq, 'ms': round(elapsed * 1000, 3) } for command, seq, elapsed in self.slow_requests
+			],
+		}
+
+
+class TransportLogRepr(reprlib.Repr):
+	'''
+		A repr that gives up after a fixed amount of output so large bodies can be logged without formatting them in full
+	'''
+	def __init__(self, limit: int) -> None:
+		super().__init__()
+		self.maxlevel = 4
+		self.maxdict = 32
+		self.maxlist = 32
+		self.maxstring = limit
+		self.maxother = limit
+
+	def repr_DottedDict(self, x: Any, level: int) -> str:
+		return self.repr_dict(x, level)
+
+
 @dataclass
 class TransportLog:
 	out: bool
 	data: dict[str, Any]
+	# size of the encoded message in bytes if known
+	size: int = 0
 
 	def __str__(self) -> str:
+		text, _ = self.format()
+		return text
+
+	# formats the message, if the message is larger than `limit` bytes the body is formatted with a bounded repr and cut to `limit` characters
+	# returns the text and if it was truncated
+	def format(self, limit: int|None = None) -> tuple[str, bool]:
+		header, body = self.parts()
+		if limit is None or self.size <= limit:
+			return f'{header} :: {body}', False
+
+		text = body if isinstance(body, str) else TransportLogRepr(limit).repr(body)
+		return f'{header} :: {text[:limit]}', True
+
+	def parts(self) -> tuple[str, Any]:
 		data = self.data
 		out = self.out
 		type = data.get('type')
@@ -62,20 +395,35 @@ class TransportLog:
 			id = data.get('request_seq')
 			command = data.get('command')
 			body = data.get('body', data.get('message'))
-			return f'{sigil(data.get("success", False))} response/{command}({id}) :: {body}'
+			return f'{sigil(data.get("success", False))} response/{command}({id})', body
 
 		if type == 'request':
 			id = data.get('seq')
 			command = data.get('command')
 			body = data.get('arguments')
-			return f'{sigil(True)} request/{command}({id}) :: {body}'
+			return f'{sigil(True)} request/{command}({id})', body
 
 		if type == 'event':
 			command = data.get('event')
 			body = data.get('body')
-			return f'{sigil(True)} event/{command} :: {body}'
+			return f'{sigil(True)} event/{command}', body
+
+		return f'{sigil(False)} {type}/unknown', data
+
 
-		return f'{sigil(False)} {type}/unknown :: {data}'
+class EncodedArguments:
+	'''
+		Request arguments that are encoded the first time they are sent and can then be sent to any number of debug adapters without encoding them again
+	'''
+	def __init__(self, arguments: dict[str, Any]) -> None:
+		self.arguments = arguments
+		self._encoded: str|None = None
+
+	@property
+	def encoded(self) -> str:
+		if self._encoded is None:
+			self._encoded = core.json_encode(self.arguments)
+		return self._encoded
 
 
 class TransportProtocol:
@@ -90,11 +438,23 @@ class TransportProtocol:
 		self.transport_log = transport_log
 		self.transport = transport
 		self.pending_requests: dict[int, core.Future[dict[str, Any]]] = {}
+		self.pending_requests_generation: dict[int, int] = {}
+		self.pending_requests_sent: dict[int, tuple[str, float]] = {}
+		self.cancelled_requests: set[int] = set()
 		self.seq = 0
+		self.outbound: list[bytes] = []
+		self.inbox = TransportInbox(self.recieved_msg, self.on_closed)
+		self.stream = TransportStream(self.transport)
+		self.statistics = TransportStatistics()
 
 		self.transport_log.log('transport', f'⟸ process/started ::')
-		self.thread = threading.Thread(target=self.read)
-		self.thread.start()
+		self.reading = True
+		self.transport_closed = False
+
+		# transports that cannot be served by the reactor get their own reader thread
+		if not self.transport.read_with_reactor(self.recieved_data):
+			self.thread = threading.Thread(target=self.read)
+			self.thread.start()
 
 	# Content-Length: 119\r\n
 	# \r\n
@@ -107,50 +467,115 @@ class TransportProtocol:
 	#     }
 	# }
 	def read(self):
-		header = b'Content-Length: '
-		header_length = len(header)
+		stream = self.stream
 
 		try:
 			while True:
-				# handle Content-Length: 119\r\n
-				line = self.transport.readline()
-				if not header.startswith(header):
-					core.error('Expecting Content-Length: header but did not...')
-					continue
-
-				size = int(line[header_length:].strip())
+				message = stream.read_message()
+				self.inbox.append(message, stream.message_size)
 
-				#handle \r\n
-				line = self.transport.readline()
-				if line != b'\r\n':
-					core.error('Expected \\n\\r but did not find...')
-					core.error(line)
-					continue
+		except Exception as e:
+			self.closed(e)
 
+	# called from the reactor thread with data as it arrives
+	def recieved_data(self, data: bytes):
+		if not self.reading:
+			return
 
-				# read message
-				content = b''
-				while len(content) != size:
-					bytes_left = size - len(content)
-					content += self.transport.read(bytes_left)
+		try:
+			if not data:
+				raise EOFError
 
-				core.call_soon_threadsafe(self.recieved_msg, core.json_decode(content))
+			stream = self.stream
+			for message in stream.feed(data):
+				self.inbox.append(message, stream.message_size)
 
 		except Exception as e:
-			core.call_soon_threadsafe(self.transport_log.log,'transport',  f'⟸ process/stopped :: {e}')
-			core.call_soon_threadsafe(self.events.on_transport_closed)
+			self.closed(e)
+
+	# called from the reader thread, the close goes through the inbox so any pending messages are handled before the transport is closed
+	def closed(self, e: Exception):
+		if not self.reading:
+			return
+
+		self.reading = False
+		self.inbox.close(e)
+
+	def on_closed(self, e: Exception):
+		self.transport_log.log('transport', f'⟸ process/stopped :: {e}')
+		self.transport_closed = True
+		self.fail_pending_requests()
+		self.events.on_transport_closed()
+
+	# nothing is going to respond to these requests now that the transport is closed
+	def fail_pending_requests(self) -> None:
+		pending_requests = self.pending_requests
+		self.pending_requests = {}
+		self.pending_requests_generation.clear()
+		self.pending_requests_sent.clear()
 
-	def send(self, message: dict[str, Any]):
-		content = core.json_encode(message)
-		self.transport.write(bytes(f'Content-Length: {len(content)}\r\n\r\n{content}', 'utf-8'))
+		for future in pending_requests.values():
+			if not future.done():
+				future.set_exception(Error('Debug adapter closed'))
+
+	# queues the message to be written at the end of this tick along with any other messages sent this tick
+	# returns the size of the encoded message
+	def send(self, message: dict[str, Any]) -> int:
+		return self.send_content(core.json_encode(message).encode('utf-8'))
+
+	def send_content(self, content: bytes) -> int:
+		header = f'Content-Length: {len(content)}\r\n\r\n'.encode('utf-8')
+		size = len(header) + len(content)
+		self.statistics.sent(size, len(self.pending_requests))
+
+		self.outbound.append(header)
+		self.outbound.append(content)
+
+		# the first message this tick schedules the flush
+		if len(self.outbound) == 2:
+			core.call_soon(self.flush)
+
+		return size
+
+	def flush(self) -> None:
+		outbound = self.outbound
+		if not outbound:
+			return
+
+		self.outbound = []
+		self.statistics.flushed(len(outbound) // 2)
+
+		try:
+			self.transport.writelines(outbound)
+		except (OSError, EOFError) as e:
+			# the adapter went away (EPIPE, ECONNRESET...) handle it the same way as the adapter closing its end
+			self.transport_log.log('transport', f'⟹ process/write failed :: {e}')
+			self.closed(e)
+
+			# requests sent after the close was already handled
+			if self.transport_closed:
+				self.fail_pending_requests()
+
+	def statistics_json(self) -> dict[str, Any]:
+		return {
+			**self.statistics.into_json(),
+			'received_largest_bytes': self.stream.largest_message,
+			'received_batches': self.inbox.metrics(),
+		}
 
 	def dispose(self) -> None:
+		try:
+			self.flush()
+		except Exception:
+			core.exception()
+
 		self.transport.dispose()
 
 	def transport_message(self, message: dict[str, Any]) -> None:
 		self.recieved_msg(message)
 
-	def send_request_asyc(self, command: str, args: dict[str, Any]|None) -> Awaitable[dict[str, Any]]:
+	# requests tagged with a generation can be cancelled with `cancel_stale_requests` once the generation changes
+	def send_request_asyc(self, command: str, args: dict[str, Any]|EncodedArguments|None, generation: int|None = None) -> Awaitable[dict[str, Any]]:
 		future: core.Future[Dict[str, Any]] = core.Future()
 		self.seq += 1
 		request = {
@@ -161,12 +586,43 @@ class TransportProtocol:
 		}
 
 		self.pending_requests[self.seq] = future
-
-		self.log_transport(True, request)
-		self.send(request)
+		self.pending_requests_sent[self.seq] = (command, time.perf_counter())
+		if generation is not None:
+			self.pending_requests_generation[self.seq] = generation
+
+		if isinstance(args, EncodedArguments):
+			# the arguments are already encoded so only the envelope is encoded here
+			request['arguments'] = args.arguments
+			size = self.send_content(f'{{"seq": {self.seq}, "type": "request", "command": {json.dumps(command)}, "arguments": {args.encoded}}}'.encode('utf-8'))
+		else:
+			size = self.send(request)
+		self.log_transport(True, request, size)
 
 		return future
 
+	# cancels any pending requests tagged with a generation other than `generation`
+	# the futures are cancelled so anyone awaiting them gets a CancelledError and the adapter is told to stop working on them if it supports the cancel request
+	def cancel_stale_requests(self, generation: int, send_cancel_request: bool) -> None:
+		stale = [seq for seq, g in self.pending_requests_generation.items() if g != generation]
+
+		for seq in stale:
+			del self.pending_requests_generation[seq]
+			future = self.pending_requests.pop(seq, None)
+			if not future:
+				continue
+
+			del self.pending_requests_sent[seq]
+			self.statistics.cancelled += 1
+			self.cancelled_requests.add(seq)
+			future.cancel()
+
+			if send_cancel_request:
+				cancel = self.send_request_asyc('cancel', {
+					'requestId': seq
+				})
+				# nothing is waiting on this response, adapters may respond with an error if the request was already handled
+				cancel.add_done_callback(lambda future: future.cancelled() or future.exception()) #type: ignore
+
 	def send_response(self, request: dict[str, Any], body: dict[str, Any], error: str|None = None) -> None:
 		self.seq += 1
 
@@ -185,11 +641,11 @@ class TransportProtocol:
 			'message': error,
 		}
 
-		self.log_transport(True, data)
-		self.send(data)
+		size = self.send(data)
+		self.log_transport(True, data, size)
 
-	def log_transport(self, out: bool, data: dict[str, Any]):
-		self.transport_log.log('transport', TransportLog(out, data))
+	def log_transport(self, out: bool, data: dict[str, Any], size: int = 0):
+		self.transport_log.log('transport', TransportLog(out, data, size))
 
 	@core.schedule
 	async def handle_reverse_request(self, request: dict[str, Any]):
@@ -201,18 +657,36 @@ class TransportProtocol:
 		except core.Error as e:
 			self.send_response(request, {}, error=str(e))
 
-	def recieved_msg(self, data: dict[str, Any]) -> None:
+	def recieved_msg(self, data: dict[str, Any], size: int = 0) -> None:
 		t = data['type']
-		self.log_transport(False, data)
+		self.log_transport(False, data, size)
 
 		if t == 'response':
+			request_seq = data['request_seq']
+			self.pending_requests_generation.pop(request_seq, None)
+
+			if sent := self.pending_requests_sent.pop(request_seq, None):
+				command, sent_at = sent
+				elapsed = time.perf_counter() - sent_at
+				if self.statistics.completed(command, request_seq, elapsed, len(self.pending_requests) - 1):
+					self.transport_log.log('transport', f'⟹ response/{command}({request_seq}) :: slow response took {elapsed * 1000:.0f}ms')
+
 			try:
-				future = self.pending_requests.pop(data['request_seq'])
+				future = self.pending_requests.pop(request_seq)
 			except KeyError:
+				# the response to a request we have already cancelled
+				if request_seq in self.cancelled_requests:
+					self.cancelled_requests.remove(request_seq)
+					return
+
 				# the python adapter seems to send multiple initialized responses?
 				core.info("ignoring request request_seq not found")
 				return
 
+			# whoever was waiting on this response is no longer interested
+			if future.done():
+				return
+
 			success = data['success']
 			if not success:
 				body: dict[str, Any] = data.get('body', {})
@@ -6,9 +6,268 @@ from ..import core
 from .transport import Transport
 
 import socket
+import selectors
+import codecs
 import os
+import re
+import struct
 import subprocess
 import threading
+import time
+
+
+class Reactor:
+	'''
+		Serves the pipes and sockets of every transport from a single thread
+
+		Reads are non-blocking and data is handed to each channel's callback on the reactor thread as soon as it arrives.
+		Writes are attempted immediately on the calling thread and anything that does not fit is queued and written by the reactor when the file becomes writable.
+	'''
+
+	_shared: ClassVar[Reactor|None] = None
+
+	@staticmethod
+	def shared() -> Reactor:
+		if not Reactor._shared:
+			Reactor._shared = Reactor()
+		return Reactor._shared
+
+	# select on windows only works with sockets so pipes still get their own thread there
+	@staticmethod
+	def supports(file: Any) -> bool:
+		return os.name != 'nt' or isinstance(file, socket.socket)
+
+	def __init__(self) -> None:
+		self.selector = selectors.DefaultSelector()
+		self.lock = threading.Lock()
+		self.calls: list[Callable[[], None]] = []
+
+		self.wakeup_read, self.wakeup_write = socket.socketpair()
+		self.wakeup_read.setblocking(False)
+		self.wakeup_write.setblocking(False)
+		self.selector.register(self.wakeup_read, selectors.EVENT_READ, None)
+
+		self.thread = threading.Thread(target=self.run, name='Debugger Reactor', daemon=True)
+		self.thread.start()
+
+	# runs `fn` on the reactor thread
+	def call(self, fn: Callable[[], None]) -> None:
+		with self.lock:
+			self.calls.append(fn)
+
+		try:
+			self.wakeup_write.send(b'\0')
+		except OSError:
+			# the wakeup socket is full so the reactor is already going to wake up
+			...
+
+	def run(self) -> None:
+		while True:
+			for key, events in self.selector.select():
+				channel: ReactorChannel|None = key.data
+				if not channel:
+					try:
+						while self.wakeup_read.recv(4096): ...
+					except OSError: ...
+					continue
+
+				try:
+					if events & selectors.EVENT_READ:
+						channel.readable()
+					if events & selectors.EVENT_WRITE:
+						channel.writable()
+				except Exception:
+					core.exception()
+					channel.closed_by_reactor()
+
+			with self.lock:
+				calls = self.calls
+				self.calls = []
+
+			for call in calls:
+				try:
+					call()
+				except Exception:
+					core.exception()
+
+
+class ReactorChannel:
+	'''
+		A pipe or socket served by the reactor
+	'''
+
+	# the most buffers passed to a single writev/sendmsg call (IOV_MAX is at least 1024 everywhere we care about)
+	max_buffers = 512
+
+	def __init__(self, file: Any, reactor: Reactor|None = None) -> None:
+		self.reactor = reactor or Reactor.shared()
+		self.file = file
+		self.fd = file.fileno()
+		self.socket = file if isinstance(file, socket.socket) else None
+
+		if self.socket:
+			self.socket.setblocking(False)
+		else:
+			os.set_blocking(self.fd, False)
+
+		self.on_data: Callable[[bytes], None]|None = None
+		self.lock = threading.Lock()
+		self.pending: list[bytes|memoryview] = []
+		self.closed = False
+
+		# only touched on the reactor thread
+		self.events = 0
+
+	# starts calling `on_data` on the reactor thread with data as it arrives, b'' once the other end is closed
+	def read(self, on_data: Callable[[bytes], None]) -> None:
+		self.on_data = on_data
+		self.reactor.call(self.update)
+
+	def write(self, data: bytes) -> None:
+		self.writelines([data])
+
+	def writelines(self, data: list[bytes]) -> None:
+		with self.lock:
+			if self.closed:
+				raise EOFError
+
+			if self.pending:
+				self.pending.extend(data)
+				return
+
+			try:
+				self.pending = self._writelines(data)
+			except OSError:
+				# the other end went away, close the channel so the reader sees the close as well
+				self.closed = True
+				self.pending = []
+				self.reactor.call(self.closed_by_reactor)
+				raise
+
+			if not self.pending:
+				return
+
+		self.reactor.call(self.update)
+
+	def close(self, close_file: bool = False) -> None:
+		with self.lock:
+			self.closed = True
+			self.pending.clear()
+
+		def close():
+			self.update()
+			if close_file:
+				self.file.close()
+
+		self.reactor.call(close)
+
+	# writes as much as possible without blocking and returns what is left
+	def _writelines(self, data: list[bytes|memoryview]) -> list[bytes|memoryview]:
+		index = 0
+		while index < len(data):
+			try:
+				written = self._write(data[index:index + ReactorChannel.max_buffers])
+			except BlockingIOError:
+				break
+
+			start = index
+			while index < len(data) and written >= len(data[index]):
+				written -= len(data[index])
+				index += 1
+
+			# a partial write means the pipe or socket is full
+			if written or index == start:
+				data[index] = memoryview(data[index])[written:]
+				break
+
+		return data[index:]
+
+	def _write(self, data: list[bytes|memoryview]) -> int:
+		if self.socket:
+			# sendmsg is not available on windows
+			if hasattr(self.socket, 'sendmsg'):
+				return self.socket.sendmsg(data)
+			return self.socket.send(b''.join(data))
+		return os.writev(self.fd, data)
+
+	def _read(self) -> bytes:
+		if self.socket:
+			return self.socket.recv(2**16)
+		return os.read(self.fd, 2**16)
+
+	# called on the reactor thread to register for the events we currently care about
+	def update(self) -> None:
+		events = 0
+		if self.on_data and not self.closed:
+			events |= selectors.EVENT_READ
+		if self.pending and not self.closed:
+			events |= selectors.EVENT_WRITE
+
+		if events == self.events:
+			return
+
+		selector = self.reactor.selector
+		if not events:
+			selector.unregister(self.fd)
+		elif not self.events:
+			selector.register(self.fd, events, self)
+		else:
+			selector.modify(self.fd, events, self)
+
+		self.events = events
+
+	def closed_by_reactor(self) -> None:
+		with self.lock:
+			self.closed = True
+			self.pending.clear()
+
+		self.update()
+
+		if on_data := self.on_data:
+			self.on_data = None
+			on_data(b'')
+
+	def readable(self) -> None:
+		try:
+			data = self._read()
+		except BlockingIOError:
+			return
+		except OSError:
+			data = b''
+
+		if not data:
+			self.closed_by_reactor()
+			return
+
+		assert self.on_data
+		self.on_data(data)
+
+	def writable(self) -> None:
+		try:
+			with self.lock:
+				self.pending = self._writelines(self.pending)
+		except OSError:
+			# the other end went away, anything left to write is dropped
+			self.closed_by_reactor()
+			return
+
+		self.update()
+
+
+# returns a function that decodes the data from a reactor channel and calls `callback` on the main thread with the text
+def decode_into(callback: Callable[[str], None], closed: Callable[[], None]|None = None) -> Callable[[bytes], None]:
+	decoder = codecs.getincrementaldecoder('UTF-8')(errors='replace')
+
+	def on_data(data: bytes):
+		if text := decoder.decode(data, final=not data):
+			core.call_soon_threadsafe(callback, text)
+
+		if not data:
+			core.info('Nothing to read from process, closing')
+			if closed:
+				core.call_soon_threadsafe(closed)
+
+	return on_data
 
 class Process:
 	processes: set[subprocess.Popen] = set()
@@ -70,14 +329,22 @@ class Process:
 		self.stdout = stdout
 
 		self.closed = False
-		
+		self.channels: list[ReactorChannel] = []
 
 	def on_stdout(self, callback: Callable[[str], None]):
-		thread = threading.Thread(target=self._read_all, args=(self.process.stdout, callback))
-		thread.start()
+		self._on_output(self.stdout, callback)
 
 	def on_stderr(self, callback: Callable[[str], None]):
-		thread = threading.Thread(target=self._read_all, args=(self.process.stderr, callback))
+		self._on_output(self.stderr, callback)
+
+	def _on_output(self, file: Any, callback: Callable[[str], None]):
+		if Reactor.supports(file):
+			channel = ReactorChannel(file)
+			channel.read(decode_into(callback))
+			self.channels.append(channel)
+			return
+
+		thread = threading.Thread(target=self._read_all, args=(file, callback))
 		thread.start()
 
 	def _read_all(self, file: Any, callback: Callable[[str], None]) -> None:
@@ -111,6 +378,12 @@ class Process:
 
 	def dispose(self):
 		self.closed = True
+
+		# stop watching the pipes now instead of waiting for them to be closed by the process exiting
+		for channel in self.channels:
+			channel.close()
+		self.channels.clear()
+
 		try:
 			self.process.kill()
 		except Exception:
@@ -127,8 +400,25 @@ class StdioTransport(Transport):
 			if stderr:
 				stderr(data)
 
-		thread = threading.Thread(target=self._read, args=(self.process.stderr, log_stderr))
-		thread.start()
+		self.stdin: ReactorChannel|None = None
+		self.stdout: ReactorChannel|None = None
+		self.stderr: ReactorChannel|None = None
+
+		if Reactor.supports(self.process.stdout):
+			self.stdin = ReactorChannel(self.process.stdin)
+			self.stdout = ReactorChannel(self.process.stdout)
+			self.stderr = ReactorChannel(self.process.stderr)
+			self.stderr.read(decode_into(log_stderr, closed=self.process.dispose))
+		else:
+			thread = threading.Thread(target=self._read, args=(self.process.stderr, log_stderr))
+			thread.start()
+
+	def read_with_reactor(self, on_data: Callable[[bytes], None]) -> bool:
+		if not self.stdout:
+			return False
+
+		self.stdout.read(on_data)
+		return True
 
 	def _read(self, file: Any, callback: Callable[[str], None]) -> None:
 		while True:
@@ -146,7 +436,14 @@ class StdioTransport(Transport):
 		self.process.dispose()
 
 	def write(self, message: bytes) -> None:
-		self.process.stdin.write(message)
+		self.writelines([message])
+
+	def writelines(self, data: list[bytes]) -> None:
+		if self.stdin:
+			self.stdin.writelines(data)
+			return
+
+		self.process.stdin.write(b''.join(data))
 		self.process.stdin.flush()
 
 	def readline(self) -> bytes:
@@ -159,59 +456,125 @@ class StdioTransport(Transport):
 			return l
 		raise EOFError
 
+	# stdout is unbuffered so this is a single read straight into the buffer
+	def readinto(self, buffer: memoryview) -> int:
+		if n := self.process.stdout.readinto(buffer):
+			return n
+		raise EOFError
+
 	def dispose(self) -> None:
+		# the pipes stay registered with the shared reactor until they are closed
+		for channel in (self.stdin, self.stdout, self.stderr):
+			if channel:
+				channel.close()
+
 		self.process.dispose()
 
 
+class Readiness:
+	'''
+		Waits for an adapter to start accepting connections
+
+		Connection attempts back off exponentially starting at 100µs so an adapter that is ready almost immediately is connected to almost immediately.
+		Output from the adapter that looks like it is now listening wakes up the waiting connection attempt.
+	'''
+
+	initial_delay = 0.0001
+	maximum_delay = 0.25
+
+	listening = re.compile(r'listen|ready|started|port', re.IGNORECASE)
+
+	def __init__(self, port: int|None = None, path: str|None = None):
+		self.port = port
+		self.path = path
+		self.woken: core.Future[None] = core.Future()
+
+	# called with output from the adapter process
+	def output(self, text: str):
+		if self.woken.done():
+			return
+
+		if Readiness.listening.search(text) or (self.port and str(self.port) in text) or (self.path and self.path in text):
+			self.woken.set_result(None)
+
+	# sleeps for `delay` or until the adapter looks like it is listening
+	async def sleep(self, delay: float):
+		woken = self.woken
+		handle = core.call_later(delay, lambda: woken.done() or woken.set_result(None))
+		await woken
+		handle.cancel()
+		self.woken = core.Future()
+
+
 class SocketTransport(Transport):
-	def __init__(self, log: core.Logger, host: str, port: int):
-		self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-		self.socket.connect((host, port))
+	# connects to `path` with a unix domain socket if it is set otherwise to host:port over tcp
+	def __init__(self, log: core.Logger, host: str, port: int, path: str|None = None):
+		if path:
+			self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) #type: ignore
+			self.socket.connect(path)
+		else:
+			self.socket = socket.create_connection((host, port))
+			# messages are small and latency matters more than throughput
+			self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
 		self.stdin = self.socket.makefile('wb')
 		self.stdout = self.socket.makefile('rb')
 		self.process: Process|None = None
+		self.channel = ReactorChannel(self.socket) if Reactor.supports(self.socket) else None
 
 	@staticmethod
-	async def connect_with_retry(log: core.Logger, host: str, port: int):
-		exception: Exception|None = None
-		for _ in range(0, 8):
+	async def connect_with_retry(log: core.Logger, host: str, port: int, path: str|None = None, readiness: Readiness|None = None, timeout: float = 2.0):
+		readiness = readiness or Readiness()
+		delay = Readiness.initial_delay
+		started = time.perf_counter()
+
+		while True:
 			try:
-				return SocketTransport(log, host, port)
-			except Exception as e:
-				await core.sleep(0.25)
-				exception = e
+				return SocketTransport(log, host, port, path)
+			except OSError as e:
+				if time.perf_counter() - started > timeout:
+					raise core.Error(f'Unable to connect to {path or f"{host}:{port}"}: {e}')
 
-		raise exception or core.Error('unreachable')
+			await readiness.sleep(delay)
+			delay = min(delay * 2, Readiness.maximum_delay)
 
+	# pass `path` instead of `port` for adapters that are listening on a unix domain socket
 	@staticmethod
-	async def connect_with_process(log: core.Logger, command: list[str], port: int, process_is_program_output: bool = False):
+	async def connect_with_process(log: core.Logger, command: list[str], port: int|None, process_is_program_output: bool = False, path: str|None = None):
 		process = Process(command)
+		readiness = Readiness(port, path)
+
+		def on_output(type: str, data: str):
+			readiness.output(data)
+			log.log(type, data)
 
 		# log the data to the console here instead of sending it to the protocol panel
 		# this is for vscode-go which is doing something goofy
 		if process_is_program_output:
-			process.on_stdout(lambda data: log.log('stdout', data))
-			process.on_stderr(lambda data: log.log('stderr', data))
+			process.on_stdout(lambda data: on_output('stdout', data))
+			process.on_stderr(lambda data: on_output('stderr', data))
 		else:
-			process.on_stdout(lambda data: log.log('transport', f'⟸ process/stdout :: {data}'))
-			process.on_stderr(lambda data: log.log('transport', f'⟸ process/stderr :: {data}'))
-
-		exception: Exception|None = None
-		for _ in range(0, 8):
-			try:
-				transport = SocketTransport(log, 'localhost', port)
-				transport.process = process
-				return transport
+			process.on_stdout(lambda data: on_output('transport', f'⟸ process/stdout :: {data}'))
+			process.on_stderr(lambda data: on_output('transport', f'⟸ process/stderr :: {data}'))
 
-			except Exception as e:
-				await core.sleep(0.25)
-				exception = e
+		try:
+			transport = await SocketTransport.connect_with_retry(log, 'localhost', port or 0, path, readiness)
+		except:
+			process.dispose()
+			raise
 
-		process.dispose()
-		raise exception or core.Error('unreachable')
+		transport.process = process
+		return transport
 
 	def write(self, message: bytes) -> None:
-		self.stdin.write(message)
+		self.writelines([message])
+
+	def writelines(self, data: list[bytes]) -> None:
+		if self.channel:
+			self.channel.writelines(data)
+			return
+
+		self.stdin.writelines(data)
 		self.stdin.flush()
 
 	def readline(self) -> bytes:
@@ -220,20 +583,221 @@ class SocketTransport(Transport):
 		raise EOFError
 
 	def read(self, n: int) -> bytes:
-		if l := self.stdout.read(n):
+		if l := self.stdout.read1(n):
 			return l
 		raise EOFError
 
+	def readinto(self, buffer: memoryview) -> int:
+		if n := self.stdout.readinto1(buffer):
+			return n
+		raise EOFError
+
+	def read_with_reactor(self, on_data: Callable[[bytes], None]) -> bool:
+		if not self.channel:
+			return False
+
+		self.channel.read(on_data)
+		return True
+
 	def dispose(self) -> None:
-		try:
-			self.socket.close()
-		except:
-			core.exception()
+		# the socket is not closed until the files made from it are closed as well
+		for file in (self.stdin, self.stdout):
+			try:
+				file.close()
+			except:
+				core.exception()
+
+		# the socket has to be closed by the reactor once it is no longer being watched
+		if self.channel:
+			self.channel.close(close_file=True)
+		else:
+			try:
+				self.socket.close()
+			except:
+				core.exception()
 
 		if self.process:
 			self.process.dispose()
 
 
+class RecordingTransport(Transport):
+	'''
+		Wraps a transport and writes every chunk of data sent or received to a file so the session can be replayed later with ReplayTransport
+
+		Each record is a direction, the seconds since the recording started and the length followed by the data
+	'''
+
+	magic = b'DAPRECORDING1\n'
+	header = struct.Struct('<cdI')
+
+	inbound = b'<'
+	outbound = b'>'
+
+	def __init__(self, transport: Transport, path: str):
+		self.transport = transport
+		self.lock = threading.Lock()
+		self.file = open(path, 'wb')
+		self.file.write(RecordingTransport.magic)
+		self.started = time.perf_counter()
+
+	# called from both the reader thread and the main thread
+	def record(self, direction: bytes, data: bytes|memoryview):
+		with self.lock:
+			if self.file.closed:
+				return
+
+			self.file.write(RecordingTransport.header.pack(direction, time.perf_counter() - self.started, len(data)))
+			self.file.write(data)
+
+	def write(self, message: bytes) -> None:
+		self.record(RecordingTransport.outbound, message)
+		self.transport.write(message)
+
+	def writelines(self, data: list[bytes]) -> None:
+		self.record(RecordingTransport.outbound, b''.join(data))
+		self.transport.writelines(data)
+
+	def readline(self) -> bytes:
+		data = self.transport.readline()
+		self.record(RecordingTransport.inbound, data)
+		return data
+
+	def read(self, n: int) -> bytes:
+		data = self.transport.read(n)
+		self.record(RecordingTransport.inbound, data)
+		return data
+
+	def readinto(self, buffer: memoryview) -> int:
+		n = self.transport.readinto(buffer)
+		with buffer[:n] as data:
+			self.record(RecordingTransport.inbound, data)
+		return n
+
+	def read_with_reactor(self, on_data: Callable[[bytes], None]) -> bool:
+		def on_data_recorded(data: bytes):
+			if data:
+				self.record(RecordingTransport.inbound, data)
+			on_data(data)
+
+		return self.transport.read_with_reactor(on_data_recorded)
+
+	def dispose(self) -> None:
+		self.transport.dispose()
+		with self.lock:
+			self.file.close()
+
+	@staticmethod
+	def load(path: str) -> list[tuple[bytes, float, bytes]]:
+		with open(path, 'rb') as file:
+			data = file.read()
+
+		if not data.startswith(RecordingTransport.magic):
+			raise core.Error(f'{path} is not a protocol recording')
+
+		header = RecordingTransport.header
+		records: list[tuple[bytes, float, bytes]] = []
+
+		offset = len(RecordingTransport.magic)
+		while offset + header.size <= len(data):
+			direction, timestamp, length = header.unpack_from(data, offset)
+			offset += header.size
+			records.append((direction, timestamp, data[offset:offset + length]))
+			offset += length
+
+		return records
+
+
+class ReplayTransport(Transport):
+	'''
+		Plays back a recording made with RecordingTransport in place of a debug adapter
+
+		speed controls when each chunk of received data is delivered
+			recorded: at the same time it was received relative to the start of the recording
+			fast: as soon as it is read
+			lockstep: once we have sent as many messages as had been sent before it was received
+	'''
+
+	speeds = ('recorded', 'fast', 'lockstep')
+	header = b'Content-Length:'
+
+	def __init__(self, log: core.Logger, path: str, speed: str = 'recorded'):
+		if not speed in ReplayTransport.speeds:
+			raise core.Error(f'Unknown replay speed "{speed}" expected one of {", ".join(ReplayTransport.speeds)}')
+
+		log.log('transport', f'⟸ replay/starting :: {path} ({speed})')
+
+		self.records = RecordingTransport.load(path)
+		self.speed = speed
+		self.index = 0
+		self.sent = 0
+		self.recorded_sent = 0
+		self.remaining = b''
+		self.closed = False
+		self.condition = threading.Condition()
+		self.started = time.perf_counter()
+
+	# messages are counted instead of writes since several messages can be written at once
+	def write(self, message: bytes) -> None:
+		with self.condition:
+			self.sent += message.count(ReplayTransport.header)
+			self.condition.notify_all()
+
+	# blocks until the next chunk of received data is due
+	def next(self) -> bytes:
+		if data := self.remaining:
+			self.remaining = b''
+			return data
+
+		with self.condition:
+			while True:
+				if self.closed or self.index >= len(self.records):
+					raise EOFError
+
+				direction, timestamp, data = self.records[self.index]
+				if direction == RecordingTransport.outbound:
+					self.recorded_sent += data.count(ReplayTransport.header)
+					self.index += 1
+					continue
+
+				if self.speed == 'lockstep' and self.sent < self.recorded_sent:
+					self.condition.wait()
+					continue
+
+				if self.speed == 'recorded':
+					delay = self.started + timestamp - time.perf_counter()
+					if delay > 0:
+						self.condition.wait(delay)
+						continue
+
+				self.index += 1
+				return data
+
+	def readline(self) -> bytes:
+		line = b''
+		while True:
+			data = self.next()
+			end = data.find(b'\n')
+			if end != -1:
+				self.remaining = data[end + 1:]
+				return line + data[:end + 1]
+			line += data
+
+	def read(self, n: int) -> bytes:
+		data = self.next()
+		self.remaining = data[n:]
+		return data[:n]
+
+	def readinto(self, buffer: memoryview) -> int:
+		data = self.read(len(buffer))
+		buffer[:len(data)] = data
+		return len(data)
+
+	def dispose(self) -> None:
+		with self.condition:
+			self.closed = True
+			self.condition.notify_all()
+
+
 # class StdioSocketTransport(Transport):
 # 	def __init__(self, regex: Any, port: int, log: core.Logger):
 # 		self.process = adapter_process
@@ -33,7 +33,10 @@ class SourceLocation:
 
 
 class Variable:
-	def __init__(self, session: Session, name: str, value: str|None, variablesReference: int|None, containerVariablesReference: int|None = None, evaluateName: str|None = None, memoryReference: str|None = None) -> None:
+	# number of indexed children fetched at a time for containers that report indexedVariables
+	page_size = 20
+
+	def __init__(self, session: Session, name: str, value: str|None, variablesReference: int|None, containerVariablesReference: int|None = None, evaluateName: str|None = None, memoryReference: str|None = None, generation: int|None = None, namedVariables: int|None = None, indexedVariables: int|None = None) -> None:
 		self.session = session
 		self.name = name
 		self.evaluateName = evaluateName
@@ -41,11 +44,16 @@ class Variable:
 		self.variablesReference = variablesReference
 		self.containerVariablesReference = containerVariablesReference
 		self.memoryReference = memoryReference
+		self.namedVariables = namedVariables
+		self.indexedVariables = indexedVariables
+		# variables that belong to a specific stop are tagged with its generation so fetching their children can be cancelled once the program moves on
+		self.generation = generation
 		self.fetched: core.Future[list[Variable]]|None = None
-		
+		# pages of indexed children keyed by their start index
+		self.pages: dict[int, core.Future[list[Variable]]] = {}
 
 	@staticmethod
-	def from_variable(session: Session, containerVariablesReference: int, variable: dap.Variable):
+	def from_variable(session: Session, containerVariablesReference: int, variable: dap.Variable, generation: int|None = None):
 		return Variable(
 			session,
 			variable.name,
@@ -54,6 +62,9 @@ class Variable:
 			containerVariablesReference,
 			variable.evaluateName,
 			variable.memoryReference,
+			generation,
+			variable.namedVariables,
+			variable.indexedVariables,
 		)
 
 	@staticmethod
@@ -63,32 +74,68 @@ class Variable:
 			scope.name,
 			None,			
 			scope.variablesReference,
+			generation=session.generation,
+			namedVariables=scope.namedVariables,
+			indexedVariables=scope.indexedVariables,
 		)
 
 	@staticmethod
-	def from_evaluate(session: Session, name: str, evaluate: dap.EvaluateResponse):
+	def from_evaluate(session: Session, name: str, evaluate: dap.EvaluateResponse, generation: int|None = None):
 		return Variable(
 			session,
 			name,
 			evaluate.result,			
 			evaluate.variablesReference,
+			generation=generation,
+			namedVariables=evaluate.namedVariables,
+			indexedVariables=evaluate.indexedVariables,
 		)
 
-	async def fetch(self):
+	async def fetch(self, filter: str|None = None, start: int|None = None, count: int|None = None):
 		assert self.variablesReference
-		return await self.session.get_variables(self.variablesReference)
+		return await self.session.get_variables(self.variablesReference, generation=self.generation, filter=filter, start=start, count=count)
 
-	async def children(self) -> list[Variable]:
+	# containers with more indexed children than fit in a page are fetched a page at a time instead of all at once
+	@property
+	def is_paged(self) -> bool:
+		return (self.indexedVariables or 0) > Variable.page_size
+
+	def page(self, start: int) -> core.Future[list[Variable]]:
+		assert self.indexedVariables
+		page = self.pages.get(start)
+		if not page or page.cancelled():
+			count = min(Variable.page_size, self.indexedVariables - start)
+			page = core.run(self.fetch('indexed', start, count))
+			self.pages[start] = page
+		return page
+
+	# for paged containers this returns the named children followed by the first `count` indexed children
+	async def children(self, count: int = page_size) -> list[Variable]:
 		if not self.has_children:
 			return []
 
-		if not self.fetched:
-			self.fetched = core.run(self.fetch())
+		if not self.fetched or self.fetched.cancelled():
+			self.fetched = core.run(self.fetch('named' if self.is_paged else None))
 
 		children = await self.fetched
-		return children
+		if not self.is_paged:
+			return children
+
+		assert self.indexedVariables
+		count = min(count, self.indexedVariables)
+		pages = await core.gather(*[self.page(start) for start in range(0, count, Variable.page_size)])
+		return children + [variable for page in pages for variable in page]
+
+	# the number of indexed children after the first `count` that have not been fetched
+	def remaining_children(self, count: int) -> int:
+		if not self.is_paged:
+			return 0
+		return max((self.indexedVariables or 0) - count, 0)
+
+	def clear_children(self):
+		self.fetched = None
+		self.pages.clear()
 
 	@property
 	def has_children(self) -> bool:
 		return bool(self.variablesReference)
-
@@ -115,6 +115,8 @@ class Debugger (dap.Debugger, dap.SessionListener):
 		])
 
 		self.load_data()
+		self.save_data_scheduled = False
+		self.breakpoints.source.on_changed.add(self.on_source_breakpoints_changed)
 
 		self.project.on_updated.add(self._on_project_or_settings_updated)
 
@@ -222,7 +224,7 @@ class Debugger (dap.Debugger, dap.SessionListener):
 					
 					if self.project.configuration_or_compound != previous_configuration_or_compound:
 						core.info('Saving data: configuration selection changed')
-						self.save_data()
+						self.save_data_later()
 
 					configurations = self.project.active_configurations()
 
@@ -479,13 +481,31 @@ class Debugger (dap.Debugger, dap.SessionListener):
 		self.breakpoints.load_from_json(json.get('breakpoints', {}))
 		self.watch.load_json(json.get('watch', []))
 
-	def save_data(self):
-		json = {
+	def data_json(self):
+		return {
 			'project': self.project.into_json(),
 			'breakpoints': self.breakpoints.into_json(),
 			'watch': self.watch.into_json(),
 		}
-		persistance.save(self.project.project_name, json)
+
+	def save_data(self):
+		persistance.save(self.project.project_name, self.data_json())
+
+	# saves in the background, changes made in the next second are included in the same save
+	def save_data_later(self):
+		if self.save_data_scheduled:
+			return
+
+		def save():
+			self.save_data_scheduled = False
+			persistance.save(self.project.project_name, self.data_json())
+
+		self.save_data_scheduled = True
+		core.call_later(1, save)
+
+	def on_source_breakpoints_changed(self, file: str, breakpoints: list[SourceBreakpoint]):
+		if persistance.journal(self.project.project_name, file, [breakpoint.into_json() for breakpoint in breakpoints]):
+			self.save_data_later()
 
 	def on_run_task(self) -> None:
 		values: list[ui.InputListItem] = []
@@ -513,6 +533,23 @@ class Debugger (dap.Debugger, dap.SessionListener):
 	def refresh_phantoms(self) -> None:
 		ui.Layout.render_layouts()
 
+	def protocol_statistics(self) -> list[dict[str, Any]]:
+		return [session.protocol_statistics() for session in self.sessions]
+
+	# shows the request latency statistics for each session, if a file is passed in the statistics are written to that file as json instead
+	def show_protocol_statistics(self, file: str|None = None) -> None:
+		statistics = core.json_encode(self.protocol_statistics(), pretty=True)
+		if file:
+			with open(file, 'w') as f:
+				f.write(statistics)
+			return
+
+		view = self.window.new_file()
+		view.set_name('Debugger Protocol Statistics')
+		view.set_scratch(True)
+		view.assign_syntax('Packages/JSON/JSON.sublime-syntax')
+		core.edit(view, lambda edit: view.insert(edit, 0, statistics))
+
 	@core.schedule
 	async def on_run_command(self, command: str) -> None:
 		try: 
@@ -696,7 +733,7 @@ class Debugger (dap.Debugger, dap.SessionListener):
 	# Configuration Stuff
 	def set_configuration(self, configuration: Union[dap.Configuration, dap.ConfigurationCompound]):
 		self.project.configuration_or_compound = configuration
-		self.save_data()
+		self.save_data_later()
 
 	async def change_configuration_input_items(self) -> list[ui.InputListItem]:
 		values: list[ui.InputListItem] = []
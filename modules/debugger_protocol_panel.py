@@ -2,18 +2,39 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any
 
 import sublime
+import itertools
+from collections import deque
 
 from .import core
+from .dap.transport import TransportLog
+from .settings import Settings
 from .debugger_output_panel import DebuggerOutputPanel
 
 if TYPE_CHECKING:
 	from .debugger import Debugger
 
 class DebuggerProtocolPanel(core.Logger):
+	'''
+		Keeps the most recent protocol messages in a ring buffer bounded by message count and total size
+
+		Messages are kept unformatted and are only formatted when the panel is open so logging costs almost nothing when nobody is looking.
+		Large messages are truncated in the panel and can be expanded by clicking the annotation next to them.
+	'''
+
 	def __init__(self, debugger: Debugger):
 		self.debugger = debugger
 		self.output: DebuggerOutputPanel|None = None
-		self.pending: list[Any] = []
+
+		# (id, message, size)
+		self.messages: deque[tuple[int, Any, int]] = deque()
+		self.messages_size = 0
+
+		# id of the last message logged and the last message written to the panel
+		self.id = 0
+		self.written = 0
+
+		# ids of the messages currently truncated in the panel
+		self.truncated: set[int] = set()
 
 	def write_pending(self):
 		if not self.output:
@@ -24,29 +45,143 @@ class DebuggerProtocolPanel(core.Logger):
 			settings.set('word_wrap', False)
 			settings.set('scroll_past_end', False)
 
+		if self.written == self.id:
+			return
+
+		view = self.output.view
+		limit = Settings.protocol_log_max_line_length
+
+		first = self.messages[0][0] if self.messages else self.id + 1
+		skip = max(self.written + 1 - first, 0)
+
 		text = ''
-		for pending in self.pending:
-			text += f'{pending}\n'
+		truncated: list[tuple[int, int, int]] = []
+
+		dropped = max(first - self.written - 1, 0)
+		if dropped:
+			text += f'... {dropped} messages dropped\n'
 
-		self.pending.clear()
+		for id, message, _ in itertools.islice(self.messages, skip, None):
+			line, is_truncated = self.format(message, limit)
+			if is_truncated:
+				truncated.append((id, len(text), len(line)))
 
-		self.output.view.run_command('append', {
+			text += f'{line}\n'
+
+		self.written = self.id
+
+		at = view.size()
+		view.run_command('append', {
 			'characters': text,
 			'force': True,
 			'scroll_to_end': True,
 		})
 
+		for id, start, length in truncated:
+			self.add_expand_annotation(id, sublime.Region(at + start, at + start + length))
+
+		self.trim()
+
+	def format(self, message: Any, limit: int|None) -> tuple[str, bool]:
+		if isinstance(message, TransportLog):
+			return message.format(limit)
+
+		text = str(message)
+		if limit is not None and len(text) > limit:
+			return text[:limit], True
+
+		return text, False
+
+	def message(self, id: int) -> Any|None:
+		if not self.messages:
+			return None
+
+		index = id - self.messages[0][0]
+		if index < 0 or index >= len(self.messages):
+			return None
+
+		return self.messages[index][1]
+
+	def add_expand_annotation(self, id: int, region: sublime.Region):
+		assert self.output
+		html = '''
+			<style>
+			html {
+				background-color: var(--background);
+			}
+			a {
+				color: color(var(--foreground) alpha(0.25));
+				text-decoration: none;
+			}
+			</style>
+			<body id="debugger">
+				<a href="">expand…</a>
+			</body>
+		'''
+		self.truncated.add(id)
+		self.output.view.add_regions(f'expand{id}', [region], annotation_color='#fff0', annotations=[html], on_navigate=lambda _: self.expand(id))
+
+	def expand(self, id: int):
+		if not self.output:
+			return
+
+		view = self.output.view
+		key = f'expand{id}'
+		regions = view.get_regions(key)
+		view.erase_regions(key)
+		self.truncated.discard(id)
+
+		message = self.message(id)
+		if not regions or message is None:
+			sublime.status_message('This message is no longer available')
+			return
+
+		text, _ = self.format(message, None)
+		core.edit(view, lambda edit: view.replace(edit, regions[0], text))
+
+	# removes lines from the top of the panel once it holds more lines than messages we would keep
+	def trim(self):
+		assert self.output
+		view = self.output.view
+
+		max_lines = Settings.protocol_log_max_messages
+		lines = view.rowcol(view.size())[0]
+
+		# trim in chunks so we are not erasing a line for every message that is logged
+		if lines <= max_lines + max_lines // 10:
+			return
+
+		end = view.text_point(lines - max_lines, 0)
+		core.edit(view, lambda edit: view.erase(edit, sublime.Region(0, end)))
+
+		for id in list(self.truncated):
+			key = f'expand{id}'
+			regions = view.get_regions(key)
+			if not regions or regions[0].empty():
+				view.erase_regions(key)
+				self.truncated.discard(id)
+
 	def write_pending_if_needed(self):
 		if self.output and self.output.is_open():
 			self.write_pending()
 
 	def log(self, type: str, value: Any):
-		self.pending.append(value)
+		size = value.size if isinstance(value, TransportLog) else len(str(value))
+
+		self.id += 1
+		self.messages.append((self.id, value, size))
+		self.messages_size += size
+
+		max_messages = Settings.protocol_log_max_messages
+		max_bytes = Settings.protocol_log_max_bytes
+		while len(self.messages) > max_messages or (self.messages_size > max_bytes and len(self.messages) > 1):
+			_, _, size = self.messages.popleft()
+			self.messages_size -= size
+
 		self.write_pending_if_needed()
 
 	def error(self, value: str):
-		self.pending.append(f'error: {value}')
-		self.write_pending_if_needed()
+		self.log('error', f'error: {value}')
 
 	def open(self):
 		self.write_pending()
@@ -54,11 +189,14 @@ class DebuggerProtocolPanel(core.Logger):
 			self.output.open()
 
 	def clear(self):
-		self.pending.clear()
+		self.messages.clear()
+		self.messages_size = 0
+		self.written = self.id
+		self.truncated.clear()
 		if self.output:
 			self.output.dispose()
 			self.output = None
 
 	def dispose(self):
 		if self.output:
-			self.output.dispose()
\ No newline at end of file
+			self.output.dispose()
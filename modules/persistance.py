@@ -2,38 +2,142 @@ from __future__ import annotations
 from .typecheck import *
 
 from .import core
+from .core.json import DottedDict
 
 import os
+import json
 import hashlib
+import concurrent.futures
 
 
 VERSION_NUMBER = 0
 
+# Project data is saved as a snapshot of everything along with a journal of the breakpoint changes made since the snapshot.
+# Changes to breakpoints are appended to the journal as they happen which is cheap no matter how many breakpoints there are.
+# When the journal gets too long or the project is saved the snapshot is rewritten and the journal is cleared.
+#
+# All writes happen in order on a single background thread so saving never blocks the ui and a journal entry is never written before the snapshot it follows.
+# The snapshot is written to a temporary file and then moved over the old one so a crash never leaves a partially written snapshot.
+
+# number of journal entries after which the journal should be compacted into the snapshot
+journal_compact_after = 1000
+
+# number of entries appended to the journal of each project since its last snapshot
+journal_entries: dict[str, int] = {}
+
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
 def file_name_for_project_name(project_name: str):
 	hash = hashlib.sha224(project_name.encode('utf-8')).hexdigest()
 	file_name = os.path.join(core.current_package(), "data/{}.json".format(hash))
 	return file_name
-	
-def load(project_name: str) -> Any:
+
+def journal_file_name_for_project_name(project_name: str):
+	return file_name_for_project_name(project_name) + '.journal'
+
+# always returns a DottedDict even if nothing has been saved yet
+def load(project_name: str) -> DottedDict:
 	file_name = file_name_for_project_name(project_name)
 	try:
 		with open(file_name, 'r') as file:
 			contents = file.read() or "{}"
 
 		json = core.json_decode(contents)
-		if json.get("_version") == VERSION_NUMBER:
-			return json
+		if json.get("_version") != VERSION_NUMBER:
+			return DottedDict()
+
+	except FileNotFoundError:
+		json = DottedDict()
+
+	replay_journal(project_name, json)
+	return json
 
+# applies the breakpoint changes in the journal to the snapshot
+def replay_journal(project_name: str, data: Any):
+	try:
+		with open(journal_file_name_for_project_name(project_name), 'r') as file:
+			lines = file.readlines()
 	except FileNotFoundError:
-		pass
-	return {}
+		return
+
+	# each entry is every breakpoint in a file so only the last entry for each file matters
+	files: dict[str, list[Any]] = {}
+	entries = 0
+	for line in lines:
+		if not line.strip():
+			continue
+
+		entries += 1
+		try:
+			entry = core.json_decode(line)
+		except ValueError:
+			# the last entry may have been partially written if sublime exited while writing it
+			core.error(f'Ignoring partially written journal entry for {project_name}')
+			continue
+
+		files[entry['file']] = entry['breakpoints']
+
+	journal_entries[project_name] = entries
+	if not files:
+		return
+
+	breakpoints = data.setdefault('breakpoints', DottedDict())
+	source = [breakpoint for breakpoint in breakpoints.get('source', []) if breakpoint['file'] not in files]
+	for file_breakpoints in files.values():
+		source.extend(file_breakpoints)
+
+	breakpoints['source'] = source
 
 def save(project_name: str, data: Any):
+	journal_entries[project_name] = 0
+	submit(write_snapshot, project_name, data)
+
+# waits for everything that has been saved so far to be written, called when the plugin is unloaded so nothing is lost
+def wait(timeout: float|None = None):
+	try:
+		executor.submit(lambda: None).result(timeout)
+	except concurrent.futures.TimeoutError:
+		core.error('Timed out waiting for debugger data to be saved')
+
+# Appends the breakpoints of a file to the journal
+# Returns True if the journal should be compacted by saving a new snapshot
+def journal(project_name: str, file: str, breakpoints: list[Any]) -> bool:
+	entries = journal_entries.get(project_name, 0) + 1
+	journal_entries[project_name] = entries
+
+	submit(write_journal_entry, project_name, { 'file': file, 'breakpoints': breakpoints })
+	return entries >= journal_compact_after
+
+def submit(write: Callable[[str, Any], None], project_name: str, data: Any) -> concurrent.futures.Future[None]:
+	def on_done(future: concurrent.futures.Future[None]):
+		if exception := future.exception():
+			core.call_soon_threadsafe(core.error, f'Unable to save debugger data for {project_name}: {exception}')
+
+	future = executor.submit(write, project_name, data)
+	future.add_done_callback(on_done)
+	return future
+
+def write_snapshot(project_name: str, data: Any):
 	file_name = file_name_for_project_name(project_name)
-	with open(file_name, 'w') as file:
-		data['_version'] = VERSION_NUMBER
-		data['_project_name'] = project_name
-		file.write(core.json_encode(data, pretty=True))
+	temporary_file_name = file_name + '.tmp'
+
+	data['_version'] = VERSION_NUMBER
+	data['_project_name'] = project_name
 
+	with open(temporary_file_name, 'w') as file:
+		file.write(core.json_encode(data))
+		file.flush()
+		os.fsync(file.fileno())
 
+	os.replace(temporary_file_name, file_name)
+
+	# the snapshot includes everything in the journal
+	try:
+		os.remove(journal_file_name_for_project_name(project_name))
+	except FileNotFoundError:
+		...
 
+def write_journal_entry(project_name: str, entry: Any):
+	# each entry starts on a new line so an entry that was partially written when sublime exited does not take the next one with it
+	with open(journal_file_name_for_project_name(project_name), 'a') as file:
+		file.write('\n' + json.dumps(entry))
@@ -97,6 +97,36 @@ class Settings:
 		description=''
 	)
 
+	protocol_log_max_messages = Setting[int] (
+		key='protocol_log_max_messages',
+		default=10000,
+		description='The maximum number of messages kept for the Debugger Protocol panel, older messages are dropped'
+	)
+
+	protocol_log_max_bytes = Setting[int] (
+		key='protocol_log_max_bytes',
+		default=16777216,
+		description='The maximum total size in bytes of the messages kept for the Debugger Protocol panel, older messages are dropped'
+	)
+
+	protocol_log_max_line_length = Setting[int] (
+		key='protocol_log_max_line_length',
+		default=2000,
+		description='Messages larger than this are truncated in the Debugger Protocol panel and can be expanded on demand'
+	)
+
+	prefetch_on_stop = Setting[bool] (
+		key='prefetch_on_stop',
+		default=True,
+		description='When the program stops request the threads, stack trace, scopes, variables and watch expressions all at once and update the panels when everything has loaded instead of requesting them one after another'
+	)
+
+	fast_step_idle_time_ms = Setting[int] (
+		key='fast_step_idle_time_ms',
+		default=100,
+		description='When stepping the panels and the selected line are only updated once no step has been made for this many milliseconds, steps made while a step is in progress are queued. Set to 0 to update them after every step'
+	)
+
 	node = Setting['str|None'] (
 		key='node',
 		default=None,
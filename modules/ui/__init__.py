@@ -10,6 +10,7 @@ from .layout import Layout
 from .image import Images, Image
 from .input import *
 from .align import align, spacer
+from .virtual_list import virtual_list
 
 from .debug import DEBUG_REFRESH
 
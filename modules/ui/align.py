@@ -28,6 +28,7 @@ class spacer (span):
 		width = leftover + (self.flex_width_min or 0)
 		self._width = width
 		self.flex_width = width
+		self.invalidate()
 		return leftover
 
 	def html(self, layout: Layout) -> str:
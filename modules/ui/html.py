@@ -23,8 +23,17 @@ class element:
 	def __init__(self, is_inline: bool, width: float|None, height: float|None, css: css|None) -> None:
 		super().__init__()
 		self.layout: Layout = None #type: ignore
+		self._parent: element|None = None
 		self.children: Sequence[element] = []
 		self.requires_render = True
+
+		# elements with a key are kept in place of a newly rendered element with the same type and key, see `update_from`
+		self.key: Any = None
+
+		# the html and size of this element are kept until it or something inside it changes, see `invalidate`
+		self._html: str|None = None
+		self._measured_height: float|None = None
+		self._measured_width: float|None = None
 		self._max_allowed_width: float|None = None
 		self._height = height
 		self._width = width
@@ -49,6 +58,17 @@ class element:
 			self.padding_width = 0
 
 	def height(self, layout: Layout) -> float:
+		if self._measured_height is None:
+			self._measured_height = self.measure_height(layout)
+		return self._measured_height
+
+	def width(self, layout: Layout) -> float:
+		if self._measured_width is None:
+			self._measured_width = self.measure_width(layout)
+		return self._measured_width
+
+	def measure_height(self, layout: Layout) -> float:
+		layout.measured += 1
 		if self._height is not None:
 			return self._height + self.padding_height
 
@@ -66,7 +86,8 @@ class element:
 
 		return max(height_max, height) + self.padding_height
 
-	def width(self, layout: Layout) -> float:
+	def measure_width(self, layout: Layout) -> float:
+		layout.measured += 1
 		if self._width is not None:
 			return self._width + self.padding_width
 
@@ -88,16 +109,39 @@ class element:
 		if self.layout:
 			self.layout.dirty()
 		self.requires_render = True
+		self.invalidate()
+
+	# the html and size of every element containing this one depend on it so they are thrown away along with this element
+	def invalidate(self):
+		item = self
+		while item:
+			item.clear_cache()
+			item = item._parent
+
+	def clear_cache(self):
+		self._html = None
+		self._measured_height = None
+		self._measured_width = None
 
 	def html_inner(self, layout: Layout) -> str:
 		html = ''
 		for item in self.children:
-			html += item.html(layout)
+			html += item.html_cached(layout)
 		return html
 
+	def html_cached(self, layout: Layout) -> str:
+		if self._html is None:
+			self._html = self.html(layout)
+		return self._html
+
 	def html(self, layout: Layout) -> str:
 		...
 
+	# called on an element that is being kept in place of `other` which has the same type and key
+	# take anything needed from `other` and return True if this element needs to render again
+	def update_from(self, other: Any) -> bool:
+		return True
+
 	def added(self) -> None: ...
 	def removed(self) -> None: ...
 	def render(self) -> element.Children: ...
@@ -140,7 +184,7 @@ class div (element):
 		html = ''
 		children_inline = False
 		for item in self.children:
-			html += item.html(layout)
+			html += item.html_cached(layout)
 			children_inline = children_inline or item.is_inline
 
 		h = self.height(layout) - self.padding_height
@@ -171,7 +215,9 @@ class text (span, alignable):
 		return self._text
 
 	def align(self, width: int):
-		self.text = self.text[0:int(width)]
+		if width < len(self.text):
+			self.text = self.text[0:int(width)]
+			self.invalidate()
 
 	@text.setter
 	def text(self, text: str):
@@ -189,13 +235,23 @@ class click (span):
 	def __init__(self, on_click: Callable[[], Any], title: str|None = None) -> None:
 		super().__init__()
 		self.on_click = on_click
+		self.href: str|None = None
 		if title:
 			self.title = html_escape(title)
 		else:
 			self.title = None
 
+	# the handler stays registered for as long as this element is in the layout so its cached html stays valid
+	def removed(self) -> None:
+		if self.href:
+			self.layout.unregister_on_click_handler(self.href)
+			self.href = None
+
 	def html(self, layout: Layout) -> str:
-		href = layout.register_on_click_handler(self.on_click)
+		if not self.href:
+			self.href = layout.register_on_click_handler(self.on_click)
+
+		href = self.href
 		if self.title:
 			return f'<a href={href} title="{self.title}">{self.html_inner(layout)}</a>'
 		else:
@@ -235,7 +291,9 @@ class code(span, alignable):
 		return len(self.text) + self.padding_width
 
 	def align(self, width: int):
-		self.text = self.text[0:int(width)]
+		if width < len(self.text):
+			self.text = self.text[0:int(width)]
+			self.invalidate()
 
 	def html(self, layout: Layout) -> str:
 		self.text_html = ''
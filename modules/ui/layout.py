@@ -85,6 +85,10 @@ class Layout:
 		self.on_click_handlers_id = 0
 		self.requires_render = True
 		self.html = ""
+		self.stylesheet = ""
+
+		# number of elements measured during the last render
+		self.measured = 0
 		self.item: div|None = None
 		self.view = view
 		self._width = 0.0
@@ -110,15 +114,62 @@ class Layout:
 		self.requires_render = True
 		Layout._schedule_render_layouts()
 
-	def add_component_children(self, item: element) -> None:
+	# Replaces the children of item with the children it just rendered
+	# Children that were rendered last time are kept instead of being removed and added again, either because they are the same element or because they have the same type and key
+	# Only children that are no longer rendered are removed
+	def reconcile_component_children(self, item: element, children: list[element]) -> None:
+		previous = item.children
+		previous_ids = { id(child) for child in previous }
+		previous_keyed = { (type(child), child.key): child for child in previous if child.key is not None }
+		kept: set[int] = set()
+
+		for index, child in enumerate(children):
+			if id(child) in previous_ids and id(child) not in kept:
+				kept.add(id(child))
+				child.requires_render = True
+				continue
+
+			if child.key is None:
+				continue
+
+			existing = previous_keyed.pop((type(child), child.key), None)
+			if not existing or id(existing) in kept:
+				continue
+
+			kept.add(id(existing))
+			if existing.update_from(child):
+				existing.requires_render = True
+
+			children[index] = existing
+
+		for child in previous:
+			if id(child) not in kept:
+				self.remove_component(child)
+
 		if item._width is not None:
 			_parent_width = item._width
 		else:
 			_parent_width = item._max_allowed_width and item._max_allowed_width - item.padding_width
 
-		for item in item.children:
-			item._max_allowed_width = _parent_width
-			self.add_component(item)
+		for child in children:
+			if id(child) in kept:
+				if child._max_allowed_width != _parent_width:
+					child._max_allowed_width = _parent_width
+					child.requires_render = True
+				continue
+
+			child._max_allowed_width = _parent_width
+			child._parent = item
+			child.requires_render = True
+			self.add_component(child)
+
+		item.children = children
+
+	# the html of every element depends on the size of the layout so everything needs to render again when it changes
+	def dirty_component_tree(self, item: element) -> None:
+		item.requires_render = True
+		for child in item.children:
+			self.dirty_component_tree(child)
 
 	def add_component(self, item: element) -> None:
 		assert not item.layout, 'This item already has a layout?'
@@ -129,6 +180,7 @@ class Layout:
 		self.remove_component_children(item)
 		item.removed()
 		item.layout = None
+		item._parent = None
 
 	def remove_component_children(self, item: element) -> None:
 		for child in item.children:
@@ -143,21 +195,24 @@ class Layout:
 			return
 
 		item.requires_render = False
-		self.remove_component_children(item)
+		item.clear_cache()
 
 		key = type(item).__name__
 		self.count[key] = self.count.get(key, 0) + 1
 
 		children = item.render()
-		item.children = list(flatten_without_none(children))
-
-		self.add_component_children(item)
+		self.reconcile_component_children(item, list(flatten_without_none(children)))
 
+		# kept children that did not change only need to look for changes further down the tree
 		for child in item.children:
-			self.render_component_tree(child)
+			if child.requires_render:
+				self.render_component_tree(child)
+			else:
+				self.render_component(child)
 
 	def render_component(self, item: element) -> None:
 		if item.requires_render:
+			item.invalidate()
 			self.render_component_tree(item)
 		else:
 			for child in item.children:
@@ -170,29 +225,33 @@ class Layout:
 		if not self.item:
 			return False
 
-		self.on_click_handlers.clear()
 		self.requires_render = False
 		timer = core.stopwatch('render')
 		self.render_component(self.item)
 		if DEBUG_TIMING: timer()
 
-		timer = core.stopwatch('css')
-		css_string = css.generate(self)
+		# measure everything that changed up front so generating the html only has to look up sizes
+		# elements resized by align are measured again along with the elements containing them
+		timer = core.stopwatch('measure')
+		self.measured = 0
+		self.item.height(self)
+		self.item.width(self)
+		if DEBUG_TIMING: timer(f'{self.measured}')
 
 		if DEBUG_TIMING:
-			timer(f'{len(css_string)}')
+			print(f'css: {css.stylesheets_generated} generated {css.stylesheets_reused} reused')
 
 		timer = core.stopwatch('html')
 		html = f'''
 		<body id="debugger">
-			<style>{css_string}</style>
-			{self.item.html(self)}
+			<style>{self.stylesheet}</style>
+			{self.item.html_cached(self)}
 		</body>'''
 
 		self.html = html
 
 		if DEBUG_TIMING:
-			timer(f'{len(self.html)}')
+			timer(f'{len(self.html)} {self.measured}')
 
 
 		self.count = {}
@@ -211,6 +270,9 @@ class Layout:
 		self.on_click_handlers[id] = callback
 		return str(id)
 
+	def unregister_on_click_handler(self, href: str):
+		self.on_click_handlers.pop(int(href), None)
+
 	# width/height of the viewport in character width units
 	# for instance 6.5 is equal to 6 and 1/2 characters
 	def width(self) -> float:
@@ -251,7 +313,11 @@ class Layout:
 		self._em_width_to_rem = em_width / font_size *  rem_width_scale
 		self._em_width = em_width
 
+		# the stylesheet only changes along with these so it is not generated again until they change
+		self.stylesheet = css.generate(self)
+
 		if self.item:
+			self.dirty_component_tree(self.item)
 			self.item.dirty()
 
 
@@ -80,8 +80,28 @@ class css:
 	id = 0
 	instances = []
 
+	# the stylesheet only depends on the font size and rem scale of a layout so it is generated once for each and shared by every layout with the same ones
+	stylesheets: dict[tuple[float, float, int], str] = {}
+	stylesheets_generated = 0
+	stylesheets_reused = 0
+
 	@staticmethod
 	def generate(layout: Layout):
+		key = (layout.font_size, layout._em_width_to_rem, len(css.instances))
+		if stylesheet := css.stylesheets.get(key):
+			css.stylesheets_reused += 1
+			return stylesheet
+
+		# only a handful of font sizes are ever used so this should not happen unless someone is changing them a lot
+		if len(css.stylesheets) >= 16:
+			css.stylesheets.clear()
+
+		css.stylesheets_generated += 1
+		css.stylesheets[key] = css.generate_stylesheet(layout)
+		return css.stylesheets[key]
+
+	@staticmethod
+	def generate_stylesheet(layout: Layout):
 		css_string = base_css
 		css_string += 'html {{ font-size: {}px; }}'.format(layout.font_size * layout._em_width_to_rem)
 		css_string += 'body {{ font-size: {}px; }}'.format(layout.font_size)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from ..typecheck import *
+
+from .html import div, click, text, element
+from .align import spacer
+from .style import css
+from .layout import flatten_without_none
+
+class virtual_list (div):
+	'''
+		Renders a window into a long list instead of every item in it
+
+		Only the items that fit in the rows available to the list plus `overscan` extra items are rendered along with a single pager for the rest.
+		The rows available are the height of the panel the list is in, a list nested inside another list gets the rows its parent has left over.
+		Lists backed by an adapter that pages its items can pass `more` and `on_more` so the pager also fetches the next page.
+		The list needs a key so it is kept along with its offset when its parent renders again.
+	'''
+	def __init__(self, items: Sequence[Any], render_item: Callable[[Any], element.Children], key: Any, row_height: float = 3, overscan: int = 10, css: css|None = None, more: int = 0, on_more: Callable[[], Any]|None = None) -> None:
+		super().__init__(css=css)
+		self.items = items
+		self.render_item = render_item
+		self.key = key
+		self.row_height = row_height
+		self.overscan = overscan
+		self.more = more
+		self.on_more = on_more
+		self.offset = 0
+
+		# the window that was rendered last
+		self.start = 0
+		self.end = 0
+
+		# rows left for nested lists while this list renders, see `consume`
+		self.remaining = 0
+
+	def update_from(self, other: virtual_list) -> bool:
+		self.items = other.items
+		self.render_item = other.render_item
+		self.row_height = other.row_height
+		self.overscan = other.overscan
+		self.more = other.more
+		self.on_more = other.on_more
+		self.css = other.css
+		return True
+
+	# number of rows available to this list
+	def visible_count(self) -> int:
+		item = self._parent
+		while item:
+			if isinstance(item, virtual_list):
+				return max(item.remaining, 1)
+			if item._height is not None:
+				return max(int(item._height / self.row_height), 1)
+			item = item._parent
+
+		return max(int(self.layout.height() / self.row_height), 1)
+
+	# rows used by the elements of an item, rows with a fixed height can be more than one row
+	def rows(self, elements: list[element]) -> int:
+		rows = 0
+		for item in elements:
+			rows += max(round(item._height / self.row_height), 1) if item._height else 1
+		return max(rows, 1)
+
+	# takes rows from this list and every list it is nested in
+	def consume(self, rows: int):
+		item: element|None = self
+		while item:
+			if isinstance(item, virtual_list):
+				item.remaining -= rows
+			item = item._parent
+
+	def scroll(self, count: int):
+		self.offset = max(self.start + count, 0)
+		self.dirty()
+
+	def previous(self):
+		self.scroll(-max(self.end - self.start, 1))
+
+	def next(self):
+		if self.end < len(self.items):
+			self.scroll(self.end - self.start)
+			return
+
+		# show the next page once it has been fetched
+		if self.on_more:
+			self.offset = self.end
+			self.on_more()
+
+	def render(self) -> div.Children:
+		visible = self.visible_count()
+		count = len(self.items)
+
+		start = max(min(self.offset, count - visible), 0)
+		end = start
+		rows = 0
+		children: list[element] = []
+
+		while end < count and rows < visible + self.overscan:
+			elements = list(flatten_without_none(self.render_item(self.items[end])))
+			children.extend(elements)
+			rows += self.rows(elements)
+			end += 1
+
+		self.start = start
+		self.end = end
+		self.remaining = visible
+
+		if start == 0 and end == count and not self.more:
+			self.offset = 0
+			self.consume(rows)
+			return children
+
+		self.consume(rows + 1)
+
+		more = self.more and self.on_more
+		return [
+			children,
+			div(height=self.row_height)[
+				click(self.previous)[
+					text('◀ previous'),
+				] if start > 0 else None,
+				spacer(1),
+				text(f'{start + 1}-{end} of {count + self.more}'),
+				spacer(1),
+				click(self.next)[
+					text('next ▶'),
+				] if end < count or more else None,
+			]
+		]
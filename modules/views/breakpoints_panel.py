@@ -67,25 +67,44 @@ class BreakpointsPanel(ui.div):
 		assert False, "unreachable"
 
 	def render(self) -> ui.div.Children:
-		items: list[ui.div] = []
-
+		items: list[IBreakpoint] = []
 		for breakpoints in (self.breakpoints.filters, self.breakpoints.function, self.breakpoints.data, self.breakpoints.source):
-			for breakpoint in breakpoints:
-				items.append(
-					ui.div(height=css.row_height)[
-						ui.align()[
-							ui.click(partial(self.on_toggle, breakpoint))[
-								ui.icon(breakpoint.image),
-							],
-							ui.click(partial(self.on_select, breakpoint), title=breakpoint.description)[
-								ui.text(breakpoint.name, css=css.label_secondary),
-								[
-									ui.spacer(),
-									ui.text(breakpoint.tag, css=css.button),
-								] 
-								if breakpoint.tag else None
-							]
-						]
-					])
-
-		return items
+			items.extend(breakpoints)
+
+		return ui.virtual_list(items, self.render_breakpoint, key='breakpoints')
+
+	def render_breakpoint(self, breakpoint: IBreakpoint) -> BreakpointView:
+		return BreakpointView(breakpoint, self.on_toggle, self.on_select)
+
+
+class BreakpointView(ui.div):
+	def __init__(self, breakpoint: IBreakpoint, on_toggle: Callable[[IBreakpoint], None], on_select: Callable[[IBreakpoint], None]) -> None:
+		super().__init__(height=css.row_height)
+		self.breakpoint = breakpoint
+		self.on_toggle = on_toggle
+		self.on_select = on_select
+
+		# rows for breakpoints that have not changed are kept as is when the panel renders
+		self.key = id(breakpoint)
+		self.rendered = (breakpoint.image, breakpoint.name, breakpoint.tag, breakpoint.description)
+
+	def update_from(self, other: BreakpointView) -> bool:
+		changed = self.rendered != other.rendered
+		self.rendered = other.rendered
+		return changed
+
+	def render(self) -> ui.div.Children:
+		breakpoint = self.breakpoint
+		return ui.align()[
+			ui.click(partial(self.on_toggle, breakpoint))[
+				ui.icon(breakpoint.image),
+			],
+			ui.click(partial(self.on_select, breakpoint), title=breakpoint.description)[
+				ui.text(breakpoint.name, css=css.label_secondary),
+				[
+					ui.spacer(),
+					ui.text(breakpoint.tag, css=css.button),
+				]
+				if breakpoint.tag else None
+			]
+		]
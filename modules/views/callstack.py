@@ -101,6 +101,12 @@ class SessionView (ui.div):
 		self.prefix = prefix
 		self.state = state
 		self.is_selected = session == debugger.session
+		self.key = id(session)
+
+	def update_from(self, other: SessionView) -> bool:
+		self.prefix = other.prefix
+		self.is_selected = other.is_selected
+		return True
 
 	def selected_session(self):
 		self.debugger.active = self.session
@@ -140,21 +146,19 @@ class SessionView (ui.div):
 			return label_view
 			
 
-		items: list[SessionView|ThreadView] = []
-
-		for session in self.session.children:
-			items.append(SessionView(self.debugger, session, self.state))
-
-		for thread in self.session.threads:
-			items.append(ThreadView(self.debugger, self.session, thread, self.state))
+		items: list[dap.Session|dap.Thread] = [*self.session.children, *self.session.threads]
 
 		return [
 			label_view,
-			ui.div(css=css.table_inset)[
-				items
-			]
+			ui.virtual_list(items, self.render_item, key='threads', css=css.table_inset),
 		]
 
+	def render_item(self, item: dap.Session|dap.Thread) -> SessionView|ThreadView:
+		if isinstance(item, dap.Session):
+			return SessionView(self.debugger, item, self.state)
+
+		return ThreadView(self.debugger, self.session, item, self.state)
+
 class ThreadView (ui.div):
 	def __init__(self, debugger: Debugger, session: dap.Session, thread: dap.Thread, state: CallStackState):
 		super().__init__()
@@ -166,11 +170,22 @@ class ThreadView (ui.div):
 		self.thread = thread
 		self.state = state
 		self.frames: list[dap.StackFrame] = []
+		self.key = id(thread)
+
+		# the session generation the frames were fetched for, every stop advances the generation
+		self.fetched_generation: int|None = None
 
 		if self.is_selected:
 			self.state.set_expanded(thread, True)
 
+	def added(self):
+		self.fetch()
+
+	def update_from(self, other: ThreadView) -> bool:
+		self.is_selected = other.is_selected
+		self.show_thread_name = other.show_thread_name
 		self.fetch()
+		return True
 
 	@property
 	def is_expanded(self):
@@ -184,9 +199,19 @@ class ThreadView (ui.div):
 		if not self.is_expanded or not self.thread.stopped:
 			return
 
+		# this view is updated every time its parent renders so only fetch the frames again once the thread has stopped again
+		if self.fetched_generation == self.session.generation:
+			return
+
+		self.fetched_generation = self.session.generation
 		self.frames = await self.thread.children()
 		self.dirty()
 
+	@core.schedule
+	async def load_more(self):
+		self.frames = await self.thread.load_more_children()
+		self.dirty()
+
 	def toggle_expand(self):
 		self.toggle_expanded()
 		self.fetch()
@@ -237,13 +262,26 @@ class ThreadView (ui.div):
 			thread_item = ui.div()
 
 		if is_expanded:
+			load_more_frames = None
+			if self.frames and self.thread.has_more_children():
+				load_more_frames = ui.div(height=css.row_height)[
+					ui.click(self.load_more)[
+						ui.spacer([1, 3][self.show_thread_name]),
+						ui.text('load more frames...', css=css.label_secondary)
+					]
+				]
+
 			return [
 				thread_item,
-				[StackFrameComponent(frame, self.is_selected and self.session.selected_frame == frame, lambda frame=frame: self.on_select_frame(frame), self.show_thread_name) for frame in self.frames]
+				ui.virtual_list(self.frames, self.render_frame, key='frames'),
+				load_more_frames,
 			]
 		else:
 			return thread_item
 
+	def render_frame(self, frame: dap.StackFrame) -> StackFrameComponent:
+		return StackFrameComponent(frame, self.is_selected and self.session.selected_frame == frame, lambda: self.on_select_frame(frame), self.show_thread_name)
+
 
 class StackFrameComponent (ui.div):
 	def __init__(self, frame: dap.StackFrame, is_selected: bool, on_click: Callable[[], None], show_thread_name: bool) -> None:
@@ -251,10 +289,18 @@ class StackFrameComponent (ui.div):
 		self.frame = frame
 		self.on_click = on_click
 		self.show_thread_name = show_thread_name
+		self.key = id(frame)
 
 		if is_selected:
 			self.css = css.selected
 
+	def update_from(self, other: StackFrameComponent) -> bool:
+		changed = self.css is not other.css or self.show_thread_name != other.show_thread_name
+		self.css = other.css
+		self.on_click = other.on_click
+		self.show_thread_name = other.show_thread_name
+		return changed
+
 	def render(self) -> ui.div.Children:
 		frame = self.frame
 		source = frame.source
@@ -278,7 +324,7 @@ class StackFrameComponent (ui.div):
 			items.append(ui.spacer(1))
 			items.append(ui.text(line_str, css=css.button))
 
-		file_and_line = ui.click(self.on_click)[
+		file_and_line = ui.click(lambda: self.on_click())[
 			ui.align()[
 				items
 			]
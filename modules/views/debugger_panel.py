@@ -98,11 +98,14 @@ class DebuggerPanel(ui.div):
 
 		panel_items.append(self.breakpoints)
 
+		# the panel fills the rest of the view, the breakpoints list only renders the rows that fit in this height
+		height = max(self.layout.height() - css.header_height - css.controls_panel.padding_height - css.panel.padding_height, css.row_height)
+
 		return [
 			ui.div(height=css.header_height, width=30 - css.controls_panel.padding_width, css=css.controls_panel)[
 				items
 			],
-			ui.div(width=30 - css.rounded_panel.padding_width, height=1000, css=css.panel)[
+			ui.div(width=30 - css.rounded_panel.padding_width, height=height, css=css.panel)[
 				panel_items
 			],
 		]
@@ -54,56 +54,57 @@ class ModulesPanel(Panel):
 			items.append(ui.div(height=css.row_height)[
 				ui.text(session.name)
 			])
-
-			for module in session.modules.values():
-				is_expanded = self.is_expanded(module)
-				image_toggle = ui.Images.shared.open if is_expanded else ui.Images.shared.close
-				item = ui.div(height=css.row_height)[
+			items.append(ui.virtual_list(list(session.modules.values()), self.render_module, key=id(session)))
+
+		return items
+
+	def render_module(self, module: dap.Module) -> ui.div.Children:
+		is_expanded = self.is_expanded(module)
+		image_toggle = ui.Images.shared.open if is_expanded else ui.Images.shared.close
+		item = ui.div(height=css.row_height)[
+			ui.align()[
+				ui.click(lambda module=module: self.toggle_expanded(module))[ #type: ignore
+					ui.icon(image_toggle),
+				],
+				ui.text(module.name)
+			]
+		]
+		if not is_expanded:
+			return item
+
+		body: list[ui.div] = []
+		def add_item(label: str, value: Any):
+			if value is None:
+				return
+
+			def copy():
+				ui.InputList([
+					ui.InputListItem(lambda: sublime.set_clipboard(value), "Copy")
+				], value).run()
+
+			value_str = str(value)
+			body.append(
+				ui.div(height=3)[
 					ui.align()[
-						ui.click(lambda module=module: self.toggle_expanded(module))[ #type: ignore
-							ui.icon(image_toggle),
-						],
-						ui.text(module.name)
+						ui.click(copy)[
+							ui.text(label, css=css.label_secondary),
+							ui.spacer(1),
+							ui.text(value_str, css=css.label),
+						]
 					]
 				]
-				items.append(item)
-				if is_expanded:
-					body: list[ui.div] = []
-					def add_item(label: str, value: Any):
-						if value is None:
-							return
-
-						def copy():
-							ui.InputList([
-								ui.InputListItem(lambda: sublime.set_clipboard(value), "Copy")
-							], value).run()
-
-						value_str = str(value)
-						body.append(
-							ui.div(height=3)[
-								ui.align()[
-									ui.click(copy)[
-										ui.text(label, css=css.label_secondary),
-										ui.spacer(1),
-										ui.text(value_str, css=css.label),
-									]
-								]
-							]
-						)
-
-					add_item('version', module.version)
-					add_item('optimized', module.isOptimized)
-					add_item('path', module.path)
-					add_item('symbols', module.symbolStatus)
-					add_item('symbol file path', module.symbolFilePath)
-					add_item('load address', module.addressRange)
-
-					items.append(ui.div(css=css.table_inset)[
-						body
-					])
+			)
+
+		add_item('version', module.version)
+		add_item('optimized', module.isOptimized)
+		add_item('path', module.path)
+		add_item('symbols', module.symbolStatus)
+		add_item('symbol file path', module.symbolFilePath)
+		add_item('load address', module.addressRange)
 
 		return [
-			ui.div()[
-				items
+			item,
+			ui.div(css=css.table_inset)[
+				body
 			]
 		]
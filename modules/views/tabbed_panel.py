@@ -119,13 +119,16 @@ class TabbedPanel(ui.div):
 				tab
 			])
 
+		# the panel fills the rest of the view, virtual lists inside it only render the rows that fit in this height
+		height = max(self.layout.height() - 4 - css.rounded_panel.padding_height, css.row_height)
+
 		return [
 			ui.div(width=width, height=4)[
 				ui.align()[
 					tabs
 				]
 			],
-			ui.div(width=width - css.rounded_panel.padding_width, height=1000, css=css.rounded_panel)[
+			ui.div(width=width - css.rounded_panel.padding_width, height=height, css=css.rounded_panel)[
 				self.items[self.selected_index]
 			],
 		]
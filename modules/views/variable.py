@@ -46,9 +46,24 @@ class VariableComponent (ui.div):
 		self.on_clicked_source = on_clicked_source
 		self.source = source
 
-		if self.state.is_expanded(self.variable):
+		# keep this component and its children when the parent renders the same variable again
+		self.key = id(variable)
+		self.rendered_expanded = False
+
+	def added(self):
+		if self.state.is_expanded(self.variable) and self.variable_children is None:
 			self.set_expanded()
 
+	def update_from(self, other: VariableComponent) -> bool:
+		changed = self.source != other.source or self.children_only != other.children_only
+		self.source = other.source
+		self.on_clicked_source = other.on_clicked_source
+		self.children_only = other.children_only
+
+		# the parent may have expanded this variable since it was last rendered
+		self.added()
+		return changed or self.rendered_expanded != self.state.is_expanded(self.variable)
+
 	@core.schedule
 	async def edit_variable(self) -> None:
 		if not self.variable.containerVariablesReference:
@@ -70,7 +85,9 @@ class VariableComponent (ui.div):
 				response = await session.set_variable(containerVariablesReference, name, value)
 				self.variable.value = response.value
 				self.variable.variablesReference = response.variablesReference
-				self.variable.fetched = None
+				self.variable.namedVariables = response.namedVariables
+				self.variable.indexedVariables = response.indexedVariables
+				self.variable.clear_children()
 				self.dirty()
 			except core.Error as e:
 				core.exception()
@@ -156,10 +173,14 @@ class VariableComponent (ui.div):
 		self.dirty()
 		
 		try:
-			self.variable_children = await self.variable.children()
+			self.variable_children = await self.variable.children(self.state.number_expanded(self.variable))
 		except core.Error as error:
 			self.error = error
 
+		# the program continued or stopped again, collapse the row instead of leaving it loading forever
+		except core.CancelledError:
+			self.state.set_expanded(self.variable, False)
+
 		self.dirty()
 
 	@core.schedule
@@ -171,9 +192,19 @@ class VariableComponent (ui.div):
 		else:
 			await self.set_expanded()
 
-	def show_more(self) -> None:
-		count = self.state.number_expanded(self.variable)
-		self.state.set_number_expanded(self.variable, count + 20)
+	# paged containers only have the children that are shown so fetch the next page
+	@core.schedule
+	async def show_more(self) -> None:
+		count = self.state.number_expanded(self.variable) + 20
+		self.state.set_number_expanded(self.variable, count)
+
+		try:
+			self.variable_children = await self.variable.children(count)
+		except core.Error as error:
+			self.error = error
+		except core.CancelledError:
+			...
+
 		self.dirty()
 
 	def clicked_source(self):
@@ -184,6 +215,7 @@ class VariableComponent (ui.div):
 		name =  self.variable.name
 		value = self.variable.value or ''
 		is_expanded = self.state.is_expanded(self.variable)
+		self.rendered_expanded = is_expanded
 		source = self.source
 
 		if name:
@@ -230,44 +262,39 @@ class VariableComponent (ui.div):
 				variable_label
 			]
 
+		# the children are rendered in a virtual list that is kept when this variable renders again so only the changed children render again
 		variable_children: list[ui.div] = []
-		
+
 		if self.error:
 			variable_children.append(
-				ui.div(height=css.row_height)[
-					ui.text(str(self.error), css=css.label_redish_secondary)
+				ui.div(css=css.table_inset)[
+					ui.div(height=css.row_height)[
+						ui.text(str(self.error), css=css.label_redish_secondary)
+					]
 				]
 			)
 		elif self.variable_children is None:
 			variable_children.append(
-				ui.div(height=css.row_height)[
-					ui.text('◌', css=css.label_secondary)
+				ui.div(css=css.table_inset)[
+					ui.div(height=css.row_height)[
+						ui.text('◌', css=css.label_secondary)
+					]
 				]
 			)
+		elif self.variable.is_paged:
+			# the adapter only sent the children that were asked for, the list pages through those and fetches more once it reaches the end
+			more = self.variable.remaining_children(self.state.number_expanded(self.variable))
+			variable_children.append(ui.virtual_list(self.variable_children, self.render_child, key='children', css=css.table_inset, more=more, on_more=self.show_more))
 		else:
-			count = self.state.number_expanded(self.variable)
-			for variable in self.variable_children[:count]:
-				variable_children.append(VariableComponent(self.debugger, variable, state=self.state))
-
-			more_count = len(self.variable_children) - count
-			if more_count > 0:
-				variable_children.append(
-					ui.div(height=css.row_height)[
-						ui.click(self.show_more)[
-							ui.spacer(3),
-							ui.text('{} more items...'.format(more_count), css=css.label_secondary)
-						]
-					]
-				)
+			variable_children.append(ui.virtual_list(self.variable_children, self.render_child, key='children', css=css.table_inset))
 
 		if self.children_only:
-			return ui.div(css=css.table_inset)[
-				variable_children
-			]
+			return variable_children
 
 		return [
 			variable_label,
-			ui.div(css=css.table_inset)[
-				variable_children
-			]
+			variable_children,
 		]
+
+	def render_child(self, variable: dap.Variable) -> VariableComponent:
+		return VariableComponent(self.debugger, variable, state=self.state)
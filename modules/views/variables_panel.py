@@ -51,7 +51,7 @@ class VariablesView (ui.div):
 
 		variables = [VariableComponent(self.debugger, variable) for variable in session.variables]
 		if variables:
-			variables[0].set_expanded()
+			variables[0].state.set_expanded(variables[0].variable, True)
 
 		return variables
 
@@ -52,14 +52,30 @@ class Watch:
 		ui.InputText(add, "Expression to watch").run()
 
 	async def evaluate(self, session: dap.Session, frame: dap.StackFrame) -> None:
+		if evaluated := await self.evaluations(session, frame):
+			evaluated()
+
+	# evaluates every expression and returns a function that updates the expressions with the results so they can be shown along with everything else for a stop
+	async def evaluations(self, session: dap.Session, frame: dap.StackFrame) -> Callable[[], None]|None:
+		generation = session.generation
+		expressions = list(self.expressions)
+
 		results: list[Awaitable[dap.EvaluateResponse]] = []
-		for expression in self.expressions:
-			results.append(session.evaluate_expression(expression.value, "watch"))
+		for expression in expressions:
+			results.append(session.evaluate_expression(expression.value, "watch", generation, frame.id))
 
 		evaluations = await core.gather_results(*results)
-		for expression, evaluation in zip(self.expressions, evaluations):
-			self.evaluated(session, expression, evaluation)
-		self.on_updated.post()
+
+		# the program stopped again or continued so these results are stale and there will be another evaluation if needed
+		if session.generation != generation:
+			return None
+
+		def evaluated():
+			for expression, evaluation in zip(expressions, evaluations):
+				self.evaluated(session, expression, evaluation, generation)
+			self.on_updated.post()
+
+		return evaluated
 
 	async def evaluate_expression(self, session: dap.Session, expression: Watch.Expression) -> None:
 		try:
@@ -69,11 +85,11 @@ class Watch:
 			self.evaluated(session, expression, result)
 		self.on_updated.post()
 
-	def evaluated(self, session: dap.Session, expression: Watch.Expression, evaluation: Union[Exception, dap.EvaluateResponse]):
+	def evaluated(self, session: dap.Session, expression: Watch.Expression, evaluation: Union[Exception, dap.EvaluateResponse], generation: int|None = None):
 		if isinstance(evaluation, Exception):
 			expression.message = str(evaluation)
 		else:
-			expression.evaluate_response = dap.Variable.from_evaluate(session, expression.value, evaluation)
+			expression.evaluate_response = dap.Variable.from_evaluate(session, expression.value, evaluation, generation)
 
 	def clear_session_data(self, session: dap.Session):
 		for expression in self.expressions:
@@ -25,6 +25,7 @@ from .modules.typecheck import *
 from .modules import core
 from .modules import ui
 from .modules import dap
+from .modules import persistance
 
 from .modules.debugger import Debugger
 from .modules.views.variable import VariableComponent
@@ -57,6 +58,9 @@ def plugin_unloaded() -> None:
 		core.info('Removing debugger')
 		instance.dispose()
 	Debugger.instances = {}
+
+	# the debuggers save in the background, make sure it is written before the plugin goes away
+	persistance.wait(timeout=5)
 	ui.shutdown()
 	core.info('[finished]')
 
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import sublime
+import unittest
+from unittest import mock
+
+from ..modules.typecheck import *
+from ..modules import core
+
+
+class EventLoopTestCase(unittest.TestCase):
+	'''
+		Runs the callbacks the sublime event loop schedules with set_timeout right away instead of waiting for sublime to run them
+	'''
+	def setUp(self):
+		self.timeouts: list[tuple[float, Callable[[], None]]] = []
+		patcher = mock.patch.object(sublime, 'set_timeout', lambda callback, delay=0: self.timeouts.append((delay, callback)), create=True)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	# runs everything that is scheduled including anything scheduled while running, callbacks scheduled with a delay are run once nothing else is scheduled unless `delayed` is False
+	def run_scheduled(self, delayed: bool = True):
+		while self.timeouts:
+			self.timeouts.sort(key=lambda timeout: timeout[0])
+			if not delayed and self.timeouts[0][0]:
+				return
+
+			_, callback = self.timeouts.pop(0)
+			callback()
+
+	def run_until_complete(self, awaitable: Awaitable[Any]) -> Any:
+		future = core.run(awaitable)
+		self.run_scheduled()
+		self.assertTrue(future.done(), 'awaitable did not complete')
+		return future.result()
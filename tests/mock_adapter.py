@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+
+from ..modules.typecheck import *
+
+
+class MockAdapter:
+	'''
+		An in process debug adapter for a program with a single thread that stops on the next line every time it is stepped
+
+		Responses and events are delivered as soon as a request is written the same way the reactor delivers data so the whole protocol runs on the calling thread
+	'''
+
+	def __init__(self, frames: int = 20, variables: int = 50) -> None:
+		self.frame_count = frames
+		self.variable_count = variables
+		self.line = 1
+		self.seq = 0
+		self.requests: dict[str, int] = {}
+		self.on_data: Callable[[bytes], None]|None = None
+
+	def read_with_reactor(self, on_data: Callable[[bytes], None]) -> bool:
+		self.on_data = on_data
+		return True
+
+	def writelines(self, data: list[bytes]):
+		# the protocol writes a header and a body for each message
+		for content in data[1::2]:
+			self.handle(json.loads(content))
+
+	def write(self, message: bytes):
+		raise NotImplementedError
+
+	def dispose(self):
+		...
+
+	def handle(self, request: dict[str, Any]):
+		command = request['command']
+		self.requests[command] = self.requests.get(command, 0) + 1
+
+		self.send({
+			'type': 'response',
+			'request_seq': request['seq'],
+			'command': command,
+			'success': True,
+			'body': getattr(self, command)(request['arguments']),
+		})
+
+		if command in ('next', 'stepIn', 'stepOut'):
+			self.line += 1
+			self.stopped('step')
+
+	def stopped(self, reason: str):
+		self.send({ 'type': 'event', 'event': 'stopped', 'body': { 'reason': reason, 'threadId': 1, 'allThreadsStopped': True } })
+
+	def send(self, message: dict[str, Any]):
+		assert self.on_data, 'not reading'
+
+		self.seq += 1
+		message['seq'] = self.seq
+		content = json.dumps(message).encode('utf-8')
+		self.on_data(b'Content-Length: %d\r\n\r\n' % len(content) + content)
+
+	def threads(self, arguments: Any):
+		return { 'threads': [{ 'id': 1, 'name': 'main' }] }
+
+	def stackTrace(self, arguments: Any):
+		return {
+			'stackFrames': [
+				{ 'id': index, 'name': f'frame{index}', 'line': self.line if index == 0 else index, 'column': 1, 'source': { 'name': 'main.py', 'path': '/main.py' } } for index in range(self.frame_count)
+			],
+			'totalFrames': self.frame_count,
+		}
+
+	def scopes(self, arguments: Any):
+		return { 'scopes': [{ 'name': 'Locals', 'variablesReference': 1, 'expensive': False }] }
+
+	def variables(self, arguments: Any):
+		return {
+			'variables': [
+				{ 'name': f'v{index}', 'value': str(self.line), 'type': 'int', 'variablesReference': 0 } for index in range(self.variable_count)
+			]
+		}
+
+	def evaluate(self, arguments: Any):
+		return { 'result': str(self.line), 'variablesReference': 0 }
+
+	def next(self, arguments: Any):
+		return {}
+
+	stepIn = next
+	stepOut = next
+
+	def cancel(self, arguments: Any):
+		return {}
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from ..modules.typecheck import *
+from ..modules import core
+from ..modules.dap import dap # dap has to be imported before breakpoints since they import each other
+from ..modules.breakpoints import Breakpoints, SourceBreakpoint
+from ..modules.dap.session import Session
+from ..modules.dap.transport import TransportProtocol, TransportStream
+from ..modules.dap.transports import SocketTransport, ReactorChannel
+from ..modules.watch import Watch
+from .event_loop import EventLoopTestCase
+
+
+class Log:
+	def log(self, type: str, value: Any):
+		...
+	def info(self, value: str):
+		...
+	def error(self, value: str):
+		...
+
+
+class Listener:
+	def __getattr__(self, name: str):
+		return lambda *args: None
+
+
+class Connection:
+	def __init__(self, connection: socket.socket):
+		self.connection = connection
+
+	def readinto(self, buffer: memoryview) -> int:
+		return self.connection.recv_into(buffer)
+
+
+# answers the breakpoint requests the session sends when it starts
+def serve(server: socket.socket):
+	connection, _ = server.accept()
+	with connection:
+		stream = TransportStream(Connection(connection)) #type: ignore
+		while True:
+			try:
+				request = stream.read_message()
+			except (EOFError, OSError):
+				return
+
+			arguments = request.arguments or {}
+			body = { 'breakpoints': [{ 'verified': True, 'line': breakpoint['line'] } for breakpoint in arguments.get('breakpoints', [])] }
+			content = json.dumps({ 'seq': 0, 'type': 'response', 'request_seq': request.seq, 'command': request.command, 'success': True, 'body': body }).encode('utf-8')
+			connection.sendall(b'Content-Length: %d\r\n\r\n' % len(content) + content)
+
+
+class TestBreakpointSyncBenchmark(EventLoopTestCase):
+	'''
+		Counts the writes and measures the time it takes to send the breakpoints in 500 files to an adapter over a socket when a session starts
+	'''
+
+	files = 500
+	breakpoints_per_file = 4
+
+	def sync(self) -> tuple[int, int, float]:
+		breakpoints = Breakpoints()
+		self.addCleanup(breakpoints.dispose)
+		for file in range(self.files):
+			for line in range(self.breakpoints_per_file):
+				breakpoints.source.index(SourceBreakpoint(breakpoints.source, f'/project/file{file}.py', line * 10 + 1, None, True))
+
+		server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		self.addCleanup(server.close)
+		server.bind(('127.0.0.1', 0))
+		server.listen(1)
+		thread = threading.Thread(target=serve, args=(server,))
+		thread.start()
+
+		transport = SocketTransport(Log(), '127.0.0.1', server.getsockname()[1]) #type: ignore
+		channel = transport.channel
+		assert channel
+
+		# every write to the socket is a single send or sendmsg system call
+		writes = 0
+		_write = channel._write
+		def write(data: list[bytes|memoryview]) -> int:
+			nonlocal writes
+			writes += 1
+			return _write(data)
+		channel._write = write #type: ignore
+
+		log = Log()
+		session = Session(SimpleNamespace(type='mock'), SimpleNamespace(name='mock'), None, False, breakpoints, Watch(), Listener(), log, None) #type: ignore
+		session._transport = TransportProtocol(transport, session, log) #type: ignore
+
+		start = time.perf_counter()
+		future = core.run(session.add_breakpoints())
+		while not future.done():
+			self.run_scheduled()
+			time.sleep(0.0001)
+		elapsed = time.perf_counter() - start
+
+		future.result()
+		session._transport.dispose()
+		thread.join()
+
+		verified = sum(1 for breakpoint in breakpoints.source if breakpoint.verified and breakpoint._results)
+		self.assertEqual(verified, self.files * self.breakpoints_per_file)
+		return writes, session._transport.statistics.flushed_messages, elapsed
+
+	def test_sync(self):
+		writes, messages, elapsed = self.sync()
+
+		# the same sync writing each message as soon as it is sent instead of once at the end of the tick
+		send_content = TransportProtocol.send_content
+		def send_and_flush(self: TransportProtocol, content: bytes) -> int:
+			size = send_content(self, content)
+			self.flush()
+			return size
+
+		with mock.patch.object(TransportProtocol, 'send_content', send_and_flush):
+			uncoalesced_writes, uncoalesced_messages, uncoalesced_elapsed = self.sync()
+
+		print(f'\n{self.files} files: {messages} messages in {writes} writes {elapsed * 1000:.0f}ms, one write per message: {uncoalesced_writes} writes {uncoalesced_elapsed * 1000:.0f}ms')
+
+		self.assertEqual(messages, uncoalesced_messages)
+		self.assertGreaterEqual(uncoalesced_writes, messages)
+		self.assertLess(writes, uncoalesced_writes)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import unittest
+
+from ..modules.core.json import DottedDict
+from ..modules.dap import dap
+from ..modules.dap.transport import TransportStream
+
+
+class BytesTransport:
+	def __init__(self, data: bytes):
+		self.data = data
+
+	def readinto(self, buffer: memoryview) -> int:
+		size = min(len(buffer), len(self.data))
+		buffer[:size] = self.data[:size]
+		self.data = self.data[size:]
+		return size
+
+
+def framed(*messages: dict) -> bytes:
+	data = b''
+	for message in messages:
+		body = json.dumps(message).encode('utf-8')
+		data += b'Content-Length: %d\r\n\r\n' % len(body) + body
+	return data
+
+
+class TestDecoder(unittest.TestCase):
+	def read(self, *messages: dict):
+		stream = TransportStream(BytesTransport(framed(*messages)), chunk_size=64)
+		return [stream.read_message() for _ in messages]
+
+	def test_decodes_messages_into_dotted_dicts(self):
+		event, response = self.read(
+			{ 'seq': 1, 'type': 'event', 'event': 'initialized' },
+			{ 'seq': 2, 'type': 'response', 'request_seq': 1, 'command': 'evaluate', 'success': True, 'body': { 'result': '1', 'variablesReference': 0, 'nested': { 'a': 1 } } },
+		)
+		self.assertIsInstance(event, DottedDict)
+		self.assertEqual(event.event, 'initialized')
+		self.assertIsNone(event.body)
+
+		self.assertIsInstance(response.body, DottedDict)
+		self.assertEqual(response.body.result, '1')
+		self.assertEqual(response.body.nested.a, 1)
+
+	def test_decodes_hot_responses_and_keeps_extra_fields(self):
+		response, = self.read({
+			'seq': 3, 'type': 'response', 'request_seq': 2, 'command': 'variables', 'success': True,
+			'body': {
+				'variables': [
+					{ 'name': 'a', 'value': '1', 'variablesReference': 0, 'presentationHint': { 'kind': 'property' } },
+					{ 'name': 'b', 'value': '2', 'variablesReference': 5, 'vendorField': { 'x': 1 } },
+				],
+			},
+		})
+
+		a, b = response.body.variables
+		self.assertEqual(type(a).__name__, dap.Variable.__name__)
+		self.assertEqual(a.name, 'a')
+		self.assertIsNone(a.type)
+		self.assertEqual(a.presentationHint, { 'kind': 'property' })
+		self.assertFalse(a.__dict__)
+
+		self.assertEqual(b.variablesReference, 5)
+		self.assertEqual(b.vendorField, { 'x': 1 })
+		self.assertEqual(b.into_json(), { 'name': 'b', 'value': '2', 'variablesReference': 5, 'vendorField': { 'x': 1 } })
+
+	def test_failed_responses_are_not_converted(self):
+		response, = self.read({ 'seq': 4, 'type': 'response', 'request_seq': 3, 'command': 'variables', 'success': False, 'message': 'failed', 'body': { 'variables': [{ 'name': 'a' }] } })
+		self.assertIsInstance(response.body.variables[0], DottedDict)
+
+	def test_command_keys_in_the_body_do_not_change_the_result(self):
+		evaluate, variables = self.read(
+			{ 'body': { 'result': '1', 'variablesReference': 0, 'nested': { 'command': 'variables' } }, 'seq': 5, 'type': 'response', 'request_seq': 4, 'command': 'evaluate', 'success': True },
+			{ 'body': { 'variables': [{ 'name': 'a', 'value': '1', 'variablesReference': 0 }], 'nested': { 'command': 'evaluate' } }, 'seq': 6, 'type': 'response', 'request_seq': 5, 'command': 'variables', 'success': True },
+		)
+		self.assertIsInstance(evaluate.body, DottedDict)
+		self.assertEqual(evaluate.body.nested.command, 'variables')
+
+		self.assertEqual(variables.body.variables[0].name, 'a')
+		self.assertEqual(variables.body.nested.command, 'evaluate')
+
+	def test_buffer_shrinks_after_a_large_message(self):
+		stream = TransportStream(BytesTransport(b''), chunk_size=64)
+		large = { 'seq': 1, 'type': 'event', 'event': 'output', 'body': { 'output': 'x' * 10000 } }
+		small = { 'seq': 2, 'type': 'event', 'event': 'initialized' }
+
+		messages = list(stream.feed(framed(large)))
+		self.assertEqual(messages[0].body.output, 'x' * 10000)
+		self.assertGreater(len(stream.buffer), 10000)
+
+		data = framed(small)
+		messages = list(stream.feed(data[:20])) + list(stream.feed(data[20:]))
+		self.assertEqual(messages[0].event, 'initialized')
+		self.assertLessEqual(len(stream.buffer), 64 * TransportStream.shrink_after)
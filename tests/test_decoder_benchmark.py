@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+import unittest
+
+from ..modules import core
+from ..modules.dap.decoder import decode_message
+
+
+def response(command: str, body: dict) -> str:
+	return json.dumps({ 'seq': 1, 'type': 'response', 'request_seq': 1, 'command': command, 'success': True, 'body': body })
+
+messages = {
+	'variables x20000': response('variables', {
+		'variables': [
+			{ 'name': f'v{i}', 'value': str(i) * 5, 'type': 'int', 'variablesReference': i, 'evaluateName': f'x.v{i}', 'presentationHint': { 'kind': 'property', 'attributes': ['readOnly'] } } for i in range(20000)
+		]
+	}),
+	'stackTrace x5000': response('stackTrace', {
+		'stackFrames': [
+			{ 'id': i, 'name': f'f{i}', 'line': i, 'column': 1, 'source': { 'name': 'a.go', 'path': '/x/a.go' } } for i in range(5000)
+		]
+	}),
+	'evaluate': response('evaluate', { 'result': '1', 'variablesReference': 0 }),
+}
+
+
+class TestDecoderBenchmark(unittest.TestCase):
+	'''
+		Compares decoding messages into slotted objects against decoding everything into DottedDict with core.json_decode
+	'''
+
+	def measure(self, decode: Callable[[str], Any], contents: str) -> tuple[float, int, int]:
+		repeat = max(1, 200000 // len(contents))
+
+		best = float('inf')
+		for _ in range(5):
+			start = time.perf_counter()
+			for _ in range(repeat):
+				decode(contents)
+			best = min(best, (time.perf_counter() - start) / repeat)
+
+		# the number of allocations and bytes kept alive by the decoded message
+		tracemalloc.start()
+		try:
+			before = tracemalloc.take_snapshot()
+			decoded = decode(contents)
+			after = tracemalloc.take_snapshot()
+		finally:
+			tracemalloc.stop()
+
+		statistics = after.compare_to(before, 'filename')
+		del decoded
+		return best, sum(stat.count_diff for stat in statistics), sum(stat.size_diff for stat in statistics)
+
+	def test_decode(self):
+		report = ['']
+		for name, contents in messages.items():
+			dotted_time, dotted_count, dotted_size = self.measure(core.json_decode, contents)
+			decoded_time, decoded_count, decoded_size = self.measure(decode_message, contents)
+
+			report.append(f'{name:18} DottedDict {dotted_time * 1000:8.3f}ms {dotted_count:7} allocations {dotted_size / 1024:8.0f}KB')
+			report.append(f'{name:18} decoder    {decoded_time * 1000:8.3f}ms {decoded_count:7} allocations {decoded_size / 1024:8.0f}KB')
+
+			# timings are too noisy to compare here but the decoded message should never take more allocations or keep more memory alive than DottedDict
+			self.assertLessEqual(decoded_count, dotted_count, name)
+			self.assertLessEqual(decoded_size, dotted_size * 1.05, name)
+
+		print('\n'.join(report))
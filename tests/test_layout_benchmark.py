@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+from unittest import mock
+
+from ..modules import ui
+from ..modules.ui.html import element
+from ..modules.ui.layout import Layout
+from .event_loop import EventLoopTestCase
+from .test_virtual_list import View
+
+
+class Row (ui.div):
+	def __init__(self, name: str, value: str) -> None:
+		super().__init__(height=3)
+		self.name = name
+		self.value = value
+
+	def set_value(self, value: str):
+		self.value = value
+		self.dirty()
+
+	def render(self) -> ui.div.Children:
+		return [
+			ui.text(self.name),
+			ui.spacer(1),
+			ui.text(self.value),
+		]
+
+
+class TestLayoutBenchmark(EventLoopTestCase):
+	'''
+		Measures rendering a panel of 5000 rows with a stubbed view against rendering it again after a single row changes
+	'''
+
+	count = 5000
+
+	def layout(self, rows: list[Row]):
+		layout = Layout(View()) #type: ignore
+		layout[ui.div()[rows]]
+
+		def dispose():
+			layout.dispose()
+			self.run_scheduled()
+		self.addCleanup(dispose)
+		return layout
+
+	def render(self) -> tuple[float, int]:
+		generated = 0
+		html_cached = element.html_cached
+		def count(self: element, layout: Layout) -> str:
+			nonlocal generated
+			if self._html is None:
+				generated += 1
+			return html_cached(self, layout)
+
+		with mock.patch.object(element, 'html_cached', count):
+			start = time.perf_counter()
+			self.run_scheduled()
+			return time.perf_counter() - start, generated
+
+	def test_render_one_changed_row(self):
+		rows = [Row(f'v{index}', str(index)) for index in range(self.count)]
+		layout = self.layout(rows)
+		full, full_generated = self.render()
+
+		rows[self.count // 2].set_value('changed')
+		changed, changed_generated = self.render()
+
+		print(f'\n{self.count} rows: full render {full * 1000:.0f}ms {full_generated} elements, one changed row {changed * 1000:.0f}ms {changed_generated} elements')
+
+		# only the changed row, its 3 children and the 2 divs containing it are generated again
+		self.assertEqual(changed_generated, 1 + 3 + 2)
+		self.assertLess(changed, full)
+
+		# the html is the same as rendering everything from scratch
+		expected = self.layout([Row(row.name, row.value) for row in rows])
+		self.render()
+		self.assertEqual(layout.html, expected.html)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ..modules import core
+from ..modules import persistance
+from ..modules.core.json import DottedDict
+
+
+class TestPersistance(unittest.TestCase):
+	project_name = 'test.sublime-project'
+
+	def setUp(self):
+		directory = tempfile.TemporaryDirectory()
+		self.addCleanup(directory.cleanup)
+		os.mkdir(os.path.join(directory.name, 'data'))
+
+		self.errors = []
+		for patcher in (
+			mock.patch.object(core, 'current_package', lambda: directory.name),
+			mock.patch.object(core, 'error', self.errors.append),
+			mock.patch.dict(persistance.journal_entries, clear=True),
+		):
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def test_load_without_any_saved_data(self):
+		json = persistance.load(self.project_name)
+		self.assertIsInstance(json, DottedDict)
+		self.assertEqual(json, {})
+		self.assertIsNone(json.breakpoints)
+
+	def test_load_data_from_another_version(self):
+		with open(persistance.file_name_for_project_name(self.project_name), 'w') as file:
+			file.write('{"_version": -1, "watch": ["a"]}')
+
+		json = persistance.load(self.project_name)
+		self.assertIsInstance(json, DottedDict)
+		self.assertEqual(json, {})
+
+	def test_save_does_not_wait_for_the_write(self):
+		persistance.save(self.project_name, { 'watch': ['a'] })
+		persistance.wait()
+		self.assertEqual(persistance.load(self.project_name).watch, ['a'])
+
+	def test_load_replays_the_journal_without_a_snapshot(self):
+		persistance.write_journal_entry(self.project_name, { 'file': 'a.py', 'breakpoints': [{ 'file': 'a.py', 'line': 1 }] })
+		persistance.write_journal_entry(self.project_name, { 'file': 'a.py', 'breakpoints': [{ 'file': 'a.py', 'line': 2 }] })
+
+		# an entry that was only partially written when sublime exited
+		with open(persistance.journal_file_name_for_project_name(self.project_name), 'a') as file:
+			file.write('\n{"file": "b.py", "breakp')
+
+		json = persistance.load(self.project_name)
+		self.assertEqual(json.breakpoints.source, [{ 'file': 'a.py', 'line': 2 }])
+		self.assertEqual(persistance.journal_entries[self.project_name], 3)
+		self.assertEqual(len(self.errors), 1)
+
+	def test_load_replays_the_journal_onto_the_snapshot(self):
+		persistance.write_snapshot(self.project_name, {
+			'watch': ['a'],
+			'breakpoints': {
+				'source': [{ 'file': 'a.py', 'line': 1 }, { 'file': 'b.py', 'line': 1 }],
+			},
+		})
+		persistance.write_journal_entry(self.project_name, { 'file': 'a.py', 'breakpoints': [] })
+		persistance.write_journal_entry(self.project_name, { 'file': 'c.py', 'breakpoints': [{ 'file': 'c.py', 'line': 3 }] })
+
+		json = persistance.load(self.project_name)
+		self.assertEqual(json.watch, ['a'])
+		self.assertEqual(json.breakpoints.source, [{ 'file': 'b.py', 'line': 1 }, { 'file': 'c.py', 'line': 3 }])
+
+	def test_snapshot_clears_the_journal(self):
+		persistance.write_journal_entry(self.project_name, { 'file': 'a.py', 'breakpoints': [{ 'file': 'a.py', 'line': 1 }] })
+		persistance.write_snapshot(self.project_name, { 'breakpoints': { 'source': [] } })
+
+		self.assertFalse(os.path.exists(persistance.journal_file_name_for_project_name(self.project_name)))
+		self.assertEqual(persistance.load(self.project_name).breakpoints.source, [])
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+from ..modules.settings import Settings
+from ..modules.debugger_protocol_panel import DebuggerProtocolPanel
+
+
+class View:
+	def __init__(self):
+		self.text = ''
+
+	def size(self):
+		return len(self.text)
+
+	def run_command(self, command, args):
+		self.text += args['characters']
+
+	def rowcol(self, point):
+		return (self.text.count('\n', 0, point), 0)
+
+
+class Output:
+	def __init__(self):
+		self.view = View()
+
+	def is_open(self):
+		return True
+
+
+class TestDebuggerProtocolPanel(unittest.TestCase):
+	def setUp(self):
+		for name, value in (('protocol_log_max_line_length', None), ('protocol_log_max_messages', 100), ('protocol_log_max_bytes', 2**20)):
+			patcher = mock.patch.object(Settings, name, value)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+		self.panel = DebuggerProtocolPanel(mock.Mock())
+		self.panel.output = Output() #type: ignore
+
+	def test_open_panel_writes_each_message(self):
+		for i in range(4):
+			self.panel.log('transport', f'msg {i}')
+
+		self.assertEqual(self.panel.output.view.text, 'msg 0\nmsg 1\nmsg 2\nmsg 3\n') #type: ignore
+
+	def test_reports_dropped_messages(self):
+		self.panel.output.is_open = lambda: False #type: ignore
+		with mock.patch.object(Settings, 'protocol_log_max_messages', 2):
+			for i in range(5):
+				self.panel.log('transport', f'msg {i}')
+
+		self.panel.write_pending()
+		self.assertEqual(self.panel.output.view.text, '... 3 messages dropped\nmsg 3\nmsg 4\n') #type: ignore
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest import mock
+
+from ..modules.typecheck import *
+from ..modules import core
+from ..modules.dap import dap
+from ..modules.dap.session import Session
+from ..modules.breakpoints import SourceBreakpoints, SourceBreakpoint
+from .event_loop import EventLoopTestCase
+
+
+def stopped_event(thread_id: int|None, all_threads_stopped: bool|None = None, reason: str = 'breakpoint'):
+	return dap.StoppedEvent(reason, None, thread_id, None, None, all_threads_stopped, None)
+
+
+class TestSessionGeneration(EventLoopTestCase):
+	def session(self):
+		session = object.__new__(Session)
+		session.generation = 0
+		session.variables_cache = { (1, None, None, None): None }
+		session._transport = None
+		session.step_thread = None
+		session.step_in_flight = False
+		session.queued_steps = []
+		session.selected_thread = SimpleNamespace(id=1, stopped=True)
+		session.selected_explicitly = True
+		return session
+
+	def stop(self, session: Session, event: dap.StoppedEvent):
+		with mock.patch.object(Session, 'show_stop'):
+			session.on_stopped_event(event)
+
+	def test_another_thread_stopping_keeps_the_selection(self):
+		session = self.session()
+		self.stop(session, stopped_event(2))
+
+		self.assertEqual(session.generation, 0)
+		self.assertTrue(session.variables_cache)
+
+	def test_stops_that_change_the_selection_advance_the_generation(self):
+		for event, explicitly, stopped in (
+			(stopped_event(1), True, False),
+			(stopped_event(2), False, True),
+			(stopped_event(2, all_threads_stopped=True), True, True),
+			(stopped_event(None), True, True),
+		):
+			session = self.session()
+			session.selected_explicitly = explicitly
+			session.selected_thread.stopped = stopped
+			self.stop(session, event)
+
+			self.assertEqual(session.generation, 1, event)
+			self.assertFalse(session.variables_cache, event)
+
+
+class SetBreakpointsTransport:
+	def __init__(self):
+		self.sent: list[Any] = []
+
+	def send_request_asyc(self, command: str, arguments: Any, generation: int|None = None):
+		self.sent.append(arguments)
+		future = core.Future()
+		future.set_result({ 'breakpoints': [dap.Breakpoint(verified=True) for _ in arguments.arguments['breakpoints']] })
+		return future
+
+
+class TestSourceBreakpointSync(EventLoopTestCase):
+	def session(self, breakpoints: SourceBreakpoints):
+		session = object.__new__(Session)
+		session._transport = SetBreakpointsTransport()
+		session.breakpoints = SimpleNamespace(source=breakpoints)
+		session.breakpoints_for_id = {}
+		session.sent_source_breakpoints = {}
+		return session
+
+	def test_payload_is_shared_and_unchanged_files_are_not_sent_again(self):
+		breakpoints = SourceBreakpoints()
+		self.addCleanup(breakpoints.dispose)
+		for line in (1, 5):
+			breakpoints.index(SourceBreakpoint(breakpoints, 'a.py', line, None, True))
+
+		parent, child = self.session(breakpoints), self.session(breakpoints)
+		breakpoints.on_send.add(parent.on_send_source_breakpoints)
+		breakpoints.on_send.add(child.on_send_source_breakpoints)
+
+		first, second = breakpoints.files['a.py']
+		breakpoints.updated(first)
+		self.run_scheduled()
+
+		# computed and encoded once for both sessions
+		self.assertEqual(len(parent._transport.sent), 1)
+		self.assertIs(parent._transport.sent[0], child._transport.sent[0])
+		self.assertEqual(parent._transport.sent[0].arguments['lines'], [1, 5])
+		self.assertTrue(first.verified and second.verified)
+
+		# nothing changed since the last send
+		breakpoints.updated(first)
+		self.run_scheduled()
+		self.assertEqual(len(parent._transport.sent), 1)
+
+		breakpoints.toggle_enabled(second)
+		self.run_scheduled()
+		self.assertEqual(len(parent._transport.sent), 2)
+		self.assertEqual(child._transport.sent[1].arguments['lines'], [1])
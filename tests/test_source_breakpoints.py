@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import sublime
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+
+from ..modules import dap # dap has to be imported before breakpoints since they import each other
+from ..modules.breakpoints.source_breakpoints import SourceBreakpointsView, SourceBreakpoints, SourceBreakpoint
+from .event_loop import EventLoopTestCase
+
+
+class Region:
+	def __init__(self, a: int, b: int|None = None):
+		self.a = a
+		self.b = a if b is None else b
+
+
+class View:
+	'''
+		Stores regions the way sublime does, regions are sorted and empty regions at the same position are merged
+	'''
+	line_length = 100
+
+	def __init__(self):
+		self.regions: dict[str, list[Region]] = {}
+
+	def id(self):
+		return 1
+
+	def file_name(self):
+		return 'a.py'
+
+	def is_valid(self):
+		return True
+
+	def text_point(self, row: int, col: int) -> int:
+		return row * View.line_length + col
+
+	def rowcol(self, point: int) -> tuple[int, int]:
+		return divmod(point, View.line_length)
+
+	def add_regions(self, key: str, regions: list[Region], **kwargs):
+		self.regions[key] = [Region(a) for a in sorted({ region.a for region in regions })]
+
+	def get_regions(self, key: str) -> list[Region]:
+		return self.regions.get(key, [])
+
+	def erase_regions(self, key: str):
+		self.regions.pop(key, None)
+
+	# moves every region at or after `row` down by `rows` lines
+	def insert_lines(self, row: int, rows: int):
+		for regions in self.regions.values():
+			for region in regions:
+				if region.a >= self.text_point(row, 0):
+					region.a += rows * View.line_length
+
+	# removes `rows` lines starting at `row`, regions on the removed lines end up at the same position and are merged
+	def delete_lines(self, row: int, rows: int):
+		start = self.text_point(row, 0)
+		end = self.text_point(row + rows, 0)
+		for key, regions in self.regions.items():
+			moved = { region.a if region.a < start else max(region.a - (end - start), start) for region in regions }
+			self.regions[key] = [Region(a) for a in sorted(moved)]
+
+
+def breakpoint(id: int, line: int):
+	return SimpleNamespace(id=id, line=line, column=None, dap=SimpleNamespace(column=None), image=SimpleNamespace(file='dot.png'))
+
+
+class TestSourceBreakpointsView(unittest.TestCase):
+	def setUp(self):
+		patcher = mock.patch.object(sublime, 'Region', Region, create=True)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_lines_with_two_breakpoints_on_the_same_line(self):
+		view = View()
+		drawn = SourceBreakpointsView(None, view) #type: ignore
+		a, b, c = breakpoint(1, 3), breakpoint(2, 3), breakpoint(3, 10)
+		drawn.render([a, b, c])
+
+		self.assertEqual(len(view.get_regions('debugger.breakpoints.dot.png')), 2)
+		self.assertEqual(list(drawn.lines()), [(a, 3), (b, 3), (c, 10)])
+
+		view.insert_lines(0, 2)
+		self.assertEqual(list(drawn.lines()), [(a, 5), (b, 5), (c, 12)])
+
+	def test_lines_when_regions_were_merged(self):
+		view = View()
+		drawn = SourceBreakpointsView(None, view) #type: ignore
+		a, b, c, d = breakpoint(1, 3), breakpoint(2, 5), breakpoint(3, 10), breakpoint(4, 20)
+		drawn.render([a, b, c, d])
+
+		# deleting lines 3 and 4 moves the breakpoint on line 5 onto line 3
+		view.delete_lines(2, 2)
+		self.assertEqual(len(view.get_regions('debugger.breakpoints.dot.png')), 3)
+		self.assertEqual(list(drawn.lines()), [(a, 3), (b, 3), (c, 8), (d, 18)])
+
+		# the breakpoints on lines 10 and 20 merge once everything between them is gone as well
+		view.insert_lines(0, 1)
+		view.delete_lines(8, 10)
+		self.assertEqual(list(drawn.lines()), [(a, 4), (b, 4), (c, 9), (d, 9)])
+
+
+class TestSourceBreakpointsSync(EventLoopTestCase):
+	def setUp(self):
+		super().setUp()
+		for patcher in (
+			mock.patch.object(sublime, 'Region', Region, create=True),
+			mock.patch.object(SourceBreakpoint, 'image', SimpleNamespace(file='dot.png')),
+		):
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def test_moved_breakpoints_are_saved_but_not_sent(self):
+		breakpoints = SourceBreakpoints()
+		self.addCleanup(breakpoints.dispose)
+		breakpoint = SourceBreakpoint(breakpoints, 'a.py', 3, None, True)
+		breakpoints.index(breakpoint)
+
+		view = View()
+		breakpoints.sync_from_breakpoints(view) #type: ignore
+
+		sent = []
+		changed = []
+		breakpoints.on_send.add(sent.append)
+		breakpoints.on_changed.add(lambda file, breakpoints: changed.append((file, [b.dap.line for b in breakpoints])))
+
+		view.insert_lines(0, 2)
+		breakpoints.sync(view) #type: ignore
+		self.run_scheduled()
+
+		self.assertEqual(sent, [])
+		self.assertEqual(changed, [('a.py', [5])])
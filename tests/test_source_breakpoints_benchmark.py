@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import time
+from unittest import mock
+
+from ..modules import dap # dap has to be imported before breakpoints since they import each other
+from ..modules.breakpoints.source_breakpoints import SourceBreakpoints
+from .event_loop import EventLoopTestCase
+
+
+class TestSourceBreakpointsBenchmark(EventLoopTestCase):
+	'''
+		Adds and toggles 50k breakpoints spread over 100 files through the SourceBreakpoints index
+	'''
+
+	files = 100
+	lines = 500
+
+	def setUp(self):
+		super().setUp()
+		patcher = mock.patch.object(SourceBreakpoints, 'add_breakpoints_to_current_view')
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+		# anything left scheduled by the test has to run or the event loop never schedules anything again
+		self.addCleanup(self.run_scheduled)
+
+	def locations(self):
+		# lines are visited out of order so breakpoints are inserted in the middle of each file
+		for line in range(self.lines):
+			for file in range(self.files):
+				yield f'/project/file{file}.py', (line * 7919) % self.lines + 1
+
+	def test_add_and_toggle(self):
+		breakpoints = SourceBreakpoints()
+		self.addCleanup(breakpoints.dispose)
+
+		start = time.perf_counter()
+		for file, line in self.locations():
+			breakpoints.toggle(file, line)
+		self.run_scheduled()
+		added = time.perf_counter() - start
+
+		self.assertEqual(sum(len(b) for b in breakpoints.breakpoints_per_file().values()), self.files * self.lines)
+		self.assertEqual([b.line for b in breakpoints.breakpoints_for_file('/project/file0.py')], list(range(1, self.lines + 1)))
+
+		start = time.perf_counter()
+		for breakpoint in list(breakpoints):
+			breakpoints.toggle_enabled(breakpoint)
+		self.run_scheduled()
+		toggled_enabled = time.perf_counter() - start
+
+		self.assertFalse(any(b.enabled for b in breakpoints))
+
+		start = time.perf_counter()
+		for file, line in self.locations():
+			breakpoints.toggle(file, line)
+		self.run_scheduled()
+		removed = time.perf_counter() - start
+
+		self.assertFalse(breakpoints.breakpoints_per_file())
+		self.assertFalse(breakpoints.locations)
+
+		count = self.files * self.lines
+		print(f'\n{count} breakpoints in {self.files} files: added {added * 1000:.0f}ms toggled enabled {toggled_enabled * 1000:.0f}ms removed {removed * 1000:.0f}ms')
+
+	def test_breakpoints_per_file_is_a_copy(self):
+		breakpoints = SourceBreakpoints()
+		self.addCleanup(breakpoints.dispose)
+		breakpoints.toggle('/project/a.py', 1)
+
+		files = breakpoints.breakpoints_per_file()
+		breakpoints.toggle('/project/a.py', 2)
+		breakpoints.toggle('/project/b.py', 1)
+
+		self.assertEqual([b.line for b in files['/project/a.py']], [1])
+		self.assertEqual(list(files), ['/project/a.py'])
+		self.assertIsInstance(files['/project/a.py'], tuple)
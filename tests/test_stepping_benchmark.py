@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest import mock
+
+from ..modules import core
+from ..modules.dap.session import Session
+from ..modules.dap.transport import TransportProtocol
+from ..modules.settings import Settings
+from ..modules.watch import Watch
+from .event_loop import EventLoopTestCase
+from .mock_adapter import MockAdapter
+
+
+class Log:
+	def log(self, type: str, value: Any):
+		...
+	def info(self, value: str):
+		...
+	def error(self, value: str):
+		...
+
+
+class Listener:
+	# the ui is not part of this benchmark, every listener callback does nothing
+	def __getattr__(self, name: str):
+		return lambda *args: None
+
+
+class TestSteppingBenchmark(EventLoopTestCase):
+	'''
+		Measures steps per second through the session and protocol against an in process mock adapter with and without fast stepping
+	'''
+
+	steps = 200
+
+	def start(self):
+		breakpoints = SimpleNamespace(data=SimpleNamespace(on_send=core.Event()), function=SimpleNamespace(on_send=core.Event()), filters=SimpleNamespace(on_send=core.Event()), source=SimpleNamespace(on_send=core.Event()))
+		watch = Watch()
+		watch.add('a')
+		watch.add('b')
+
+		log = Log()
+		session = Session(SimpleNamespace(type='mock'), SimpleNamespace(name='mock'), None, False, breakpoints, watch, Listener(), log, None) #type: ignore
+		adapter = MockAdapter()
+		session._transport = TransportProtocol(adapter, session, log) #type: ignore
+
+		adapter.stopped('breakpoint')
+		self.run_scheduled()
+		adapter.requests.clear()
+		return session, adapter
+
+	def step(self, idle_time_ms: int):
+		with mock.patch.object(Settings, 'fast_step_idle_time_ms', idle_time_ms), mock.patch.object(Settings, 'prefetch_on_stop', True):
+			session, adapter = self.start()
+
+			# steps as fast as the adapter stops without waiting for the idle time
+			for _ in range(self.steps):
+				core.run(session.step_over())
+				self.run_scheduled(delayed=False)
+
+			steps_per_second = session.steps_per_second()
+
+			self.run_scheduled()
+			return steps_per_second, adapter.requests, session
+
+	def test_steps_per_second(self):
+		fast, fast_requests, session = self.step(100)
+		self.assertEqual(fast_requests['next'], self.steps)
+		# only the last stop is shown
+		self.assertEqual(fast_requests['stackTrace'], 1)
+		self.assertEqual(session.selected_frame.line, self.steps + 1)
+
+		every, every_requests, session = self.step(0)
+		self.assertEqual(every_requests['next'], self.steps)
+		self.assertEqual(every_requests['stackTrace'], self.steps)
+		self.assertEqual(session.selected_frame.line, self.steps + 1)
+
+		print(f'\nsteps/s with fast stepping: {fast:.0f} requests: {fast_requests}\nsteps/s showing every stop: {every:.0f} requests: {every_requests}')
+		self.assertGreater(fast, every)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import json
+import socket
+import threading
+
+from ..modules import core
+from ..modules.dap.transport import TransportInbox, TransportProtocol, EncodedArguments
+from ..modules.dap.transports import ReactorChannel
+
+from .event_loop import EventLoopTestCase
+
+
+class TestTransportInbox(unittest.TestCase):
+	def setUp(self):
+		self.scheduled = []
+		patcher = mock.patch.object(core, 'call_soon_threadsafe', lambda callback, *args: self.scheduled.append((callback, args)))
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def run_scheduled(self):
+		while self.scheduled:
+			callback, args = self.scheduled.pop(0)
+			callback(*args)
+
+	def test_batches_messages(self):
+		received = []
+		inbox = TransportInbox(lambda message: received.append(message), lambda: received.append('closed'))
+		inbox.append(1)
+		inbox.append(2)
+		inbox.append(3)
+
+		self.assertEqual(len(self.scheduled), 1)
+		self.run_scheduled()
+		self.assertEqual(received, [1, 2, 3])
+
+	def test_close_is_handled_after_late_messages(self):
+		received = []
+
+		def callback(message):
+			received.append(message)
+			# more messages and the close arrive from the reader thread while the first batch is being handled
+			if message == 1:
+				inbox.append(2)
+				inbox.append(3)
+				inbox.close('eof')
+
+		inbox = TransportInbox(callback, lambda reason: received.append(f'closed {reason}'))
+		inbox.append(1)
+		self.run_scheduled()
+
+		self.assertEqual(received, [1, 2, 3, 'closed eof'])
+
+
+class BrokenPipeTransport:
+	def read_with_reactor(self, on_data):
+		return True
+
+	def writelines(self, data):
+		raise BrokenPipeError(32, 'Broken pipe')
+
+	def dispose(self):
+		...
+
+
+class Listener:
+	def __init__(self):
+		self.closed = 0
+
+	def on_transport_closed(self):
+		self.closed += 1
+
+
+class Log:
+	def log(self, type, value):
+		...
+
+
+class RecordingTransport:
+	def __init__(self):
+		self.written: list[bytes] = []
+
+	def read_with_reactor(self, on_data):
+		return True
+
+	def writelines(self, data):
+		self.written.extend(data)
+
+
+class TestTransportProtocolSend(EventLoopTestCase):
+	def test_encoded_arguments_are_sent_as_is(self):
+		transport = RecordingTransport()
+		protocol = TransportProtocol(transport, Listener(), Log()) #type: ignore
+		arguments = EncodedArguments({ 'source': { 'path': 'a.py' }, 'lines': [1, 2] })
+		protocol.send_request_asyc('setBreakpoints', arguments)
+		protocol.send_request_asyc('setBreakpoints', arguments)
+		self.run_scheduled()
+
+		header, content = transport.written[2:]
+		self.assertEqual(header, b'Content-Length: %d\r\n\r\n' % len(content))
+		self.assertEqual(json.loads(content), { 'seq': 2, 'type': 'request', 'command': 'setBreakpoints', 'arguments': { 'source': { 'path': 'a.py' }, 'lines': [1, 2] } })
+
+
+class TestTransportProtocolClosed(EventLoopTestCase):
+	def test_write_errors_fail_pending_requests(self):
+		listener = Listener()
+		protocol = TransportProtocol(BrokenPipeTransport(), listener, Log()) #type: ignore
+		first = protocol.send_request_asyc('threads', None)
+		second = protocol.send_request_asyc('stackTrace', { 'threadId': 1 })
+		self.run_scheduled()
+
+		self.assertIsInstance(first.exception(), core.Error)
+		self.assertIsInstance(second.exception(), core.Error)
+		self.assertEqual(listener.closed, 1)
+		self.assertFalse(protocol.pending_requests)
+
+		# requests sent once the transport is closed fail as soon as they are written
+		third = protocol.send_request_asyc('threads', None)
+		self.run_scheduled()
+		self.assertIsInstance(third.exception(), core.Error)
+		self.assertEqual(listener.closed, 1)
+
+
+class TestReactorChannel(unittest.TestCase):
+	def test_write_to_a_closed_peer_closes_the_channel(self):
+		ours, theirs = socket.socketpair()
+		self.addCleanup(ours.close)
+		theirs.close()
+
+		closed = threading.Event()
+		channel = ReactorChannel(ours)
+
+		# the reader would see the close on its own, only start reading once the write has failed
+		with self.assertRaises(OSError):
+			channel.writelines([b'Content-Length: 2\r\n\r\n', b'{}'])
+
+		channel.read(lambda data: data or closed.set())
+
+		self.assertTrue(closed.wait(5))
+		self.assertTrue(channel.closed)
+		with self.assertRaises(EOFError):
+			channel.writelines([b'{}'])
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import socket
+import sys
+import threading
+import time
+import unittest
+
+from ..modules.typecheck import *
+from ..modules.dap.transport import TransportStream
+from ..modules.dap.transports import StdioTransport, SocketTransport
+
+# writes `count` frames with bodies of mixed sizes, run in the adapter process for stdio and on a thread for sockets
+frames_source = '''
+import json
+
+def frames(count):
+	sizes = (32, 128, 512, 2048)
+	data = []
+	for seq in range(count):
+		content = json.dumps({ 'seq': seq, 'type': 'event', 'event': 'output', 'body': { 'output': 'x' * sizes[seq % len(sizes)] } }).encode('utf-8')
+		data.append(b'Content-Length: %d\\r\\n\\r\\n' % len(content))
+		data.append(content)
+	return b''.join(data)
+'''
+
+namespace: dict[str, Any] = {}
+exec(frames_source, namespace)
+frames: Callable[[int], bytes] = namespace['frames']
+
+
+class Log:
+	def log(self, type: str, value: Any):
+		...
+
+
+class TestTransportBenchmark(unittest.TestCase):
+	'''
+		Measures how fast 100k frames of mixed sizes are read and decoded through the stdio and socket transports
+	'''
+
+	count = 100000
+
+	def receive(self, transport: Any, size: int) -> float:
+		stream = TransportStream(transport)
+		received = 0
+		started = 0.0
+		done = threading.Event()
+
+		# timed from the first data so starting the process and generating the frames is not included
+		def on_data(data: bytes):
+			nonlocal received, started
+			started = started or time.perf_counter()
+			if not data:
+				done.set()
+				return
+
+			for _ in stream.feed(data):
+				received += 1
+
+			if received == self.count:
+				done.set()
+
+		self.assertTrue(transport.read_with_reactor(on_data))
+		self.assertTrue(done.wait(120), 'timed out')
+		elapsed = time.perf_counter() - started
+
+		self.assertEqual(received, self.count)
+		return size / elapsed / 1e6
+
+	def test_stdio(self):
+		size = len(frames(self.count))
+		script = frames_source + f'\nimport sys\nsys.stdout.buffer.write(frames({self.count}))\nsys.stdout.buffer.flush()\n'
+		transport = StdioTransport(Log(), [sys.executable, '-c', script]) #type: ignore
+		self.addCleanup(transport.dispose)
+
+		print(f'\nstdio: {self.count} frames {size / 1e6:.1f}MB {self.receive(transport, size):.0f}MB/s')
+
+	def test_socket(self):
+		data = frames(self.count)
+		server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		self.addCleanup(server.close)
+		server.bind(('127.0.0.1', 0))
+		server.listen(1)
+
+		def send():
+			connection, _ = server.accept()
+			with connection:
+				connection.sendall(data)
+
+		thread = threading.Thread(target=send)
+		thread.start()
+		self.addCleanup(thread.join)
+
+		transport = SocketTransport(Log(), '127.0.0.1', server.getsockname()[1]) #type: ignore
+		self.addCleanup(transport.dispose)
+
+		print(f'\nsocket: {self.count} frames {len(data) / 1e6:.1f}MB {self.receive(transport, len(data)):.0f}MB/s')
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from ..modules import core
+from ..modules.views.variable import VariableComponent, VariableComponentState
+from .event_loop import EventLoopTestCase
+
+
+class Variable:
+	name = 'a'
+	value = '1'
+	has_children = True
+	is_paged = False
+
+	def __init__(self):
+		self.children_future = core.create_future()
+
+	def children(self, count: int):
+		return self.children_future
+
+
+class TestVariableComponent(EventLoopTestCase):
+	def test_cancelled_expansion_collapses_the_row(self):
+		state = VariableComponentState()
+		variable = Variable()
+		component = VariableComponent(None, variable, state=state) #type: ignore
+
+		expanding = component.set_expanded()
+		self.run_scheduled()
+		self.assertTrue(state.is_expanded(variable))
+
+		# the program stopped again which cancels the variables request
+		variable.children_future.cancel()
+		self.run_scheduled()
+
+		self.assertTrue(expanding.done())
+		self.assertFalse(expanding.cancelled())
+		self.assertFalse(state.is_expanded(variable))
+		self.assertIsNone(component.variable_children)
+		self.assertIsNone(component.error)
+
+	def test_expansion(self):
+		state = VariableComponentState()
+		variable = Variable()
+		component = VariableComponent(None, variable, state=state) #type: ignore
+
+		component.set_expanded()
+		variable.children_future.set_result(['child'])
+		self.run_scheduled()
+
+		self.assertTrue(state.is_expanded(variable))
+		self.assertEqual(component.variable_children, ['child'])
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from ..modules import ui
+from ..modules.ui.layout import Layout
+from .event_loop import EventLoopTestCase
+
+
+class View:
+	def style(self):
+		return { 'background': '#000000' }
+
+	def viewport_extent(self):
+		return (300, 300)
+
+	def settings(self):
+		return {}
+
+	def em_width(self):
+		return 1
+
+
+def row(item):
+	return ui.div(height=3)[ui.text(str(item))]
+
+
+class TestVirtualList(EventLoopTestCase):
+	def render(self, *items: ui.div):
+		layout = Layout(View()) #type: ignore
+		layout[ui.div(height=30)[items]]
+		self.run_scheduled()
+
+		def dispose():
+			layout.dispose()
+			self.run_scheduled()
+		self.addCleanup(dispose)
+		return layout
+
+	def test_renders_the_rows_that_fit_in_the_panel(self):
+		items = ui.virtual_list(range(100), row, key='items', overscan=2)
+		self.render(items)
+
+		# 10 rows fit in the panel
+		self.assertEqual((items.start, items.end), (0, 12))
+
+		items.next()
+		self.assertEqual(items.offset, 12)
+
+	def test_nested_lists_get_the_rows_their_parent_has_left(self):
+		nested = ui.virtual_list(range(100), row, key='nested', overscan=0)
+
+		def render_item(item):
+			if item == 0:
+				return ui.div()[nested]
+			return row(item)
+
+		parent = ui.virtual_list(range(4), render_item, key='parent', overscan=0)
+		self.render(parent)
+
+		self.assertEqual((parent.start, parent.end), (0, 4))
+		self.assertEqual((nested.start, nested.end), (0, 6))
+		self.assertEqual(parent.remaining, -1)
+
+	def test_rows_that_render_as_more_than_one_element(self):
+		items = ui.virtual_list(range(100), lambda item: [row(item), row(item), ui.div(height=6)], key='items', overscan=0)
+		self.render(items)
+
+		# each item takes 4 rows
+		self.assertEqual((items.start, items.end), (0, 3))
+
+	def test_the_pager_fetches_more_at_the_end_of_the_items(self):
+		fetched = []
+		items = ui.virtual_list(range(5), row, key='items', more=20, on_more=lambda: fetched.append(True))
+		self.render(items)
+
+		self.assertEqual((items.start, items.end), (0, 5))
+		items.next()
+		self.assertEqual(fetched, [True])
+		self.assertEqual(items.offset, 5)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from ..modules.core.json import DottedDict
+from ..modules.dap.session import Session
+from ..modules.watch import Watch
+from .event_loop import EventLoopTestCase
+
+
+class TestWatch(EventLoopTestCase):
+	def session(self):
+		session = object.__new__(Session)
+		session.generation = 1
+		session.requests = []
+
+		# the frame selected for the previous stop
+		session.selected_frame = SimpleNamespace(id=1)
+
+		async def request(command: str, arguments: Any, generation: int|None = None):
+			session.requests.append((command, arguments, generation))
+			return DottedDict(result=arguments['expression'], variablesReference=0)
+
+		session.request = request
+		return session
+
+	def test_evaluations_use_the_frame_being_loaded(self):
+		session = self.session()
+		watch = Watch()
+		watch.add('a')
+		watch.add('b')
+
+		evaluated = self.run_until_complete(watch.evaluations(session, SimpleNamespace(id=2)))
+		self.assertEqual([(arguments['expression'], arguments['frameId'], generation) for _, arguments, generation in session.requests], [('a', 2, 1), ('b', 2, 1)])
+
+		evaluated()
+		self.assertEqual([expression.evaluate_response.value for expression in watch.expressions], ['a', 'b'])
+
+	def test_evaluations_are_dropped_when_the_generation_changes(self):
+		session = self.session()
+		watch = Watch()
+		watch.add('a')
+
+		# the program continues while the expression is being evaluated
+		request = session.request
+		async def continued(*args):
+			session.generation += 1
+			return await request(*args)
+
+		session.request = continued
+		self.assertIsNone(self.run_until_complete(watch.evaluations(session, SimpleNamespace(id=2))))